@@ -0,0 +1 @@
+"""Вимірювання продуктивності бібліотечного сервісу."""
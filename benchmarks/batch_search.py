@@ -0,0 +1,47 @@
+"""
+Пропускна здатність пакетного пошуку: послідовні виклики
+SearchStrategy.search проти VectorizedSearch.search_many.
+
+Запуск: python -m benchmarks.batch_search [кількість книг] [кількість запитів]
+"""
+
+import random
+import sys
+import time
+
+from library_project.models import Book
+from library_project.patterns import SearchByTitle, SearchByAuthor, SearchByGenre, VectorizedSearch
+from benchmarks.synthetic import generate_records
+
+
+def run(strategy, books, queries):
+    """Повертає кількість запитів за секунду при послідовному пошуку."""
+    started = time.perf_counter()
+    for query in queries:
+        strategy.search(books, query)
+    return len(queries) / (time.perf_counter() - started)
+
+
+def run_batch(strategy, books, queries):
+    """Повертає кількість запитів за секунду при пакетному пошуку."""
+    strategy.catalog(books)
+    started = time.perf_counter()
+    strategy.search_many(books, queries)
+    return len(queries) / (time.perf_counter() - started)
+
+
+def main(count=100_000, batch=1_000):
+    """Виводить пропускну здатність для кожного поля."""
+    books = [Book(*record) for record in generate_records(count)]
+    rng = random.Random(7)
+    for strategy in (SearchByTitle(), SearchByAuthor(), SearchByGenre()):
+        sample = rng.sample(books, batch)
+        queries = [getattr(book, strategy.field)[1:-1] for book in sample]
+        linear = run(strategy, books, queries)
+        vectorized = run_batch(VectorizedSearch(strategy.field), books, queries)
+        print(f"{strategy.field:>6}: {linear:10.1f} запитів/с послідовно, "
+              f"{vectorized:10.1f} запитів/с пакетно")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,55 @@
+"""
+Порівняння пам'яті, яку займає каталог у різних представленнях:
+звичайні об'єкти з __dict__ (попередня модель), Book зі __slots__
+та колонкове сховище BookStore — без індексів і разом з індексами
+(BookList проти BookStore).
+
+Запуск: python -m benchmarks.memory_layout [кількість книг]
+"""
+
+import sys
+import tracemalloc
+
+from library_project.models import Book
+from library_project.services.book_store import BookStore
+from library_project.services.indexes import BookList
+from benchmarks.synthetic import generate_records
+
+
+class DictBook:
+    """Книга у попередньому представленні: звичайний об'єкт з __dict__."""
+
+    def __init__(self, title, author, genre=""):
+        self.title = title
+        self.author = author
+        self.genre = genre
+
+
+def measure(build, count):
+    """Повертає кількість байтів, що залишилися виділеними після побудови."""
+    tracemalloc.start()
+    catalog = build(generate_records(count))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del catalog
+    return current
+
+
+LAYOUTS = {
+    "dict": lambda records: [DictBook(*r) for r in records],
+    "slots": lambda records: [Book(*r) for r in records],
+    "store": lambda records: BookStore((Book(*r) for r in records), indexed=False),
+    "indexed list": lambda records: BookList(Book(*r) for r in records),
+    "indexed store": lambda records: BookStore(Book(*r) for r in records),
+}
+
+
+def main(count=100_000):
+    """Виводить пам'ять кожного представлення в байтах на книгу."""
+    for name, build in LAYOUTS.items():
+        used = measure(build, count)
+        print(f"{name:>13}: {used / 2 ** 20:8.1f} МіБ, {used / count:6.1f} Б/книга")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
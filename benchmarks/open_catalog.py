@@ -0,0 +1,51 @@
+"""
+Час відкриття бінарного каталогу (LibraryService.open_catalog) без
+додаткових можливостей і з тими, що вмикає main.py. Сам файл
+відображається за сталий час, але кожен увімкнений похідний індекс
+(нечіткий пошук, автодоповнення, агрегати) перебудовується за всіма
+рядками каталогу.
+
+Запуск: python -m benchmarks.open_catalog [кількість книг]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from library_project.services.catalog_file import write_catalog
+from benchmarks.synthetic import generate_records, fresh_service
+
+FEATURES = {
+    "без можливостей": (),
+    "кеш пошуку": ("enable_search_cache",),
+    "нечіткий пошук": ("enable_fuzzy_search",),
+    "автодоповнення": ("enable_autocomplete",),
+    "агрегати": ("enable_aggregates",),
+    "як у main.py": ("enable_search_cache", "enable_fuzzy_search", "enable_autocomplete",
+                     "enable_aggregates", "enable_circulation", "enable_snapshots"),
+}
+
+
+def open_time(path, features):
+    """Повертає час open_catalog для сервісу з увімкненими features."""
+    service = fresh_service()
+    for feature in features:
+        getattr(service, feature)()
+    started = time.perf_counter()
+    service.open_catalog(path).close()
+    return time.perf_counter() - started
+
+
+def main(count=200_000):
+    """Виводить час відкриття каталогу для кожного набору можливостей."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.bin")
+        write_catalog(path, ({"title": t, "author": a, "genre": g}
+                             for t, a, g in generate_records(count)))
+        for label, features in FEATURES.items():
+            print(f"{label:>16}: {open_time(path, features):8.3f} с")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,49 @@
+"""
+Масштабування паралельного пошуку: запити за секунду для SearchExecutor
+з різною кількістю процесів порівняно з пошуком у поточному процесі.
+
+Запуск: python -m benchmarks.parallel_search [кількість книг] [кількість запитів]
+"""
+
+import os
+import random
+import sys
+import time
+
+from library_project.patterns import SearchByTitle, SearchByAuthor, ParallelSearch, SearchExecutor
+from benchmarks.synthetic import generate_books
+
+
+def run(strategy, books, queries):
+    """Повертає кількість запитів за секунду."""
+    started = time.perf_counter()
+    for query in queries:
+        strategy.search(books, query)
+    return len(queries) / (time.perf_counter() - started)
+
+
+def main(count=1_000_000, batch=20):
+    """Виводить пропускну здатність для 1, 2, 4, ... процесів до кількості ядер."""
+    books = generate_books(count)
+    rng = random.Random(7)
+    counts, workers = [], 1
+    while workers <= max(2, os.cpu_count() or 1):
+        counts.append(workers)
+        workers *= 2
+    print(f"Ядер: {os.cpu_count()}, книг: {count}")
+    for strategy in (SearchByTitle(), SearchByAuthor()):
+        queries = [getattr(book, strategy.field)[1:-1] for book in rng.sample(books, batch)]
+        baseline = run(strategy, books, queries)
+        print(f"{strategy.field:>6}: {baseline:8.2f} запитів/с у поточному процесі")
+        for workers in counts:
+            with SearchExecutor(workers) as executor:
+                started = time.perf_counter()
+                executor.load(books)
+                loaded = time.perf_counter() - started
+                parallel = run(ParallelSearch(strategy, executor, threshold=0), books, queries)
+            print(f"{strategy.field:>6}: {parallel:8.2f} запитів/с, процесів: {workers} "
+                  f"(x{parallel / baseline:.2f}, завантаження {loaded:.1f} с)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
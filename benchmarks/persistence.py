@@ -0,0 +1,66 @@
+"""
+Пропускна здатність змін з увімкненим журналом і час відновлення
+стану зі знімка та хвоста журналу.
+
+Запуск: python -m benchmarks.persistence [кількість книг]
+"""
+
+import sys
+import tempfile
+import time
+
+from library_project.models import Book
+from library_project.models.user import UserFactory
+from library_project.services.storage import LibraryStorage
+from benchmarks.synthetic import generate_records, fresh_service
+
+
+def mutation_throughput(count, **options):
+    """Повертає кількість add_book за секунду з підключеним сховищем."""
+    with tempfile.TemporaryDirectory() as directory:
+        storage = LibraryStorage(directory, **options)
+        service = fresh_service()
+        storage.open(service)
+        books = [Book(*record) for record in generate_records(count)]
+        started = time.perf_counter()
+        for book in books:
+            service.add_book(book)
+        storage.close()
+        return count / (time.perf_counter() - started)
+
+
+def recovery_time(count, tail):
+    """Повертає час відновлення стану зі знімка count книг і tail записів журналу."""
+    with tempfile.TemporaryDirectory() as directory:
+        storage = LibraryStorage(directory, fsync=False)
+        service = fresh_service()
+        storage.open(service)
+        records = list(generate_records(count + tail))
+        service.add_books(Book(*record) for record in records[:count])
+        reader = UserFactory.create_user("reader", "Reader")
+        service.register_user(reader)
+        for book in service.books[: count // 10]:
+            service.lend_book(book, reader)
+        storage.snapshot()
+        service.add_books(Book(*record) for record in records[count:])
+        storage.close()
+
+        started = time.perf_counter()
+        LibraryStorage(directory).open(fresh_service())
+        return time.perf_counter() - started
+
+
+def main(count=100_000):
+    """Виводить результати вимірювань."""
+    for label, options in (
+        ("fsync кожного запису", {"fsync_batch": 1, "fsync_interval": 0}),
+        ("груповий fsync по 256", {"fsync_batch": 256, "fsync_interval": 0.05}),
+        ("без fsync", {"fsync": False}),
+    ):
+        sample = count if options.get("fsync_batch") != 1 else min(count, 2_000)
+        print(f"{label:>22}: {mutation_throughput(sample, **options):10.0f} add_book/с")
+    print(f"відновлення {count} книг + 1% журналу: {recovery_time(count, count // 100):.2f} с")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
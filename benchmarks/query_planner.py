@@ -0,0 +1,48 @@
+"""
+Порівняння багатокритеріального запиту через планувальник з ланцюжком
+існуючих стратегій (результат однієї стратегії фільтрується іншою).
+
+Запуск: python -m benchmarks.query_planner [кількість книг]
+"""
+
+import random
+import sys
+import time
+
+from library_project.models import Book
+from library_project.patterns import SearchByAuthor, SearchByGenre
+from library_project.patterns.query import Author, Genre, Available, execute
+from library_project.services.indexes import BookList
+from benchmarks.synthetic import generate_records
+
+
+def timed(function, repeat):
+    """Повертає середній час виклику function у мілісекундах."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1e3
+
+
+def main(count=100_000, repeat=20):
+    """Виводить час запиту «жанр = X і автор містить Y і книга вільна»."""
+    books = BookList(Book(*record) for record in generate_records(count))
+    rng = random.Random(3)
+    lent = {book: None for book in rng.sample(list(books), count // 10)}
+    sample = rng.choice(books)
+    genre, author = sample.genre, sample.author
+
+    def chained():
+        by_genre = SearchByGenre().search(books, genre)
+        return [book for book in SearchByAuthor().search(by_genre, author) if book not in lent]
+
+    def planned():
+        return execute(Genre(genre) & Author(author) & Available(), books, lent)
+
+    assert chained() == planned()
+    print(f"ланцюжок стратегій: {timed(chained, repeat):8.3f} мс")
+    print(f"    планувальник:   {timed(planned, repeat):8.3f} мс")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
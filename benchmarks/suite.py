@@ -0,0 +1,213 @@
+"""
+Масштабований набір вимірювань основних операцій LibraryService.
+
+Кожна операція вимірюється на каталогах різного розміру, результати
+записуються у JSON, а режим compare порівнює два такі файли і повертає
+ненульовий код виходу, якщо якась операція сповільнилася більше за поріг.
+
+Запуск:
+    python -m benchmarks.suite run --sizes 1000 10000 100000 --output base.json
+    python -m benchmarks.suite compare base.json new.json --threshold 0.2
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from library_project.patterns import SearchByTitle, SearchByAuthor, SearchByGenre
+from library_project.patterns.observer import Notifier
+from benchmarks.synthetic import generate_books, generate_users, generate_loans, fresh_service
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+QUERIES = 200
+NOTIFY_CALLS = 200
+LOAN_HEAVY_SHARE = 0.5
+
+
+class _Observer:
+    """Спостерігач, що лише рахує повідомлення."""
+
+    def __init__(self):
+        self.received = 0
+
+    def notify(self, message):
+        self.received += 1
+
+
+def _timed(operation, items):
+    """Виконує operation для кожного елемента і повертає (кількість, секунди)."""
+    started = time.perf_counter()
+    for item in items:
+        operation(item)
+    return len(items), time.perf_counter() - started
+
+
+def _catalog(size, loans=0.1):
+    """Повертає сервіс із size книгами, size // 10 користувачами та часткою loans виданих книг."""
+    service = fresh_service()
+    books = generate_books(size)
+    users = generate_users(max(1, size // 10))
+    service.add_books(books)
+    service.register_users(users)
+    for book, user in generate_loans(books, users, loans, seed=1):
+        service.lend_book(book, user)
+    return service, books, users
+
+
+def bench_add_book(size):
+    service = fresh_service()
+    return _timed(service.add_book, generate_books(size))
+
+
+def bench_register_user(size):
+    service = fresh_service()
+    return _timed(service.register_user, generate_users(size))
+
+
+def bench_lend_return(size):
+    service = fresh_service()
+    books = generate_books(size)
+    users = generate_users(max(1, size // 10))
+    service.add_books(books)
+    service.register_users(users)
+    rng = random.Random(2)
+    pairs = [(book, rng.choice(users)) for book in rng.sample(books, min(size, 1_000))]
+    started = time.perf_counter()
+    for book, user in pairs:
+        service.lend_book(book, user)
+    for book, user in pairs:
+        service.return_book(book, user)
+    return 2 * len(pairs), time.perf_counter() - started
+
+
+def bench_get_books_by_user(size):
+    service, _, users = _catalog(size)
+    sample = random.Random(3).choices(users, k=1_000)
+    return _timed(service.get_books_by_user, sample)
+
+
+def bench_get_books_by_user_loan_heavy(size):
+    """get_books_by_user, коли видано половину каталогу (≈5 книг на користувача)."""
+    service, _, users = _catalog(size, LOAN_HEAVY_SHARE)
+    sample = random.Random(3).choices(users, k=1_000)
+    return _timed(service.get_books_by_user, sample)
+
+
+def _bench_search(strategy):
+    def bench(size):
+        service, books, _ = _catalog(size)
+        sample = random.Random(4).choices(books, k=QUERIES)
+        queries = [getattr(book, strategy.field)[1:-1] for book in sample]
+        return _timed(lambda query: strategy.search(service.books, query), queries)
+    return bench
+
+
+def bench_notify_all(size):
+    """Розсилка одному спостерігачу на кожні 100 книг каталогу."""
+    notifier = Notifier()
+    for _ in range(max(1, size // 100)):
+        notifier.add_observer(_Observer())
+    return _timed(notifier.notify_all, [f"Повідомлення {i}" for i in range(NOTIFY_CALLS)])
+
+
+BENCHMARKS = {
+    "add_book": bench_add_book,
+    "register_user": bench_register_user,
+    "lend_return": bench_lend_return,
+    "get_books_by_user": bench_get_books_by_user,
+    "get_books_by_user_loan_heavy": bench_get_books_by_user_loan_heavy,
+    "search_by_title": _bench_search(SearchByTitle()),
+    "search_by_author": _bench_search(SearchByAuthor()),
+    "search_by_genre": _bench_search(SearchByGenre()),
+    "notify_all": bench_notify_all,
+}
+
+
+def run(sizes=DEFAULT_SIZES, names=None, repeat=3):
+    """Вимірює операції на кожному розмірі і повертає звіт (словник для JSON).
+
+    Для кожної операції береться найкращий з repeat запусків, щоб зменшити
+    вплив шуму системи.
+    """
+    results = []
+    for name in names or BENCHMARKS:
+        for size in sizes:
+            ops, seconds = min((BENCHMARKS[name](size) for _ in range(repeat)),
+                               key=lambda measured: measured[1] / measured[0])
+            results.append({
+                "name": name,
+                "size": size,
+                "ops": ops,
+                "seconds": seconds,
+                "ns_per_op": seconds / ops * 1e9,
+                "ops_per_sec": ops / seconds if seconds else float("inf"),
+            })
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.2):
+    """Порівнює два звіти.
+
+    Повертає список (назва, розмір, старе нс/оп, нове нс/оп, зміна, регресія),
+    де зміна — відносна різниця часу операції, а регресія — чи перевищує
+    сповільнення поріг threshold. Операції, яких немає в обох звітах, пропускаються.
+    """
+    old = {(entry["name"], entry["size"]): entry["ns_per_op"] for entry in baseline["results"]}
+    rows = []
+    for entry in current["results"]:
+        key = (entry["name"], entry["size"])
+        if key not in old:
+            continue
+        before, after = old[key], entry["ns_per_op"]
+        change = after / before - 1 if before else 0.0
+        rows.append((*key, before, after, change, change > threshold))
+    return rows
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="виміряти і записати JSON")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    run_parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS))
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--output", help="файл звіту (типово — стандартний вивід)")
+    compare_parser = commands.add_parser("compare", help="порівняти два звіти")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run(args.sizes, args.only, args.repeat)
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as file:
+                file.write(text + "\n")
+        else:
+            print(text)
+        return 0
+
+    rows = compare(_load(args.baseline), _load(args.current), args.threshold)
+    for name, size, before, after, change, regressed in rows:
+        mark = "РЕГРЕСІЯ" if regressed else ""
+        print(f"{name:>28} {size:>9}: {before:12.0f} → {after:12.0f} нс/оп "
+              f"({change:+.1%}) {mark}")
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+Генератор синтетичних даних для вимірювань: каталог книг, користувачі та видачі.
+Розподіл авторів і жанрів нерівномірний, як у реальному каталозі: жанрів
+кілька, а авторів приблизно в 50 разів менше, ніж книг.
+"""
+
+import random
+
+from library_project.models import Book
+from library_project.models.user import UserFactory
+from library_project.patterns.singleton import SingletonMeta
+from library_project.services.library import LibraryService
+
+GENRES = ["Роман", "Поезія", "Фантастика", "Детектив", "Історія", "Наука"]
+
+
+def generate_records(count, seed=42):
+    """Генерує записи (назва, автор, жанр) з повторюваними авторами й жанрами.
+
+    Рядки будуються заново для кожного запису, як при читанні з файлу,
+    тому однакові автори та жанри не є спільними об'єктами.
+    """
+    rng = random.Random(seed)
+    authors = max(1, count // 50)
+    for i in range(count):
+        yield (
+            f"Книга {i} {rng.randrange(10 ** 6)}",
+            f"Автор {rng.randrange(authors)}",
+            f"{rng.choice(GENRES)}",
+        )
+
+
+def generate_books(count, seed=42):
+    """Повертає список книг синтетичного каталогу."""
+    return [Book(*record) for record in generate_records(count, seed)]
+
+
+def generate_users(count, librarians=0.05, seed=42):
+    """Повертає список користувачів, серед яких частка librarians — бібліотекарі."""
+    rng = random.Random(seed)
+    return [
+        UserFactory.create_user("librarian" if rng.random() < librarians else "reader", f"User {i}")
+        for i in range(count)
+    ]
+
+
+def generate_loans(books, users, share=0.1, seed=42):
+    """Повертає пари (книга, користувач) для частки share каталогу."""
+    rng = random.Random(seed)
+    lent = rng.sample(books, int(len(books) * share))
+    return [(book, rng.choice(users)) for book in lent]
+
+
+def fresh_service():
+    """Повертає новий екземпляр LibraryService замість спільного синглтона."""
+    SingletonMeta._instances.pop(LibraryService, None)
+    return LibraryService()
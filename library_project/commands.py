@@ -0,0 +1,279 @@
+"""
+Модуль команд бібліотеки для сценаріїв, мережевого сервера та меню.
+
+Команда — словник {"command": назва, ...аргументи}, наприклад
+{"command": "lend", "title": "Кобзар", "author": "Тарас Шевченко"}.
+Обробники команд спільні для пакетного режиму, сервера (server.py)
+та інтерактивних меню main.py, а CommandProcessor додатково збирає
+статистику пропускної здатності та затримок для кожного типу команд.
+"""
+
+import json
+import logging
+import time
+
+from library_project.models import Book
+from library_project.models.user import UserFactory, Librarian
+from library_project.patterns.cache import CachedSearch
+from library_project.patterns.fuzzy import SearchFuzzy
+from library_project.patterns.strategy import SearchByTitle, SearchByAuthor, SearchByGenre
+from library_project.services.library import (
+    LibraryError, BookNotFoundError, UserNotFoundError
+)
+
+logger = logging.getLogger(__name__)
+
+SEARCH_STRATEGIES = {
+    "title": SearchByTitle,
+    "author": SearchByAuthor,
+    "genre": SearchByGenre,
+    "fuzzy": SearchFuzzy,
+}
+
+
+class CommandError(LibraryError):
+    """Виключення для невідомої або недозволеної команди."""
+
+
+class Session:
+    """Стан одного клієнта: користувач, що увійшов у систему."""
+
+    def __init__(self, user=None):
+        self.user = user
+
+
+def _user_info(user):
+    return {"name": user.name, "role": UserFactory.role_of(user)}
+
+
+def _require_user(session, user_class=None):
+    if session.user is None:
+        raise CommandError("Спочатку увійдіть або зареєструйтесь")
+    if user_class is not None and not isinstance(session.user, user_class):
+        raise CommandError("Команда недоступна для цієї ролі")
+    return session.user
+
+
+def _text(**fields):
+    """Перевіряє, що текстові аргументи команди є рядками (JSON дозволяє будь-які типи)."""
+    for name, value in fields.items():
+        if not isinstance(value, str):
+            raise TypeError(f"Аргумент {name} має бути рядком")
+
+
+def _book(service, title, author):
+    _text(title=title, author=author)
+    book = service.find_book(title, author)
+    if book is None:
+        raise BookNotFoundError("Такої книги немає в бібліотеці")
+    return book
+
+
+def strategy_for(service, field):
+    """Повертає стратегію пошуку за полем (title, author, genre або fuzzy).
+
+    Якщо в сервісі ввімкнено кеш пошуку, стратегія за полем обгортається CachedSearch.
+    """
+    strategy_class = SEARCH_STRATEGIES.get(field)
+    if strategy_class is None:
+        raise CommandError(f"Невідоме поле пошуку: {field}")
+    strategy = strategy_class()
+    if service.search_cache is not None and hasattr(strategy, "field"):
+        strategy = CachedSearch(strategy, service.search_cache)
+    return strategy
+
+
+def register(service, session, name, role):
+    """Реєструє користувача і входить від його імені."""
+    _text(name=name, role=role)
+    user = UserFactory.create_user(role, name)
+    service.register_user(user)
+    session.user = user
+    return _user_info(user)
+
+
+def login(service, session, name, role):
+    """Входить від імені зареєстрованого користувача."""
+    _text(name=name, role=role)
+    user = service.find_user(name, role)
+    if user is None:
+        raise UserNotFoundError("Такого користувача немає в бібліотеці")
+    session.user = user
+    return _user_info(user)
+
+
+def logout(_service, session):
+    """Виходить з облікового запису."""
+    session.user = None
+
+
+def add_book(service, session, title, author, genre=""):
+    """Додає книгу (лише для бібліотекаря)."""
+    _require_user(session, Librarian)
+    _text(title=title, author=author, genre=genre)
+    book = Book(title, author, genre)
+    service.add_book(book)
+    return book.to_dict()
+
+
+def lend(service, session, title, author):
+    """Видає книгу користувачу, що увійшов."""
+    user = _require_user(session)
+    book = _book(service, title, author)
+    service.lend_book(book, user)
+    return book.to_dict()
+
+
+def return_book(service, session, title, author):
+    """Повертає книгу користувача, що увійшов."""
+    user = _require_user(session)
+    book = _book(service, title, author)
+    service.return_book(book, user)
+    return book.to_dict()
+
+
+def reserve(service, session, title, author):
+    """Ставить користувача, що увійшов, у чергу на видану книгу; повертає місце в черзі."""
+    user = _require_user(session)
+    book = _book(service, title, author)
+    service.reserve_book(book, user)
+    return {"position": service.circulation.waiting(book).index(user) + 1}
+
+
+def search(service, _session, query, field="title", limit=20, offset=0):
+    """Повертає до limit знайдених книг як словники."""
+    _text(query=query, field=field)
+    strategy = strategy_for(service, field)
+    return [book.to_dict() for book in service.iter_search(strategy, query, limit, offset)]
+
+
+COMMANDS = {
+    "register": register,
+    "login": login,
+    "logout": logout,
+    "add_book": add_book,
+    "lend": lend,
+    "return": return_book,
+    "reserve": reserve,
+    "search": search,
+}
+
+
+class CommandStats:
+    """Кількість, помилки та затримки виконаних команд за типами."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._durations = {}  # {команда: [тривалість у секундах]}
+        self._errors = {}  # {команда: кількість помилок}
+
+    def record(self, command, seconds, ok=True):
+        """Записує виконання команди."""
+        self._durations.setdefault(command, []).append(seconds)
+        if not ok:
+            self._errors[command] = self._errors.get(command, 0) + 1
+
+    def report(self):
+        """Повертає звіт: загальна пропускна здатність і затримки кожної команди в мс."""
+        elapsed = time.perf_counter() - self.started
+        commands = {}
+        total = 0
+        for command, durations in sorted(self._durations.items()):
+            ordered = sorted(durations)
+            total += len(ordered)
+            commands[command] = {
+                "count": len(ordered),
+                "errors": self._errors.get(command, 0),
+                "busy_ops_per_sec": len(ordered) / sum(ordered) if sum(ordered) else None,
+                "mean_ms": sum(ordered) / len(ordered) * 1e3,
+                "p50_ms": _percentile(ordered, 0.5) * 1e3,
+                "p95_ms": _percentile(ordered, 0.95) * 1e3,
+                "p99_ms": _percentile(ordered, 0.99) * 1e3,
+                "max_ms": ordered[-1] * 1e3,
+            }
+        return {
+            "commands": total,
+            "elapsed_s": elapsed,
+            "ops_per_sec": total / elapsed if elapsed else None,
+            "by_command": commands,
+        }
+
+
+def _percentile(ordered, share):
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+class CommandProcessor:
+    """Виконує команди над сервісом і збирає статистику.
+
+    Аргументи:
+        service: Екземпляр LibraryService
+        stats (CommandStats): Спільна статистика або None — нова
+    """
+
+    def __init__(self, service, stats=None):
+        self.service = service
+        self.stats = stats if stats is not None else CommandStats()
+
+    def execute(self, session, request):
+        """Виконує команду-словник і повертає відповідь-словник.
+
+        Крім команд з COMMANDS, приймає {"command": "stats"} — звіт статистики.
+
+        Повертає:
+            dict: {"ok": True, "result": ...} або
+                {"ok": False, "error": тип виключення, "message": текст};
+                непередбачені виключення також записуються в журнал (logging)
+        """
+        started = time.perf_counter()
+        name = request.get("command") if isinstance(request, dict) else None
+        if name == "stats":
+            return {"ok": True, "result": self.stats.report()}
+        try:
+            handler = COMMANDS.get(name)
+            if handler is None:
+                raise CommandError(f"Невідома команда: {name}")
+            arguments = {key: value for key, value in request.items() if key != "command"}
+            response = {"ok": True, "result": handler(self.service, session, **arguments)}
+        except (LibraryError, ValueError, TypeError) as error:
+            response = {"ok": False, "error": type(error).__name__, "message": str(error)}
+        except Exception as error:  # pylint: disable=broad-except
+            # Збій сервісу (наприклад, переповнена черга сповіщень) не має
+            # обривати з'єднання клієнта без відповіді.
+            logger.exception("Помилка виконання команди %s", name)
+            response = {"ok": False, "error": type(error).__name__, "message": str(error)}
+        self.stats.record(name if isinstance(name, str) and name in COMMANDS else "invalid",
+                          time.perf_counter() - started, response["ok"])
+        return response
+
+    def execute_line(self, session, line):
+        """Виконує команду з JSON-рядка; пошкоджений рядок дає відповідь з помилкою."""
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            self.stats.record("invalid", 0.0, ok=False)
+            return {"ok": False, "error": "ValueError", "message": str(error)}
+        return self.execute(session, request)
+
+
+def run_batch(service, lines, output=None, stats=None):
+    """Виконує послідовність JSON-рядків команд від імені одного клієнта.
+
+    Аргументи:
+        service: Екземпляр LibraryService
+        lines: Ітероване джерело рядків (файл, sys.stdin, список)
+        output: Файл для JSON-рядків відповідей або None
+        stats (CommandStats): Статистика для накопичення або None — нова
+
+    Повертає:
+        CommandStats: Статистика виконання
+    """
+    processor = CommandProcessor(service, stats)
+    session = Session()
+    for line in lines:
+        if not line.strip():
+            continue
+        response = processor.execute_line(session, line)
+        if output is not None:
+            output.write(json.dumps(response, ensure_ascii=False) + "\n")
+    return processor.stats
@@ -2,16 +2,24 @@
 
 Цей модуль надає інтерфейс командного рядка для системи бібліотеки,
 обробляючи взаємодію з користувачем, управління книгами та системні операції.
+Меню виконують дії через спільні обробники модуля commands, які також
+використовують пакетний режим (--batch) і мережевий сервер (--serve).
 """
 
-from library_project.services.library import LibraryService
-from library_project.models import Book
-from library_project.models.user import UserFactory, Librarian
-from library_project.patterns.strategy import (
-    SearchByTitle,
-    SearchByAuthor,
-    SearchByGenre
+import argparse
+import json
+import sys
+from contextlib import ExitStack
+from itertools import islice
+
+from library_project import commands
+from library_project.services.library import (
+    LibraryService, LibraryError, BookUnavailableError
 )
+from library_project.models.user import Librarian
+from library_project.server import serve
+
+PAGE_SIZE = 20
 
 
 class NotificationPrinter:
@@ -39,16 +47,49 @@ def choose_from_list(items, item_name):
     if not items:
         print(f"Немає доступних {item_name}.")
         return None
-    print(f"Оберіть {item_name}:")
-    for idx, item in enumerate(items, 1):
-        print(f"{idx}. {item}")
+    offset = 0
     while True:
-        choice = input(f"Введіть номер {item_name} (або 'q' для відміни): ")
-        if choice.lower() == 'q':
+        page = items[offset:offset + PAGE_SIZE]
+        print(f"Оберіть {item_name}:")
+        for idx, item in enumerate(page, offset + 1):
+            print(f"{idx}. {item}")
+        has_next = offset + PAGE_SIZE < len(items)
+        hint = "'n' — наступна сторінка, " if has_next else ""
+        hint += "'p' — попередня, " if offset else ""
+        choice = input(f"Введіть номер {item_name} ({hint}'q' для відміни): ").lower()
+        if choice == 'q':
             return None
-        if choice.isdigit() and 1 <= int(choice) <= len(items):
+        if choice == 'n' and has_next:
+            offset += PAGE_SIZE
+        elif choice == 'p' and offset:
+            offset -= PAGE_SIZE
+        elif choice.isdigit() and offset < int(choice) <= offset + len(page):
             return items[int(choice) - 1]
-        print("Невірний вибір, спробуйте ще.")
+        else:
+            print("Невірний вибір, спробуйте ще.")
+
+
+def print_paged(items, render, header, empty_message):
+    """Виводить елементи посторінково, не будуючи повного списку.
+
+    Аргументи:
+        items: Ітератор елементів
+        render: Функція, що повертає рядок для елемента
+        header: Заголовок перед першою сторінкою
+        empty_message: Повідомлення, якщо елементів немає
+    """
+    items = iter(items)
+    page = list(islice(items, PAGE_SIZE))
+    if not page:
+        print(empty_message)
+        return
+    print(header)
+    while page:
+        for item in page:
+            print(render(item))
+        page = list(islice(items, PAGE_SIZE))
+        if page and input("Enter — наступна сторінка, 'q' — завершити: ").lower() == 'q':
+            return
 
 
 def display_book_status(book, service):
@@ -56,14 +97,15 @@ def display_book_status(book, service):
 
     Аргументи:
         book: Об'єкт книги
-        service: Екземпляр LibraryService
+        service: Екземпляр LibraryService або його знімок (LibrarySnapshot)
 
     Повертає:
         Форматований рядок стану
     """
-    if book not in service.lent_books:
+    user = service.lent_books.get(book)
+    if user is None:
         return f"- {book} (вільна)"
-    return f"- {book} (видана користувачу {service.lent_books[book].name})"
+    return f"- {book} (видана користувачу {user.name})"
 
 
 def search_books(service):
@@ -77,26 +119,44 @@ def search_books(service):
     print("1. За назвою")
     print("2. За автором")
     print("3. За жанром")
+    print("4. За назвою або автором з помилками")
     choice = input("Введіть номер: ")
 
-    if choice not in ('1', '2', '3'):
+    if choice not in ('1', '2', '3', '4'):
         print("Невірний вибір")
         return
 
-    query = input("Введіть пошуковий запит: ")
-    strategies = {
-        '1': SearchByTitle(),
-        '2': SearchByAuthor(),
-        '3': SearchByGenre()
-    }
+    query = input("Введіть пошуковий запит (початок слова з '*' — підказки): ")
+    if query.endswith("*") and service.autocomplete is not None:
+        query = choose_from_list(service.autocomplete.complete(query[:-1]), "підказку")
+        if query is None:
+            return
+    fields = {'1': "title", '2': "author", '3': "genre", '4': "fuzzy"}
+    strategy = commands.strategy_for(service, fields[choice])
+    # Сторінки переглядаються зі знімка, тож результати не зсуваються
+    # від видач і змін каталогу, поки користувач гортає.
+    snapshot = service.snapshot()
+    print_paged(snapshot.iter_search(strategy, query),
+                lambda book: display_book_status(book, snapshot),
+                "Знайдені книги:", "Книги не знайдено.")
 
-    results = strategies[choice].search(service.books, query)
-    if not results:
-        print("Книги не знайдено.")
-    else:
-        print("Знайдені книги:")
-        for book in results:
-            print(display_book_status(book, service))
+
+def show_statistics(aggregates):
+    """Виводить показники каталогу: наявні книги за жанрами та найпопулярніші книги.
+
+    Аргументи:
+        aggregates: Екземпляр CatalogAggregates
+    """
+    totals = aggregates.totals()
+    print(f"Книг: {totals['books']}, видано: {totals['lent']}, "
+          f"вільних: {totals['available']}")
+    for genre, counts in sorted(aggregates.by_genre().items()):
+        print(f"- {genre or 'без жанру'}: {counts['available']} з {counts['books']} вільні")
+    top = aggregates.most_borrowed()
+    if top:
+        print("Найпопулярніші книги:")
+        for title, author, loans in top:
+            print(f"- '{title}' автор: {author} — видач: {loans}")
 
 
 def register_user(service):
@@ -116,12 +176,12 @@ def register_user(service):
         print("Невідома роль. Спробуйте ще.")
         return None
 
+    session = commands.Session()
     try:
-        user = UserFactory.create_user(role, name)
-        service.register_user(user)
+        commands.register(service, session, name=name, role=role)
         print(f"Користувача {name} з роллю {role} зареєстровано.")
-        return user
-    except ValueError as e:
+        return session.user
+    except (LibraryError, ValueError) as e:
         print("Помилка:", e)
         return None
 
@@ -160,6 +220,7 @@ def handle_librarian_menu(service, librarian):
     print("1. Додати книгу")
     print("2. Показати всі книги")
     print("3. Показати всіх користувачів")
+    print("4. Показати статистику")
     print("0. Вийти з аккаунту")
 
     choice = input("Виберіть опцію: ")
@@ -169,26 +230,23 @@ def handle_librarian_menu(service, librarian):
         author = input("Введіть автора книги: ")
         genre = input("Введіть жанр книги: ")
         try:
-            service.add_book(Book(title, author, genre))
+            commands.add_book(service, commands.Session(librarian),
+                              title=title, author=author, genre=genre)
             print("Книгу додано.")
-        except ValueError as e:
+        except (LibraryError, ValueError) as e:
             print("Помилка:", e)
 
     elif choice == '2':
-        if not service.books:
-            print("Книги відсутні.")
-        else:
-            print("Книги в бібліотеці:")
-            for book in service.books:
-                print(display_book_status(book, service))
+        snapshot = service.snapshot()
+        print_paged(snapshot.iter_books(), lambda book: display_book_status(book, snapshot),
+                    "Книги в бібліотеці:", "Книги відсутні.")
 
     elif choice == '3':
-        if not service.users:
-            print("Користувачі відсутні.")
-        else:
-            print("Зареєстровані користувачі:")
-            for user in service.users:
-                print(f"- {user}")
+        print_paged(service.iter_users(), lambda user: f"- {user}",
+                    "Зареєстровані користувачі:", "Користувачі відсутні.")
+
+    elif choice == '4' and service.aggregates is not None:
+        show_statistics(service.aggregates)
 
     elif choice == '0':
         print(f"Вихід з аккаунту {librarian.name}")
@@ -220,9 +278,21 @@ def handle_reader_menu(service, reader):
     if choice == '1':
         book = choose_from_list(service.books, "книгу")
         if book:
+            session = commands.Session(reader)
             try:
-                service.lend_book(book, reader)
-            except ValueError as e:
+                commands.lend(service, session, title=book.title, author=book.author)
+            except BookUnavailableError as e:
+                if (service.circulation is None
+                        or input("Книга зайнята. Зарезервувати? (y/n): ").lower() != 'y'):
+                    print("Помилка:", e)
+                    return reader
+                try:
+                    result = commands.reserve(service, session,
+                                              title=book.title, author=book.author)
+                    print(f"Ви {result['position']}-й у черзі на книгу.")
+                except (LibraryError, ValueError) as error:
+                    print("Помилка:", error)
+            except (LibraryError, ValueError) as e:
                 print("Помилка:", e)
 
     elif choice == '2':
@@ -233,17 +303,15 @@ def handle_reader_menu(service, reader):
             book = choose_from_list(user_books, "книгу для повернення")
             if book:
                 try:
-                    service.return_book(book, reader)
-                except ValueError as e:
+                    commands.return_book(service, commands.Session(reader),
+                                         title=book.title, author=book.author)
+                except (LibraryError, ValueError) as e:
                     print("Помилка:", e)
 
     elif choice == '3':
-        if not service.books:
-            print("Книги відсутні.")
-        else:
-            print("Книги в бібліотеці:")
-            for book in service.books:
-                print(display_book_status(book, service))
+        snapshot = service.snapshot()
+        print_paged(snapshot.iter_books(), lambda book: display_book_status(book, snapshot),
+                    "Книги в бібліотеці:", "Книги відсутні.")
 
     elif choice == '4':
         books = service.get_books_by_user(reader)
@@ -293,13 +361,32 @@ def handle_unauthenticated_menu(service):
     return None
 
 
-def main():
-    """Головна точка входу додатку."""
-    service = LibraryService()
+def run_batch(service, source, output):
+    """Виконує команди з файлу або stdin ("-") і виводить звіт у stderr.
+
+    Аргументи:
+        service: Екземпляр LibraryService
+        source (str): Шлях до файлу JSON-рядків команд або "-"
+        output (str): Шлях для відповідей, "-" — stdout, None — не зберігати
+    """
+    with ExitStack() as files:
+        lines = sys.stdin if source == "-" else files.enter_context(open(source, encoding="utf-8"))
+        out = None
+        if output == "-":
+            out = sys.stdout
+        elif output:
+            out = files.enter_context(open(output, "w", encoding="utf-8"))
+        stats = commands.run_batch(service, lines, out)
+    print(json.dumps(stats.report(), ensure_ascii=False, indent=2), file=sys.stderr)
+
+
+def interactive(service):
+    """Запускає інтерактивні меню."""
     service.add_observer(NotificationPrinter())
     current_user = None
 
     while True:
+        service.process_due()
         if current_user is None:
             current_user = handle_unauthenticated_menu(service)
         else:
@@ -309,5 +396,37 @@ def main():
                 current_user = handle_reader_menu(service, current_user)
 
 
+def main(argv=None):
+    """Головна точка входу додатку.
+
+    Без аргументів запускає інтерактивні меню; --batch виконує команди
+    з файлу, --serve запускає мережевий сервер (див. commands і server).
+    """
+    parser = argparse.ArgumentParser(description="Система управління бібліотекою")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--batch", metavar="FILE",
+                      help="виконати JSON-рядки команд з файлу ('-' — stdin)")
+    mode.add_argument("--serve", metavar="PORT", type=int,
+                      help="запустити сервер JSON-рядків на порту")
+    parser.add_argument("--host", default="127.0.0.1", help="адреса сервера")
+    parser.add_argument("--output", metavar="FILE",
+                        help="файл для відповідей пакетного режиму ('-' — stdout)")
+    args = parser.parse_args(argv)
+
+    service = LibraryService()
+    service.enable_search_cache()
+    service.enable_fuzzy_search()
+    service.enable_autocomplete()
+    service.enable_aggregates()
+    service.enable_circulation()
+    service.enable_snapshots()
+    if args.batch is not None:
+        run_batch(service, args.batch, args.output)
+    elif args.serve is not None:
+        serve(service, args.host, args.serve)
+    else:
+        interactive(service)
+
+
 if __name__ == "__main__":
     main()
@@ -1,2 +1,2 @@
-from .book import Book
+from .book import Book, BookPool
 from .user import User
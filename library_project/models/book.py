@@ -1,17 +1,62 @@
 """Модуль, що містить модель книги для бібліотечного сервісу."""
 
+import hashlib
+import sys
+import threading
+import weakref
+
+
+def book_id(title, author):
+    """Повертає сталий ідентифікатор книги за назвою та автором.
+
+    Ідентифікатор — 16 шістнадцяткових цифр хешу BLAKE2b, однаковий
+    у різних процесах і не залежить від жанру.
+    """
+    key = f"{title}\x00{author}".encode()
+    return hashlib.blake2b(key, digest_size=8).hexdigest()
+
 
 class Book:
-    """Клас, що представляє книгу з назвою, автором та жанром."""
+    """Клас, що представляє книгу з назвою, автором та жанром.
+
+    Атрибути зберігаються у __slots__, а значення автора та жанру
+    інтернуються, тож однакові рядки в каталозі не дублюються.
+    Книги з однаковими назвою та автором рівні й мають однаковий
+    ідентифікатор id (див. book_id), навіть якщо це різні об'єкти.
+    """
+
+    __slots__ = ("title", "author", "genre", "__weakref__")
 
     def __init__(self, title, author, genre=""):
         self.title = title
-        self.author = author
-        self.genre = genre
+        self.author = sys.intern(author)
+        self.genre = sys.intern(genre)
 
     def __str__(self):
         return f"'{self.title}' автор: {self.author}, жанр: {self.genre}"
 
+    def __repr__(self):
+        return f"Book({self.title!r}, {self.author!r}, {self.genre!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Book):
+            return NotImplemented
+        return self.title == other.title and self.author == other.author
+
+    def __hash__(self):
+        return hash((self.title, self.author))
+
+    @property
+    def id(self):
+        """Сталий ідентифікатор книги (book_id від назви та автора).
+
+        Не кешується, щоб не додавати слот кожній книзі: кожне звернення
+        обчислює BLAKE2b (близько мікросекунди), тож у циклах його варто
+        брати один раз. Для порівняння книг достатньо == і hash — вони
+        використовують той самий ключ (назва, автор).
+        """
+        return book_id(self.title, self.author)
+
     def to_dict(self):
         """Повертає словникове представлення книги."""
         return {
@@ -19,3 +64,49 @@ class Book:
             "author": self.author,
             "genre": self.genre
         }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Створює книгу зі словника у форматі to_dict.
+
+        Породжує:
+            KeyError: Якщо немає назви або автора
+            TypeError: Якщо значення полів не є рядками
+        """
+        fields = (data["title"], data["author"], data.get("genre", ""))
+        if not all(isinstance(value, str) for value in fields):
+            raise TypeError("Поля книги мають бути рядками")
+        return cls(*fields)
+
+
+class BookPool:
+    """Пул-легковаговик книг: для однакових записів повертає той самий екземпляр.
+
+    Книга визначається назвою та автором; жанр береться з першого
+    запису. Пул тримає слабкі посилання, тож книга, яку ніхто не
+    використовує, звільняється.
+    """
+
+    def __init__(self):
+        self._books = weakref.WeakValueDictionary()  # {(назва, автор): Book}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._books)
+
+    def get(self, title, author, genre=""):
+        """Повертає книгу з пулу, створюючи її за потреби."""
+        with self._lock:
+            book = self._books.get((title, author))
+            if book is None:
+                book = self._books[(title, author)] = Book(title, author, genre)
+            return book
+
+    def add(self, book):
+        """Повертає книгу пулу, рівну book; якщо такої немає, book стає нею."""
+        with self._lock:
+            return self._books.setdefault((book.title, book.author), book)
+
+    def from_dict(self, data):
+        """Як Book.from_dict, але повертає книгу з пулу."""
+        return self.add(Book.from_dict(data))
@@ -4,6 +4,8 @@
 class User:
     """Базовий клас користувача з іменем та методом сповіщення."""
 
+    __slots__ = ("name",)
+
     def __init__(self, name):
         """Ініціалізує користувача з ім’ям."""
         self.name = name
@@ -21,6 +23,9 @@ class User:
 
 class Reader(User):
     """Клас читача, успадковує поведінку базового користувача."""
+
+    __slots__ = ()
+
     def favorite_genre(self):
         """Метод-заглушка для демонстрації публічного API."""
         return "Невідомо"
@@ -28,6 +33,9 @@ class Reader(User):
 
 class Librarian(User):
     """Клас бібліотекаря, успадковує поведінку базового користувача."""
+
+    __slots__ = ()
+
     def permission_level(self):
         """Метод-заглушка для демонстрації публічного API."""
         return "Адміністратор"
@@ -36,6 +44,8 @@ class Librarian(User):
 class UserFactory:
     """Фабрика для створення користувачів відповідно до ролі."""
 
+    ROLES = {"reader": Reader, "librarian": Librarian}
+
     @staticmethod
     def create_user(role, name):
         """Створює екземпляр користувача заданої ролі.
@@ -50,8 +60,33 @@ class UserFactory:
         Породжує:
             ValueError: Якщо роль невідома
         """
-        if role == "reader":
-            return Reader(name)
-        if role == "librarian":
-            return Librarian(name)
+        return UserFactory.user_class(role)(name)
+
+    @staticmethod
+    def user_class(role):
+        """Повертає клас користувача для заданої ролі.
+
+        Аргументи:
+            role (str): Роль користувача (reader або librarian)
+
+        Повертає:
+            type: Клас Reader або Librarian
+
+        Породжує:
+            ValueError: Якщо роль невідома
+        """
+        if role not in UserFactory.ROLES:
+            raise ValueError("Невідома роль користувача")
+        return UserFactory.ROLES[role]
+
+    @staticmethod
+    def role_of(user):
+        """Повертає назву ролі користувача (зворотне до user_class).
+
+        Породжує:
+            ValueError: Якщо клас користувача не відповідає жодній ролі
+        """
+        for role, user_class in UserFactory.ROLES.items():
+            if user.__class__ is user_class:
+                return role
         raise ValueError("Невідома роль користувача")
@@ -1,3 +1,7 @@
 from .singleton import SingletonMeta
-from .observer import Notifier
+from .observer import Notifier, AsyncDispatcher
 from .strategy import SearchByTitle, SearchByAuthor, SearchByGenre
+from .vectorized import VectorizedSearch
+from .cache import SearchCache, CachedSearch
+from .fuzzy import SearchFuzzy
+from .parallel import ParallelSearch, SearchExecutor
@@ -0,0 +1,198 @@
+"""Модуль кешу результатів пошуку для стратегій пошуку книг.
+
+SearchCache підключається до списку книг як індекс (методи add, discard,
+rebuild), тож при додаванні чи видаленні книги з кешу видаляються лише ті
+записи, які ця книга могла змінити. CachedSearch — обгортка над стратегією,
+що звертається до кешу перед пошуком.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+from library_project.patterns.strategy import SearchStrategy
+
+
+class SearchCache:
+    """Обмежений LRU-кеш результатів пошуку з необов'язковим TTL.
+
+    Ключ запису — (поле, запит у нижньому регістрі). Записи розкладені
+    за кошиками (поле, триграма запиту — найменш заповнений на момент
+    збереження; короткий запит — сам запит): книга може змінити
+    результат запиту, лише якщо її поле містить цю триграму, тож зміна
+    каталогу перевіряє тільки кошики підрядків довжиною 1–3 її полів,
+    а не весь кеш. Короткий журнал останніх змін дозволяє
+    put відкинути лише ті результати, на які вплинула зміна під час
+    пошуку.
+
+    Аргументи:
+        maxsize (int): Максимальна кількість записів.
+        ttl (float): Час життя запису в секундах (None — без обмеження).
+        clock: Функція поточного часу (для тестів).
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.source = None
+        self._entries = OrderedDict()  # {(поле, запит): (термін дії, результат, кошик)}
+        self._buckets = {}  # {(поле, триграма запиту): {ключ: None}}
+        self._fields = set()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._changes = deque(maxlen=256)  # (покоління, книга) останніх змін каталогу
+        self._floor = 0  # Результати, початі до цього покоління, не зберігаються
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Повертає збережений результат або None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= self.clock():
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self):
+        """Повертає лічильник змін каталогу (для відкидання застарілих результатів)."""
+        return self._generation
+
+    def put(self, key, result, generation):
+        """Зберігає результат, якщо зміни каталогу після generation не зачепили запит key."""
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            if self._changed_since(key, generation):
+                return
+            entry = self._entries.get(key)
+            if entry is None:
+                bucket = self._bucket(key)
+                self._buckets.setdefault(bucket, {})[key] = None
+                self._fields.add(key[0])
+            else:
+                bucket = entry[2]
+            self._entries[key] = (expires, result, bucket)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _changed_since(self, key, generation):
+        if generation < self._floor:
+            return True
+        changes = self._changes
+        if changes and changes[0][0] > generation + 1:
+            return True  # Журнал уже не містить усіх змін після generation
+        field, query = key
+        for changed, book in reversed(changes):
+            if changed <= generation:
+                break
+            if query in getattr(book, field).lower():
+                return True
+        return False
+
+    def _bucket(self, key):
+        field, query = key
+        if len(query) <= 3:
+            return field, query
+        trigrams = {query[start:start + 3] for start in range(len(query) - 2)}
+        return min(((field, trigram) for trigram in trigrams),
+                   key=lambda bucket: len(self._buckets.get(bucket, ())))
+
+    def _drop(self, key):
+        bucket = self._entries.pop(key)[2]
+        keys = self._buckets[bucket]
+        del keys[key]
+        if not keys:
+            del self._buckets[bucket]
+
+    def _invalidate(self, book):
+        with self._lock:
+            self._generation += 1
+            self._changes.append((self._generation, book))
+            stale = []
+            for field in self._fields:
+                value = getattr(book, field).lower()
+                grams = {value[start:start + size]
+                            for size in (1, 2, 3) for start in range(len(value) - size + 1)}
+                grams.add("")
+                for gram in grams:
+                    keys = self._buckets.get((field, gram))
+                    if keys:
+                        stale.extend(key for key in keys if key[1] in value)
+            for key in stale:
+                self._drop(key)
+            self.invalidations += len(stale)
+
+    def add(self, book):
+        """Видаляє записи, до результатів яких має потрапити нова книга."""
+        self._invalidate(book)
+
+    def discard(self, book):
+        """Видаляє записи, у результатах яких могла бути видалена книга."""
+        self._invalidate(book)
+
+    def rebuild(self, books):
+        """Повністю очищає кеш після масової зміни каталогу."""
+        with self._lock:
+            self._generation += 1
+            self._floor = self._generation
+            self._changes.clear()
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self):
+        """Повертає статистику кешу для вибору його розміру."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+class CachedSearch(SearchStrategy):
+    """Стратегія-обгортка, що кешує результати пошуку за полем.
+
+    Кеш використовується лише для списку книг, до якого він підключений
+    (cache.source); для інших списків пошук виконується напряму.
+
+    Аргументи:
+        strategy: Стратегія з атрибутом field (SearchByTitle тощо).
+        cache (SearchCache): Спільний кеш.
+    """
+
+    def __init__(self, strategy, cache):
+        self.strategy = strategy
+        self.field = strategy.field
+        self.cache = cache
+
+    def search(self, books, value):
+        """Повертає результат з кешу або виконує пошук і кешує його."""
+        if books is not self.cache.source:
+            return self.strategy.search(books, value)
+        key = (self.field, value.lower())
+        result = self.cache.get(key)
+        if result is None:
+            generation = self.cache.generation()
+            result = self.strategy.search(books, value)
+            self.cache.put(key, result, generation)
+        return list(result)
@@ -0,0 +1,144 @@
+"""Модуль типізованих подій бібліотеки для системи сповіщень.
+
+Подія зберігає лише посилання на учасників (книгу, користувача, кількість),
+а текст повідомлення формується за шаблоном під час першого звернення
+до message, тож подія без зацікавлених спостерігачів нічого не форматує.
+"""
+
+
+class Event:
+    """Базова подія: тип, атрибути та ліниве текстове повідомлення.
+
+    Атрибути:
+        type (str): Тип події для маршрутизації підписок.
+        template (str): Шаблон повідомлення для str.format з атрибутами події.
+    """
+
+    type = "message"
+    template = "{text}"
+
+    __slots__ = ("attributes", "_message")
+
+    def __init__(self, **attributes):
+        self.attributes = attributes
+        self._message = None
+
+    @property
+    def message(self):
+        """Текст повідомлення (формується один раз при першому зверненні)."""
+        if self._message is None:
+            self._message = self.template.format(**self.attributes)
+        return self._message
+
+    def get(self, name, default=None):
+        """Повертає атрибут події або однойменне поле її книги чи користувача.
+
+        Наприклад, для BookAdded get("genre") повертає жанр доданої книги.
+        """
+        if name in self.attributes:
+            return self.attributes[name]
+        for value in self.attributes.values():
+            field = getattr(value, name, default)
+            if field is not default:
+                return field
+        return default
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.attributes!r})"
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.attributes == other.attributes
+
+    def __hash__(self):
+        return hash(self.type)
+
+
+class Message(Event):
+    """Довільне текстове повідомлення (Notifier.notify_all з рядком)."""
+
+
+class BookAdded(Event):
+    """Книгу додано до каталогу."""
+
+    type = "book_added"
+    template = "Додано книгу '{book.title}' автора {book.author}"
+
+
+class BookRemoved(Event):
+    """Книгу видалено з каталогу."""
+
+    type = "book_removed"
+    template = "Видалено книгу '{book.title}' автора {book.author}"
+
+
+class UserRegistered(Event):
+    """Зареєстровано користувача."""
+
+    type = "user_registered"
+    template = "Зареєстровано користувача '{user.name}'"
+
+
+class UserRemoved(Event):
+    """Видалено користувача."""
+
+    type = "user_removed"
+    template = "Видалено користувача '{user.name}'"
+
+
+class BookLent(Event):
+    """Книгу видано користувачу."""
+
+    type = "book_lent"
+    template = "Книга '{book.title}' видана користувачу {user.name}"
+
+
+class BookReturned(Event):
+    """Книгу повернено користувачем."""
+
+    type = "book_returned"
+    template = "Книга '{book.title}' повернена користувачем {user.name}"
+
+
+class BooksImported(Event):
+    """Пакет книг додано масовим імпортом."""
+
+    type = "books_imported"
+    template = "Додано книг: {count}"
+
+
+class UsersImported(Event):
+    """Пакет користувачів зареєстровано масовим імпортом."""
+
+    type = "users_imported"
+    template = "Зареєстровано користувачів: {count}"
+
+
+class BookReserved(Event):
+    """Користувач став у чергу на видану книгу."""
+
+    type = "book_reserved"
+    template = "Книгу '{book.title}' зарезервовано для користувача {user.name}"
+
+
+class ReservationFulfilled(Event):
+    """Повернену книгу видано наступному користувачу з черги."""
+
+    type = "reservation_fulfilled"
+    template = "Зарезервовану книгу '{book.title}' видано користувачу {user.name}"
+
+
+class ReservationExpired(Event):
+    """Резервування не дочекалося книги до свого терміну."""
+
+    type = "reservation_expired"
+    template = "Резервування книги '{book.title}' для користувача {user.name} закінчилося"
+
+
+class LoanOverdue(Event):
+    """Минув термін повернення виданої книги."""
+
+    type = "loan_overdue"
+    template = "Книгу '{book.title}' не повернув вчасно користувач {user.name}"
@@ -0,0 +1,70 @@
+"""Модуль нечіткого пошуку книг з допуском на помилки в запиті.
+
+Якщо до списку книг підключено FuzzySearchIndex (див.
+LibraryService.enable_fuzzy_search), кандидати знаходяться через індекс
+симетричних видалень, інакше каталог переглядається лінійно.
+"""
+
+from library_project.patterns.strategy import SearchStrategy
+from library_project.services.indexes import (
+    FUZZY_FIELDS, FuzzySearchIndex, match_distance, words
+)
+from library_project.services.metrics import instrumented
+
+
+def fuzzy_index_of(books):
+    """Повертає підключений до списку книг FuzzySearchIndex або None."""
+    for index in getattr(books, "indexes", ()):
+        if isinstance(index, FuzzySearchIndex):
+            return index
+    return None
+
+
+class SearchFuzzy(SearchStrategy):
+    """Стратегія пошуку книг за назвою та автором з допуском на помилки.
+
+    Кожне слово запиту має бути схожим на якесь слово поля, а сумарна
+    відстань редагування (вставки, видалення, заміни та перестановки
+    сусідніх літер) — не перевищувати max_distance. Результати
+    впорядковані від найближчих, рівні за відстанню — у порядку каталогу.
+
+    Аргументи:
+        max_distance (int): Допустима кількість помилок у запиті.
+        fields (tuple): Поля пошуку.
+    """
+
+    def __init__(self, max_distance=2, fields=FUZZY_FIELDS):
+        self.max_distance = max_distance
+        self.fields = fields
+
+    def ranked(self, books, value):
+        """Повертає пари (книга, відстань) від найближчих до запиту."""
+        if not words(value):
+            return []
+        index = fuzzy_index_of(books)
+        if index is not None and index.supports(self.fields, self.max_distance):
+            found = index.search(value, self.max_distance, self.fields)
+            search_index = getattr(books, "search_index", None)
+            if search_index is not None:
+                position = search_index.position
+                return sorted(found.items(), key=lambda item: (item[1], position(item[0])))
+            found = {book: found[book] for book in books if book in found}
+        else:
+            found = self._scan(books, value)
+        return sorted(found.items(), key=lambda item: item[1])
+
+    def _scan(self, books, value):
+        query_words = words(value)
+        limit = self.max_distance
+        found = {}
+        for book in books:
+            distance = min(match_distance(query_words, getattr(book, field), limit)
+                           for field in self.fields)
+            if distance <= limit:
+                found[book] = distance
+        return found
+
+    @instrumented("search_fuzzy")
+    def search(self, books, value):
+        """Пошук книг, схожих на запит, від найближчих."""
+        return [book for book, _ in self.ranked(books, value)]
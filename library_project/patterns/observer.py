@@ -1,11 +1,100 @@
 """Модуль, що реалізує патерн спостерігача (Observer) для системи сповіщень."""
 
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+from library_project.patterns.events import Event, Message
+from library_project.services import metrics
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "raise")
+
+
+def log_observer_error(observer, message, error):
+    """Типовий обробник помилок спостерігача: записує їх у журнал."""
+    logger.error("Спостерігач %r не обробив повідомлення %r: %s", observer, message, error)
+
+
+def _call_observer(method, observer, payload, on_error):
+    collector = metrics.active()
+    started = time.perf_counter()
+    try:
+        method(payload)
+    except Exception as error:  # pylint: disable=broad-except
+        if on_error is None:
+            raise
+        on_error(observer, payload, error)
+    if collector is not None:
+        collector.observe_delivery(observer, time.perf_counter() - started)
+
+
+class Subscription:
+    """Підписка на події заданих типів з фільтром за атрибутами.
+
+    Атрибути:
+        handler: Функція handler(event)
+        types (frozenset): Типи подій або None — усі типи
+        filters (dict): Необхідні значення атрибутів події, наприклад {"genre": "Роман"}
+    """
+
+    __slots__ = ("handler", "owner", "types", "filters", "keys")
+
+    def __init__(self, handler, owner, types, filters):
+        self.handler = handler
+        self.owner = owner  # Об'єкт-підписник (для метрик і повідомлень про помилки)
+        self.types = types
+        self.filters = filters
+        self.keys = ()
+
+    def matches(self, event):
+        """Перевіряє фільтр атрибутів для події."""
+        return all(event.get(name, _MISSING) == value for name, value in self.filters.items())
+
+
+_MISSING = object()
+
+
+def _event_types(events):
+    if events is None:
+        return None
+    if isinstance(events, (str, type)):
+        events = (events,)
+    return frozenset(event if isinstance(event, str) else event.type for event in events)
+
+
 class Notifier:
-    """Клас, який управляє списком спостерігачів і надсилає їм сповіщення."""
+    """Клас, який управляє спостерігачами та підписками і надсилає їм події.
+
+    Спостерігачі, додані через add_observer, отримують текст кожної події
+    викликом notify(message). Підписки (subscribe) отримують об'єкти подій
+    лише потрібних типів і з потрібними атрибутами: вони зберігаються в
+    індексі за (тип, атрибут, значення), тож подія торкається тільки
+    підписок, що можуть їй відповідати.
+
+    За замовчуванням сповіщення доставляються синхронно. Якщо задано
+    dispatcher (наприклад, AsyncDispatcher), події лише передаються
+    диспетчеру, а доставку виконує він.
+    """
 
-    def __init__(self):
-        """Ініціалізує порожній список спостерігачів."""
+    def __init__(self, dispatcher=None):
+        """Ініціалізує порожній список спостерігачів.
+
+        Args:
+            dispatcher: Необов'язковий диспетчер з методами submit(notifier, message),
+                flush() та close()
+        """
         self.observers = []
+        self.dispatcher = dispatcher
+        # Маршрути замінюються цілком при кожній зміні підписок,
+        # тож доставка читає їх без блокування.
+        self._routes = {}  # {(тип або None, атрибут або None, значення): [Subscription]}
+        self._attributes = ()  # Атрибути, за якими проіндексовано підписки
+        self._types = frozenset()  # Типи подій з підписками (None — підписки на всі)
+        self._lock = threading.Lock()
 
     def add_observer(self, observer):
         """Додає нового спостерігача, якщо його ще немає в списку.
@@ -25,11 +114,268 @@ class Notifier:
         if observer in self.observers:
             self.observers.remove(observer)
 
+    def subscribe(self, observer, events=None, **filters):
+        """Підписує спостерігача на події.
+
+        Приклад:
+            notifier.subscribe(on_event, BookAdded, genre="Роман")
+
+        Args:
+            observer: Функція observer(event) або об'єкт з методом notify(message),
+                який отримає текст події
+            events: Тип події (рядок або клас події), їх послідовність або None — усі
+            **filters: Значення атрибутів події або її книги/користувача
+
+        Returns:
+            Subscription: Підписка для unsubscribe
+        """
+        if callable(observer):
+            handler = observer
+        else:
+            def handler(event):
+                observer.notify(event.message)
+        subscription = Subscription(handler, observer, _event_types(events), filters)
+        # Індексується за першим фільтром, решта перевіряється при доставці.
+        attribute, value = next(iter(filters.items()), (None, None))
+        subscription.keys = tuple((kind, attribute, value)
+                                  for kind in (subscription.types or (None,)))
+        with self._lock:
+            routes = dict(self._routes)
+            for key in subscription.keys:
+                routes[key] = [*routes.get(key, ()), subscription]
+            self._set_routes(routes)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Скасовує підписку, якщо вона ще діє."""
+        with self._lock:
+            routes = dict(self._routes)
+            for key in subscription.keys:
+                remaining = [item for item in routes.get(key, ()) if item is not subscription]
+                if remaining:
+                    routes[key] = remaining
+                else:
+                    routes.pop(key, None)
+            self._set_routes(routes)
+
+    def _set_routes(self, routes):
+        self._attributes = tuple({key[1] for key in routes if key[1] is not None})
+        self._types = frozenset(key[0] for key in routes)
+        self._routes = routes
+
+    def wants(self, event_type):
+        """Перевіряє, чи може подія цього типу когось зацікавити.
+
+        Args:
+            event_type: Тип події (рядок або клас події)
+        """
+        kind = event_type if isinstance(event_type, str) else event_type.type
+        return bool(self.observers) or kind in self._types or None in self._types
+
+    def emit(self, event_class, **attributes):
+        """Створює і публікує подію, лише якщо на неї є спостерігачі чи підписки."""
+        if self.wants(event_class):
+            self.publish(event_class(**attributes))
+
     def notify_all(self, message):
         """Надсилає сповіщення всім зареєстрованим спостерігачам.
 
         Args:
-            message (str): Повідомлення для розсилки спостерігачам
+            message: Подія або текст повідомлення для розсилки
         """
+        self.publish(message if isinstance(message, Event) else Message(text=message))
+
+    def publish(self, event):
+        """Доставляє подію спостерігачам і підпискам, що їй відповідають.
+
+        Args:
+            event (Event): Подія для розсилки
+        """
+        if self.dispatcher is not None:
+            self.dispatcher.submit(self, event)
+            return
+        collector = metrics.active()
+        if collector is None:
+            for observer in self.observers:
+                observer.notify(event.message)
+            for subscription in self.route(event):
+                subscription.handler(event)
+            return
         for observer in self.observers:
-            observer.notify(message)
+            started = time.perf_counter()
+            observer.notify(event.message)
+            collector.observe_delivery(observer, time.perf_counter() - started)
+        for subscription in self.route(event):
+            started = time.perf_counter()
+            subscription.handler(event)
+            collector.observe_delivery(subscription.owner, time.perf_counter() - started)
+
+    def route(self, event):
+        """Повертає підписки, що відповідають події."""
+        routes = self._routes
+        if not routes:
+            return []
+        matched = []
+        for kind in (event.type, None):
+            matched.extend(routes.get((kind, None, None), ()))
+            for attribute in self._attributes:
+                matched.extend(routes.get((kind, attribute, event.get(attribute, _MISSING)), ()))
+        return [subscription for subscription in matched if subscription.matches(event)]
+
+    def deliver(self, events, on_error=None):
+        """Доставляє пакет подій поточним спостерігачам і підпискам.
+
+        Спостерігач з методом notify_batch(messages) отримує тексти пакета
+        одним викликом, інші — по одному повідомленню. Якщо задано on_error,
+        помилка одного спостерігача не заважає доставці іншим.
+
+        Args:
+            events (list): Події для доставки
+            on_error: Функція on_error(observer, message, error) або None
+        """
+        observers = list(self.observers)
+        if observers:
+            messages = [event.message for event in events]
+            for observer in observers:
+                notify_batch = getattr(observer, "notify_batch", None)
+                if notify_batch is not None:
+                    _call_observer(notify_batch, observer, messages, on_error)
+                    continue
+                for message in messages:
+                    _call_observer(observer.notify, observer, message, on_error)
+        for event in events:
+            for subscription in self.route(event):
+                _call_observer(subscription.handler, subscription.owner, event, on_error)
+
+    def flush(self, timeout=None):
+        """Чекає, доки диспетчер доставить усі повідомлення з черги.
+
+        Args:
+            timeout (float): Максимальний час очікування в секундах
+
+        Returns:
+            bool: True, якщо черга спорожніла
+        """
+        if self.dispatcher is None:
+            return True
+        return self.dispatcher.flush(timeout)
+
+    def close(self, timeout=None):
+        """Доставляє залишок черги і зупиняє диспетчер."""
+        if self.dispatcher is not None:
+            self.dispatcher.close(timeout)
+
+
+class AsyncDispatcher:
+    """Асинхронна доставка сповіщень фоновим потоком через обмежену чергу.
+
+    Потік забирає з черги до batch_size повідомлень за раз і доставляє їх
+    пакетом; при coalesce однакові повідомлення пакета зливаються в одне.
+    Помилки спостерігачів передаються on_error (або записуються в журнал,
+    якщо on_error=None) і не зупиняють доставку. Повідомлення, надіслані
+    самими спостерігачами з потоку доставки, не чекають місця в черзі,
+    навіть при overflow="block": інакше потік чекав би сам на себе.
+
+    Args:
+        maxsize (int): Максимальна довжина черги
+        batch_size (int): Максимальний розмір пакета
+        overflow (str): Поведінка при переповненні: "block" — чекати місця,
+            "drop_oldest" — відкинути найстаріше повідомлення,
+            "raise" — породити queue.Full
+        coalesce (bool): Зливати однакові повідомлення в межах пакета
+        on_error: Функція on_error(observer, message, error) або None
+    """
+
+    def __init__(self, maxsize=1024, batch_size=64, overflow="block",
+                 coalesce=False, on_error=log_observer_error):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Невідома політика переповнення: {overflow}")
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.coalesce = coalesce
+        self.on_error = on_error
+        self.dropped = 0
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._closed = False
+        self._worker = None
+
+    def submit(self, notifier, message):
+        """Ставить повідомлення в чергу на доставку спостерігачам notifier."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Диспетчер сповіщень зупинено")
+            if len(self._queue) >= self.maxsize:
+                if self.overflow == "raise":
+                    raise queue.Full("Черга сповіщень переповнена")
+                if self.overflow == "drop_oldest":
+                    self._queue.popleft()
+                    self.dropped += 1
+                elif threading.current_thread() is not self._worker:
+                    self._condition.wait_for(lambda: len(self._queue) < self.maxsize)
+            self._queue.append((notifier, message))
+            self._ensure_worker()
+            self._condition.notify_all()
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="notifier", daemon=True)
+            self._worker.start()
+
+    def _take_batch(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self._queue or self._closed)
+            batch = []
+            while self._queue and len(batch) < self.batch_size:
+                batch.append(self._queue.popleft())
+            self._in_flight = len(batch)
+            self._condition.notify_all()
+            return batch
+
+    def _run(self):
+        on_error = self.on_error or log_observer_error
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            try:
+                for notifier, messages in self._group(batch):
+                    try:
+                        notifier.deliver(messages, on_error)
+                    except Exception:  # pylint: disable=broad-except
+                        # Збій самого on_error не повинен зупиняти потік доставки.
+                        logger.exception("Не вдалося доставити пакет сповіщень")
+            finally:
+                with self._condition:
+                    self._in_flight = 0
+                    self._condition.notify_all()
+
+    def _group(self, batch):
+        grouped = {}
+        for notifier, message in batch:
+            messages = grouped.setdefault(id(notifier), (notifier, []))[1]
+            if not (self.coalesce and message in messages):
+                messages.append(message)
+        return grouped.values()
+
+    def pending(self):
+        """Повертає кількість повідомлень, що очікують доставки."""
+        with self._condition:
+            return len(self._queue) + self._in_flight
+
+    def flush(self, timeout=None):
+        """Чекає доставки всіх повідомлень; повертає True, якщо черга порожня."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._queue and not self._in_flight, timeout)
+
+    def close(self, timeout=None):
+        """Доставляє залишок черги і зупиняє фоновий потік."""
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
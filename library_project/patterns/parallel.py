@@ -0,0 +1,158 @@
+"""Модуль паралельного пошуку книг у кількох процесах.
+
+SearchExecutor ділить каталог на частини й запускає для кожної окремий
+процес. Частина передається процесу один раз під час запуску (при fork —
+без серіалізації), а кожен запит розсилається всім процесам, і їхні
+результати збираються в порядку каталогу. ParallelSearch — обгортка над
+стратегією пошуку за полем, що використовує виконавця для великих
+каталогів. Пошук через n-грамний індекс (service.books) зазвичай швидший
+за паралельний перегляд, тож для індексованих каталогів виконавець
+вмикається явно: prefer_index=False.
+"""
+
+import multiprocessing
+import os
+import threading
+from array import array
+
+from library_project.patterns.strategy import SearchStrategy
+from library_project.services.indexes import SEARCH_FIELDS, revision
+
+
+def _serve(connection, columns):
+    """Цикл процесу: відповідає на запити (поле, підрядок) номерами рядків своєї частини."""
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        field, needle = request
+        try:
+            column = columns[field]
+            connection.send(array("l", [i for i, value in enumerate(column) if needle in value]))
+        except Exception as error:  # pylint: disable=broad-except
+            connection.send(error)
+    connection.close()
+
+
+def _context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("fork" if "fork" in methods else None)
+
+
+class SearchExecutor:
+    """Пул процесів, кожен з яких тримає частину каталогу в нижньому регістрі.
+
+    Каталог завантажується заново, якщо змінився список книг або його
+    вміст (як у VectorizedSearch). Запити виконуються по одному:
+    одночасні виклики search чекають один на одного.
+
+    Аргументи:
+        workers (int): Кількість процесів (типово — кількість ядер).
+        fields (tuple): Поля, за якими можна шукати.
+    """
+
+    def __init__(self, workers=None, fields=SEARCH_FIELDS):
+        self.workers = workers or os.cpu_count() or 1
+        self.fields = fields
+        self.books = []
+        self._source = None
+        self._revision = None
+        self._processes = []
+        self._connections = []
+        self._starts = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def load(self, books):
+        """Розподіляє books між процесами, якщо їх ще не завантажено."""
+        with self._lock:
+            self._load(books)
+
+    def _load(self, books):
+        current = revision(books)
+        if self._source is books and self._revision == current:
+            return
+        self._stop()
+        self.books = list(books)
+        self._source, self._revision = books, current
+        context = _context()
+        size = -(-len(self.books) // self.workers) or 1
+        for start in range(0, len(self.books), size):
+            chunk = self.books[start:start + size]
+            columns = {field: [getattr(book, field).lower() for book in chunk]
+                       for field in self.fields}
+            parent, child = context.Pipe()
+            process = context.Process(target=_serve, args=(child, columns),
+                                      name="library-search", daemon=True)
+            process.start()
+            child.close()
+            self._processes.append(process)
+            self._connections.append(parent)
+            self._starts.append(start)
+
+    def search(self, books, field, value):
+        """Повертає книги, поле field яких містить value, у порядку каталогу."""
+        needle = value.lower()
+        with self._lock:
+            self._load(books)
+            for connection in self._connections:
+                connection.send((field, needle))
+            replies = [connection.recv() for connection in self._connections]
+            snapshot, starts = self.books, self._starts
+        result = []
+        for start, reply in zip(starts, replies):
+            if isinstance(reply, Exception):
+                raise reply
+            result.extend(snapshot[start + row] for row in reply)
+        return result
+
+    def _stop(self):
+        for connection in self._connections:
+            connection.send(None)
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._processes, self._connections, self._starts = [], [], []
+
+    def close(self):
+        """Зупиняє процеси."""
+        with self._lock:
+            self._stop()
+            self.books, self._source, self._revision = [], None, None
+
+
+class ParallelSearch(SearchStrategy):
+    """Стратегія-обгортка, що виконує лінійний пошук за полем у кількох процесах.
+
+    Каталоги, менші за threshold, обробляються самою стратегією в
+    поточному процесі. Так само типово обробляються каталоги з
+    пошуковим індексом (зокрема service.books): пошук в індексі займає
+    час, пропорційний кількості збігів. Процеси для них потрібні,
+    коли індекс відстає від запитів (наприклад, короткі запити, що
+    збігаються з більшістю каталогу) — тоді prefer_index=False.
+
+    Аргументи:
+        strategy: Стратегія з атрибутом field (SearchByTitle тощо).
+        executor (SearchExecutor): Спільний пул процесів.
+        threshold (int): Мінімальний розмір каталогу для паралельного пошуку.
+        prefer_index (bool): Чи шукати в індексованих каталогах через індекс.
+    """
+
+    def __init__(self, strategy, executor, threshold=200_000, prefer_index=True):
+        self.strategy = strategy
+        self.field = strategy.field
+        self.executor = executor
+        self.threshold = threshold
+        self.prefer_index = prefer_index
+
+    def search(self, books, value):
+        """Пошук книг за частковим співпадінням у полі (ігнорує регістр)."""
+        indexed = getattr(books, "search_index", None) is not None
+        if len(books) < self.threshold or (indexed and self.prefer_index):
+            return self.strategy.search(books, value)
+        return self.executor.search(books, self.field, value)
@@ -0,0 +1,243 @@
+"""Модуль багатокритеріальних запитів до каталогу з плануванням за селективністю.
+
+Предикати (Title, Author, Genre, Available) комбінуються операторами
+& (І) та | (АБО). Планувальник оцінює кількість книг для кожного предиката
+за статистикою полів та пошуковим індексом, будує множину кандидатів
+з найселективнішого індексованого предиката, а решту перевіряє для
+кожного кандидата від найселективнішого, зупиняючись на першій невдачі.
+"""
+
+import heapq
+
+# Частка каталогу, яку приблизно відбирає підрядковий запит без індексу.
+DEFAULT_SELECTIVITY = 0.1
+
+
+class QueryContext:
+    """Дані, з якими виконується запит: книги, видачі та статистика.
+
+    Аргументи:
+        books: Список книг (BookList, BookStore або звичайний список).
+        lent_books: Словник видач {Book: User}.
+    """
+
+    def __init__(self, books, lent_books=None):
+        self.books = books
+        self.lent_books = lent_books if lent_books is not None else {}
+        self.index = getattr(books, "search_index", None)
+        self.size = len(books)
+        self._plans = {}
+
+    def ordered(self, predicate, children, key):
+        """Повертає дочірні предикати, впорядковані за key (обчислюється раз на запит)."""
+        plan = self._plans.get(id(predicate))
+        if plan is None:
+            plan = self._plans[id(predicate)] = sorted(children, key=key)
+        return plan
+
+    def estimate_contains(self, field, value):
+        """Оцінює кількість книг, у яких поле містить value."""
+        if not value:
+            return self.size
+        if self.index is None:
+            return self.size * DEFAULT_SELECTIVITY
+        field_index = self.index.fields[field]
+        cardinality = field_index.cardinality()
+        if not cardinality:
+            return 0
+        per_value = self.size / cardinality
+        return min(self.size, field_index.estimate_values(value) * per_value)
+
+    def in_catalog_order(self, books):
+        """Впорядковує книги за положенням у каталозі."""
+        if self.index is not None:
+            return sorted(books, key=self.index.position)
+        members = set(books)
+        return [book for book in self.books if book in members]
+
+
+class Predicate:
+    """Базовий клас предиката запиту."""
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def matches(self, book, context):
+        """Перевіряє, чи задовольняє книга предикат."""
+        raise NotImplementedError()
+
+    def estimate(self, context):
+        """Оцінює кількість книг каталогу, що задовольняють предикат."""
+        raise NotImplementedError()
+
+    def candidates(self, context):
+        """Повертає книги з індексу у порядку каталогу або None, якщо індексу немає."""
+        return None
+
+
+class Contains(Predicate):
+    """Часткове співпадіння у полі книги (ігнорує регістр)."""
+
+    field = None
+
+    def __init__(self, value):
+        self.value = value
+        self._needle = value.lower()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.value!r})"
+
+    def matches(self, book, context):
+        return self._needle in getattr(book, self.field).lower()
+
+    def estimate(self, context):
+        return context.estimate_contains(self.field, self.value)
+
+    def candidates(self, context):
+        if context.index is None:
+            return None
+        return context.index.search(self.field, self.value)
+
+
+class Title(Contains):
+    """Предикат за назвою книги."""
+
+    field = "title"
+
+
+class Author(Contains):
+    """Предикат за автором книги."""
+
+    field = "author"
+
+
+class Genre(Contains):
+    """Предикат за жанром книги."""
+
+    field = "genre"
+
+
+class Available(Predicate):
+    """Предикат доступності: available=True — книга вільна, False — видана."""
+
+    def __init__(self, available=True):
+        self.available = available
+
+    def __repr__(self):
+        return f"Available({self.available})"
+
+    def matches(self, book, context):
+        return (book not in context.lent_books) == self.available
+
+    def estimate(self, context):
+        lent = len(context.lent_books)
+        return context.size - lent if self.available else lent
+
+    def candidates(self, context):
+        if self.available:
+            return None
+        return context.in_catalog_order(list(context.lent_books))
+
+
+class And(Predicate):
+    """Кон'юнкція предикатів."""
+
+    def __init__(self, *children):
+        self.children = _flatten(children, And)
+
+    def __repr__(self):
+        return f"({' & '.join(map(repr, self.children))})"
+
+    def plan(self, context):
+        """Повертає дочірні предикати від найселективнішого."""
+        return context.ordered(self, self.children, lambda child: child.estimate(context))
+
+    def matches(self, book, context):
+        return all(child.matches(book, context) for child in self.plan(context))
+
+    def estimate(self, context):
+        estimate = context.size
+        for child in self.children:
+            estimate *= child.estimate(context) / context.size if context.size else 0
+        return estimate
+
+    def candidates(self, context):
+        ordered = self.plan(context)
+        for position, child in enumerate(ordered):
+            base = child.candidates(context)
+            if base is None:
+                continue
+            rest = ordered[:position] + ordered[position + 1:]
+            return [book for book in base
+                    if all(other.matches(book, context) for other in rest)]
+        return None
+
+
+class Or(Predicate):
+    """Диз'юнкція предикатів."""
+
+    def __init__(self, *children):
+        self.children = _flatten(children, Or)
+
+    def __repr__(self):
+        return f"({' | '.join(map(repr, self.children))})"
+
+    def matches(self, book, context):
+        # Найімовірніші предикати перевіряються першими.
+        ordered = context.ordered(self, self.children, lambda child: -child.estimate(context))
+        return any(child.matches(book, context) for child in ordered)
+
+    def estimate(self, context):
+        return min(context.size, sum(child.estimate(context) for child in self.children))
+
+    def candidates(self, context):
+        parts = []
+        for child in self.children:
+            part = child.candidates(context)
+            if part is None:
+                return None
+            parts.append(part)
+        if context.index is None:
+            return context.in_catalog_order({book for part in parts for book in part})
+        merged, seen = [], set()
+        for book in heapq.merge(*parts, key=context.index.position):
+            if book not in seen:
+                seen.add(book)
+                merged.append(book)
+        return merged
+
+
+def _flatten(children, kind):
+    flat = []
+    for child in children:
+        flat.extend(child.children if isinstance(child, kind) else (child,))
+    return flat
+
+
+def execute(predicate, books, lent_books=None):
+    """Виконує запит і повертає книги у порядку каталогу.
+
+    Якщо предикат може бути обчислений через індекс, перегляд каталогу
+    не виконується; інакше каталог переглядається один раз з перевіркою
+    предикатів від найселективнішого.
+
+    Аргументи:
+        predicate (Predicate): Запит, наприклад Genre("Роман") & Author("Франко").
+        books: Список книг.
+        lent_books (dict): Видачі для предиката Available.
+
+    Повертає:
+        list: Знайдені книги.
+    """
+    context = QueryContext(books, lent_books)
+    result = predicate.candidates(context)
+    if result is not None:
+        return result
+    if isinstance(predicate, And):
+        ordered = predicate.plan(context)
+        return [book for book in books
+                if all(child.matches(book, context) for child in ordered)]
+    return [book for book in books if predicate.matches(book, context)]
@@ -1,17 +1,28 @@
 """Модуль, що реалізує патерн Singleton через метаклас."""
 
+import threading
+
+
 class SingletonMeta(type):
     """Метаклас для реалізації патерна Singleton.
 
-    Забезпечує створення лише одного екземпляру класу.
+    Забезпечує створення лише одного екземпляру класу, зокрема
+    при одночасному першому виклику з кількох потоків.
     """
     _instances = {}
+    _lock = threading.Lock()
 
     def __call__(cls, *args, **kwargs):
         """Повертає єдиний екземпляр класу, створюючи його при першому виклику.
 
         Якщо екземпляр вже існує, повертає його замість створення нового.
+        Перевірка без блокування робить повторні виклики дешевими, а
+        повторна перевірка під блокуванням виключає подвійне створення.
         """
-        if cls not in cls._instances:
-            cls._instances[cls] = super().__call__(*args, **kwargs)
-        return cls._instances[cls]
+        instance = cls._instances.get(cls)
+        if instance is None:
+            with SingletonMeta._lock:
+                instance = cls._instances.get(cls)
+                if instance is None:
+                    instance = cls._instances[cls] = super().__call__(*args, **kwargs)
+        return instance
@@ -1,5 +1,14 @@
 """Модуль реалізує патерн Стратегія для пошуку книг за різними критеріями."""
 
+from itertools import islice
+
+from library_project.services.metrics import instrumented
+
+
+def search_operation(strategy, books, value):
+    """Назва операції пошуку для метрик, наприклад search_by_title."""
+    return f"search_by_{strategy.field}"
+
 
 class SearchStrategy:
     """Інтерфейс стратегії пошуку книг."""
@@ -16,26 +25,58 @@ class SearchStrategy:
         """
         raise NotImplementedError()
 
+    def iter_search(self, books, value, limit=None, offset=0):
+        """Ліниво повертає результати пошуку з пропуском offset і не більше limit.
 
-class SearchByTitle(SearchStrategy):
-    """Стратегія пошуку книг за назвою."""
+        Повертає:
+            iterator: Книги, що відповідають критерію пошуку.
+        """
+        stop = None if limit is None else offset + limit
+        return islice(self._iter_matches(books, value), offset, stop)
+
+    def _iter_matches(self, books, value):
+        return iter(self.search(books, value))
+
+
+class FieldSearchStrategy(SearchStrategy):
+    """Базова стратегія пошуку за частковим співпадінням в одному полі.
 
+    Якщо список книг має пошуковий індекс (атрибут search_index),
+    результат будується перетином постінг-списків n-грам,
+    інакше виконується лінійний перегляд.
+    """
+
+    field = None
+
+    @instrumented(search_operation)
     def search(self, books, value):
-        """Пошук книг за частковим співпадінням у назві (ігнорує регістр)."""
-        return [book for book in books if value.lower() in book.title.lower()]
+        """Пошук книг за частковим співпадінням у полі (ігнорує регістр)."""
+        index = getattr(books, "search_index", None)
+        if index is not None:
+            return index.search(self.field, value)
+        needle = value.lower()
+        return [book for book in books if needle in getattr(book, self.field).lower()]
+
+    def _iter_matches(self, books, value):
+        if getattr(books, "search_index", None) is not None:
+            return iter(self.search(books, value))
+        needle = value.lower()
+        return (book for book in books if needle in getattr(book, self.field).lower())
 
 
-class SearchByAuthor(SearchStrategy):
+class SearchByTitle(FieldSearchStrategy):
+    """Стратегія пошуку книг за назвою."""
+
+    field = "title"
+
+
+class SearchByAuthor(FieldSearchStrategy):
     """Стратегія пошуку книг за ім'ям автора."""
 
-    def search(self, books, value):
-        """Пошук книг за частковим співпадінням в імені автора (ігнорує регістр)."""
-        return [book for book in books if value.lower() in book.author.lower()]
+    field = "author"
 
 
-class SearchByGenre(SearchStrategy):
+class SearchByGenre(FieldSearchStrategy):
     """Стратегія пошуку книг за жанром."""
 
-    def search(self, books, value):
-        """Пошук книг за частковим співпадінням у жанрі (ігнорує регістр)."""
-        return [book for book in books if value.lower() in book.genre.lower()]
+    field = "genre"
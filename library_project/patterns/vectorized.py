@@ -0,0 +1,102 @@
+"""Модуль пакетного пошуку книг з векторизацією на NumPy.
+
+NumPy є необов'язковою залежністю: модуль імпортується і без неї,
+але створення ColumnarCatalog у такому разі породжує ImportError.
+"""
+
+from library_project.patterns.strategy import SearchStrategy
+from library_project.services.indexes import SEARCH_FIELDS, revision
+from library_project.services.metrics import instrumented
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - залежить від середовища
+    np = None
+
+
+class ColumnarCatalog:
+    """Колонкова копія полів каталогу для векторизованого пошуку.
+
+    Кожне поле зберігається як масив різних значень у нижньому регістрі
+    та масив індексів, що відображає книги на ці значення. Запит
+    перевіряється лише по різних значеннях, а результат розгортається
+    на книги однією векторною операцією.
+
+    Аргументи:
+        books: Послідовність книг (копія знімається при створенні).
+        fields: Поля для індексації.
+    """
+
+    def __init__(self, books, fields=SEARCH_FIELDS):
+        if np is None:
+            raise ImportError("Для пакетного пошуку потрібен пакет numpy")
+        self.books = list(books)
+        self.columns = {}
+        for field in fields:
+            values = np.array([getattr(book, field).lower() for book in self.books], dtype=str)
+            self.columns[field] = np.unique(values, return_inverse=True)
+
+    def __len__(self):
+        return len(self.books)
+
+    def search_indices(self, field, value):
+        """Повертає масив індексів книг, поле яких містить value (ігнорує регістр)."""
+        unique, inverse = self.columns[field]
+        if not value:
+            return np.arange(len(self.books))
+        matches = np.char.find(unique, value.lower()) >= 0
+        return np.flatnonzero(matches[inverse])
+
+    def search_many(self, field, queries):
+        """Виконує пакет запитів по одному полю.
+
+        Однакові запити (без урахування регістру) обчислюються один раз.
+
+        Повертає:
+            list: Масиви індексів книг для кожного запиту у порядку запитів.
+        """
+        results = {}
+        batch = []
+        for query in queries:
+            key = query.lower()
+            if key not in results:
+                results[key] = self.search_indices(field, key)
+            batch.append(results[key])
+        return batch
+
+
+class VectorizedSearch(SearchStrategy):
+    """Стратегія пошуку за полем на основі колонкової копії каталогу.
+
+    Дає ті самі результати, що SearchByTitle/SearchByAuthor/SearchByGenre,
+    і додатково підтримує пакетний пошук search_many. Колонкова копія
+    перебудовується, якщо змінився список книг або його вміст
+    (лічильник змін IndexedList/BookStore, для звичайних списків — довжина).
+
+    Аргументи:
+        field (str): Поле пошуку (title, author або genre).
+    """
+
+    def __init__(self, field):
+        self.field = field
+        self._catalog = None
+        self._source = None
+        self._revision = None
+
+    def catalog(self, books):
+        """Повертає колонкову копію для books, перебудовуючи її за потреби."""
+        current = revision(books)
+        if self._catalog is None or self._source is not books or self._revision != current:
+            self._catalog = ColumnarCatalog(books, fields=(self.field,))
+            self._source, self._revision = books, current
+        return self._catalog
+
+    @instrumented(lambda strategy, books, value: f"vectorized_search_by_{strategy.field}")
+    def search(self, books, value):
+        """Пошук книг за частковим співпадінням у полі (ігнорує регістр)."""
+        catalog = self.catalog(books)
+        return [catalog.books[i] for i in catalog.search_indices(self.field, value)]
+
+    def search_many(self, books, queries):
+        """Пакетний пошук: повертає масиви індексів книг для кожного запиту."""
+        return self.catalog(books).search_many(self.field, queries)
@@ -0,0 +1,67 @@
+"""
+Модуль локального asyncio-сервера бібліотеки.
+
+Протокол — JSON-рядки поверх TCP: клієнт надсилає по одній команді
+в рядку (формат див. commands.py) і отримує по одній відповіді в рядку.
+Кожне з'єднання має власну сесію, а всі з'єднання — спільні сервіс
+і статистику, звіт якої повертає команда {"command": "stats"}.
+"""
+
+import asyncio
+import json
+
+from library_project.commands import CommandProcessor, Session
+
+MAX_LINE = 1 << 20
+
+
+def _encode(response):
+    return (json.dumps(response, ensure_ascii=False) + "\n").encode()
+
+
+async def _handle_client(processor, reader, writer):
+    session = Session()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            writer.write(_encode(processor.execute_line(session, line)))
+            await writer.drain()
+    except (ConnectionError, ValueError):  # розрив з'єднання або задовгий рядок
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(service, host="127.0.0.1", port=8765, stats=None):
+    """Запускає сервер і повертає asyncio.Server (port=0 — довільний вільний порт).
+
+    Аргументи:
+        service: Екземпляр LibraryService
+        host (str): Адреса для прослуховування
+        port (int): Порт
+        stats (CommandStats): Спільна статистика або None — нова
+
+    Повертає:
+        asyncio.Server: Сервер; processor доступний як server.processor
+    """
+    processor = CommandProcessor(service, stats)
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_client(processor, reader, writer),
+        host, port, limit=MAX_LINE)
+    server.processor = processor
+    return server
+
+
+def serve(service, host="127.0.0.1", port=8765):
+    """Запускає сервер і обслуговує клієнтів до переривання (Ctrl+C)."""
+    async def run():
+        server = await start_server(service, host, port)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,155 @@
+"""
+Модуль агрегованих показників каталогу для звітів і панелей.
+Лічильники книг і видач за жанрами та авторами, а також список
+найпопулярніших книг оновлюються при кожній зміні каталогу та кожній
+видачі чи поверненні, тож читання показника не переглядає каталог.
+Кількість видач — історична: вона не зменшується при видаленні книги,
+а LibraryStorage зберігає її у знімку стану.
+"""
+
+import threading
+from bisect import insort
+
+
+def _counts(books, lent, loans=None):
+    counts = {"books": books, "lent": lent, "available": books - lent}
+    if loans is not None:
+        counts["loans"] = loans
+    return counts
+
+
+class CatalogAggregates:
+    """Матеріалізовані показники каталогу: наявні та видані книги, видачі, топ книг.
+
+    Підключається до списку книг як звичайний індекс (add, discard,
+    rebuild), а LibraryService повідомляє йому про кожну видачу
+    (record_lend) і повернення (record_return). Кількість видач книги
+    й автора — за весь час: вона лише зростає і зберігається після
+    видалення книги чи перебудови, тому список найпопулярніших книг
+    підтримується вставкою за O(log n). Перенести історію між
+    процесами можна через loan_history і restore_loan_history.
+
+    Аргументи:
+        top (int): Кількість книг у списку найпопулярніших.
+    """
+
+    def __init__(self, top=10):
+        self.top = top
+        self.loans = {}  # Поточні видачі {Book: User} (LibraryService.lent_books)
+        self._books = 0
+        self._lent = 0
+        self._genres = {}  # {жанр: [книги, видані]}
+        self._authors = {}  # {автор: [книги, видані]}
+        self._author_loans = {}  # {автор: видачі за весь час}
+        self._borrowed = {}  # {(назва, автор): видачі за весь час}
+        self._top = []  # Ключі найпопулярніших книг від найбільшої кількості видач
+        self._lock = threading.Lock()
+
+    def _rank(self, key):
+        return -self._borrowed[key]
+
+    def _change(self, book, books, lent):
+        self._books += books
+        self._lent += lent
+        genre = self._genres.setdefault(book.genre, [0, 0])
+        genre[0] += books
+        genre[1] += lent
+        if not genre[0]:
+            del self._genres[book.genre]
+        author = self._authors.setdefault(book.author, [0, 0])
+        author[0] += books
+        author[1] += lent
+        if not author[0]:
+            del self._authors[book.author]
+
+    def add(self, book):
+        """Враховує нову книгу."""
+        with self._lock:
+            self._change(book, 1, int(book in self.loans))
+
+    def discard(self, book):
+        """Прибирає видалену книгу з лічильників книг (історія видач залишається)."""
+        with self._lock:
+            self._change(book, -1, -int(book in self.loans))
+
+    def rebuild(self, books):
+        """Перераховує лічильники книг і видач; історія видач не змінюється."""
+        with self._lock:
+            self._books = self._lent = 0
+            self._genres, self._authors = {}, {}
+        for book in books:
+            self.add(book)
+
+    def loan_history(self):
+        """Повертає кількість видач за весь час: [[назва, автор, видачі], ...]."""
+        with self._lock:
+            return [[title, author, count] for (title, author), count in self._borrowed.items()]
+
+    def restore_loan_history(self, history):
+        """Замінює історію видач записами у форматі loan_history."""
+        with self._lock:
+            self._borrowed, self._author_loans, self._top = {}, {}, []
+            for title, author, count in history:
+                self._borrowed[(title, author)] = count
+                self._author_loans[author] = self._author_loans.get(author, 0) + count
+                self._promote((title, author))
+
+    def _promote(self, key):
+        top = self._top
+        if key in top:
+            top.remove(key)
+        elif len(top) >= self.top and self._rank(top[-1]) <= self._rank(key):
+            return
+        insort(top, key, key=self._rank)
+        del top[self.top:]
+
+    def record_lend(self, book):
+        """Враховує видачу книги."""
+        with self._lock:
+            self._change(book, 0, 1)
+            self._author_loans[book.author] = self._author_loans.get(book.author, 0) + 1
+            key = (book.title, book.author)
+            self._borrowed[key] = self._borrowed.get(key, 0) + 1
+            self._promote(key)
+
+    def record_return(self, book):
+        """Враховує повернення книги."""
+        with self._lock:
+            self._change(book, 0, -1)
+
+    def totals(self):
+        """Повертає {"books", "lent", "available"} для всього каталогу."""
+        with self._lock:
+            return _counts(self._books, self._lent)
+
+    def genre(self, genre):
+        """Повертає {"books", "lent", "available"} для жанру."""
+        with self._lock:
+            return _counts(*self._genres.get(genre, (0, 0)))
+
+    def author(self, author):
+        """Повертає {"books", "lent", "available", "loans"} для автора."""
+        with self._lock:
+            return _counts(*self._authors.get(author, (0, 0)), self._author_loans.get(author, 0))
+
+    def by_genre(self):
+        """Повертає показники всіх жанрів: {жанр: {"books", "lent", "available"}}."""
+        with self._lock:
+            return {genre: _counts(*counts) for genre, counts in self._genres.items()}
+
+    def by_author(self):
+        """Повертає показники всіх авторів: {автор: {"books", "lent", "available", "loans"}}."""
+        with self._lock:
+            return {author: _counts(*counts, self._author_loans.get(author, 0))
+                    for author, counts in self._authors.items()}
+
+    def most_borrowed(self, limit=None):
+        """Повертає до limit (типово top) найпопулярніших книг.
+
+        Повертає:
+            list: Кортежі (назва, автор, кількість видач) від найпопулярнішої,
+                зокрема книги, вже видалені з каталогу
+        """
+        with self._lock:
+            top = self._top if limit is None else self._top[:limit]
+            return [(title, author, self._borrowed[(title, author)]) for title, author in top]
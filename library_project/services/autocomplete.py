@@ -0,0 +1,217 @@
+"""
+Модуль автодоповнення назв і авторів за префіксом.
+Слова назв і авторів зберігаються в префіксному дереві, кожен вузол
+якого пам'ятає k найпопулярніших значень свого піддерева, тож запит
+обходить лише символи префікса. Популярність значення — кількість
+видач книг з цією назвою або цим автором.
+"""
+
+import threading
+from bisect import insort
+from heapq import nsmallest
+
+from library_project.services.indexes import FUZZY_FIELDS, words
+
+
+class _Node:
+    """Вузол префіксного дерева."""
+
+    __slots__ = ("children", "entries", "top", "dirty")
+
+    def __init__(self):
+        self.children = None  # {символ: _Node}
+        self.entries = None  # Значення, одне зі слів яких закінчується у вузлі
+        self.top = []  # Найпопулярніші значення піддерева
+        self.dirty = False  # top потребує перерахунку після видалення
+
+
+class Autocomplete:
+    """Індекс автодоповнення за префіксом слова назви або автора.
+
+    Підключається до списку книг як звичайний індекс (add, discard,
+    rebuild), а LibraryService повідомляє йому про кожну видачу
+    (record_lend). Популярність лише зростає, тому списки найкращих
+    значень у вузлах оновлюються точно; після видалення книги уражені
+    вузли перераховуються під час наступного запиту.
+
+    Аргументи:
+        k (int): Кількість найпопулярніших значень, що зберігаються у вузлі.
+        fields (tuple): Поля книги для автодоповнення.
+    """
+
+    def __init__(self, k=10, fields=FUZZY_FIELDS):
+        self.k = k
+        self.fields = fields
+        self._root = _Node()
+        self._display = {}  # {значення в нижньому регістрі: значення як у книзі}
+        self._books = {}  # {значення: кількість книг з ним}
+        # {значення: [-кількість видач, порядковий номер]}; менше — вище в підказках.
+        self._ranks = {}
+        self._rank = self._ranks.__getitem__
+        self._next = 0
+        self._lends = {}  # {Book: кількість видач}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._display)
+
+    def _paths(self, entry):
+        """Повертає для кожного слова значення список вузлів від кореня до кінця слова."""
+        paths = []
+        for word in set(words(entry)):
+            node, path = self._root, [self._root]
+            for char in word:
+                node = node.children[char]
+                path.append(node)
+            paths.append(path)
+        return paths
+
+    def _promote(self, node, entry, rank):
+        """Переміщує значення з підвищеним рангом у списку вузла; повертає, чи воно там."""
+        top = node.top
+        if entry in top:
+            top.remove(entry)
+        elif len(top) >= self.k and self._rank(top[-1]) <= rank:
+            return False
+        insort(top, entry, key=self._rank)
+        del top[self.k:]
+        return entry in top
+
+    def _insert(self, entry, display):
+        # Нове значення має найгірший ранг (жодної видачі, найбільший номер),
+        # тож потрапляє лише в неповні списки і завжди в їхній кінець.
+        self._display[entry] = display
+        self._ranks[entry] = [0, self._next]
+        self._next += 1
+        k = self.k
+        for word in set(words(entry)):
+            node = self._root
+            for char in word:
+                top = node.top
+                if len(top) < k and (not top or top[-1] is not entry):
+                    top.append(entry)
+                if node.children is None:
+                    node.children = {}
+                child = node.children.get(char)
+                if child is None:
+                    child = node.children[char] = _Node()
+                node = child
+            top = node.top
+            if len(top) < k and (not top or top[-1] is not entry):
+                top.append(entry)
+            if node.entries is None:
+                node.entries = set()
+            node.entries.add(entry)
+
+    def _remove(self, entry):
+        for path in self._paths(entry):
+            path[-1].entries.discard(entry)
+            for node in path:
+                if entry in node.top:
+                    node.top.remove(entry)
+                    node.dirty = True
+        del self._display[entry], self._ranks[entry]
+
+    def add(self, book, lends=0):
+        """Додає значення полів книги до дерева (lends — уже відомі видачі книги)."""
+        with self._lock:
+            if book in self._lends:
+                return
+            self._lends[book] = lends
+            for field in self.fields:
+                value = getattr(book, field)
+                entry = value.lower()
+                count = self._books.get(entry, 0)
+                self._books[entry] = count + 1
+                if not count:
+                    self._insert(entry, value)
+                if lends:
+                    self._raise(entry, lends)
+
+    def discard(self, book):
+        """Прибирає книгу; значення без жодної книги зникають з підказок."""
+        with self._lock:
+            lends = self._lends.pop(book, None)
+            if lends is None:
+                return
+            for field in self.fields:
+                entry = getattr(book, field).lower()
+                count = self._books[entry] - 1
+                if not count:
+                    del self._books[entry]
+                    self._remove(entry)
+                    continue
+                self._books[entry] = count
+                if lends:
+                    self._ranks[entry][0] += lends
+                    for path in self._paths(entry):
+                        for node in path:
+                            if entry in node.top:
+                                node.dirty = True
+
+    def rebuild(self, books):
+        """Перебудовує дерево, зберігаючи лічильники видач книг, що залишилися."""
+        with self._lock:
+            lends = self._lends
+            self._root = _Node()
+            self._display, self._books, self._lends = {}, {}, {}
+            self._ranks.clear()
+        for book in books:
+            self.add(book, lends.get(book, 0))
+
+    def _raise(self, entry, amount):
+        rank = self._ranks[entry]
+        rank[0] -= amount
+        for path in self._paths(entry):
+            # Піддерево вузла входить у піддерево предка, тож значення, що не
+            # потрапило до найкращих у вузлі, не потрапить і вище.
+            for node in reversed(path):
+                if not self._promote(node, entry, rank) and not node.dirty:
+                    break
+
+    def record_lend(self, book):
+        """Збільшує популярність назви та автора виданої книги."""
+        with self._lock:
+            if book not in self._lends:
+                return
+            self._lends[book] += 1
+            for field in self.fields:
+                self._raise(getattr(book, field).lower(), 1)
+
+    def _refresh(self, node):
+        candidates = set(node.entries or ())
+        for child in (node.children or {}).values():
+            if child.dirty:
+                self._refresh(child)
+            candidates.update(child.top)
+        node.top = nsmallest(self.k, candidates, key=self._rank)
+        node.dirty = False
+
+    def complete(self, prefix, limit=None):
+        """Повертає до limit (типово k) найпопулярніших доповнень префікса.
+
+        Останнє слово prefix доповнюється, попередні мають бути словами
+        значення, тож при кількох словах результатів може бути менше.
+
+        Аргументи:
+            prefix (str): Введений текст, наприклад "тарас шев"
+            limit (int): Кількість доповнень, не більша за k
+
+        Повертає:
+            list: Назви та імена авторів від найпопулярніших
+        """
+        query = words(prefix)
+        limit = self.k if limit is None else min(limit, self.k)
+        with self._lock:
+            node = self._root
+            for char in query[-1] if query else "":
+                node = (node.children or {}).get(char)
+                if node is None:
+                    return []
+            if node.dirty:
+                self._refresh(node)
+            result = node.top
+            if len(query) > 1:
+                result = [entry for entry in result
+                          if all(word in words(entry) for word in query[:-1])]
+            return [self._display[entry] for entry in result[:limit]]
@@ -0,0 +1,294 @@
+"""
+Модуль колонкового сховища книг.
+Містить BookStore, який зберігає поля книг у колонках з інтернованими
+значеннями автора та жанру, і BookView — легке представлення рядка
+сховища, сумісне з Book.
+"""
+
+import sys
+from array import array
+
+from library_project.models import Book
+from library_project.models.book import book_id
+from library_project.services.indexes import NgramIndex, SEARCH_FIELDS
+
+_DELETED = 0xFFFFFFFF  # Позначка звільненого слота хеш-таблиці назв
+
+
+class StringTable:
+    """Таблиця рядків: кожне різне значення зберігається один раз."""
+
+    def __init__(self):
+        self.values = []
+        self._ids = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def intern(self, value):
+        """Повертає ідентифікатор значення, додаючи його за потреби."""
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = self._ids[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return value_id
+
+
+class BookView:
+    """Представлення рядка BookStore з інтерфейсом Book.
+
+    Рівність і хеш — як у Book, за ключем (назва, автор): представлення
+    рівне будь-якій книзі чи представленню з тими самими назвою
+    та автором, тож їх можна використовувати як ключі lent_books.
+    """
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    @property
+    def title(self):
+        """Назва книги."""
+        return self._store.titles[self._row]
+
+    @property
+    def author(self):
+        """Автор книги."""
+        return self._store.authors.values[self._store.author_ids[self._row]]
+
+    @property
+    def genre(self):
+        """Жанр книги."""
+        return self._store.genres.values[self._store.genre_ids[self._row]]
+
+    @property
+    def id(self):
+        """Сталий ідентифікатор книги (див. book_id)."""
+        return book_id(self.title, self.author)
+
+    __str__ = Book.__str__
+    to_dict = Book.to_dict
+
+    def __repr__(self):
+        return f"BookView({self.title!r}, {self.author!r}, {self.genre!r})"
+
+    def __eq__(self, other):
+        if isinstance(other, BookView) and self._store is other._store and self._row == other._row:
+            return True
+        if not isinstance(other, (Book, BookView)):
+            return NotImplemented
+        return self.title == other.title and self.author == other.author
+
+    def __hash__(self):
+        return hash((self.title, self.author))
+
+
+class StoreKeyIndex:
+    """Хеш-індекс рядків сховища за ключем (назва, автор)."""
+
+    def __init__(self, store):
+        self._store = store
+
+    def __contains__(self, key):
+        return self._store.find_row(*key) is not None
+
+    def get(self, key, default=None):
+        """Повертає представлення книги за ключем або default."""
+        row = self._store.find_row(*key)
+        return default if row is None else BookView(self._store, row)
+
+
+class StoreSearchIndex:
+    """N-грамний індекс полів сховища, що зберігає номери рядків.
+
+    Номери рядків зростають у порядку додавання, тож сортування
+    за ними відтворює порядок каталогу.
+    """
+
+    def __init__(self, store, fields=SEARCH_FIELDS, size=3):
+        self._store = store
+        self.fields = {field: NgramIndex(size) for field in fields}
+
+    def __len__(self):
+        return len(self._store)
+
+    @staticmethod
+    def position(view):
+        """Повертає номер рядка книги (відповідає порядку каталогу)."""
+        return view._row
+
+    def search(self, field, value):
+        """Пошук книг за частковим співпадінням у полі (ігнорує регістр)."""
+        if not value:
+            return list(self._store)
+        rows = sorted(self.fields[field].search(value))
+        return [BookView(self._store, row) for row in rows]
+
+
+class BookStore:
+    """Колонкове сховище книг.
+
+    Назви зберігаються у списку, автори та жанри — як ідентифікатори
+    в таблицях рядків. Видалені рядки лише позначаються, а порядок живих
+    рядків зберігається в окремому масиві, тож номери рядків стабільні.
+    Видалення за O(1) запам'ятовує рядок у множині _dead, а масив
+    порядку ущільнюється, коли таких рядків стає більше за половину
+    (або перед доступом за позицією).
+    Пошук рядка за назвою та автором іде через хеш-таблицю з відкритою
+    адресацією в масиві (номер рядка + 1 у слоті), без словника
+    та цілих об'єктів на кожну книгу.
+    Може замінити список LibraryService.books:
+    service.books = BookStore(books).
+
+    Аргументи:
+        books: Початкові книги.
+        indexed (bool): Чи будувати n-грамний пошуковий індекс.
+    """
+
+    def __init__(self, books=(), indexed=True):
+        self.titles = []
+        self.authors = StringTable()
+        self.genres = StringTable()
+        self.author_ids = array("I")
+        self.genre_ids = array("I")
+        self._live = array("I")
+        self._dead = set()  # Видалені рядки, що ще лишилися в _live
+        self._clear_rows()
+        self.key_index = StoreKeyIndex(self)
+        self.search_index = StoreSearchIndex(self) if indexed else None
+        self.indexes = []  # Додаткові індекси з методами add, discard, rebuild
+        self.revision = 0  # Лічильник змін вмісту (див. IndexedList)
+        for book in books:
+            self.append(book)
+
+    def __len__(self):
+        return len(self._live) - len(self._dead)
+
+    def __iter__(self):
+        dead = self._dead
+        for row in self._live:
+            if row not in dead:
+                yield BookView(self, row)
+
+    def __getitem__(self, position):
+        if self._dead:
+            self._compact()
+        if isinstance(position, slice):
+            return [BookView(self, row) for row in self._live[position]]
+        return BookView(self, self._live[position])
+
+    def find_row(self, title, author):
+        """Повертає номер живого рядка з заданими назвою та автором або None.
+
+        Слот обирається за хешем назви (лінійне зондування), автор
+        перевіряється за колонкою.
+        """
+        slots, titles = self._slots, self.titles
+        mask = len(slots) - 1
+        slot = hash(title) & mask
+        while slots[slot]:
+            row = slots[slot] - 1
+            if (slots[slot] != _DELETED and titles[row] == title
+                    and self.authors.values[self.author_ids[row]] == author):
+                return row
+            slot = (slot + 1) & mask
+        return None
+
+    def __contains__(self, book):
+        return self.find_row(book.title, book.author) is not None
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def append(self, book):
+        """Додає книгу до сховища і повертає її представлення.
+
+        Якщо книга з тими самими назвою та автором уже є, сховище
+        не змінюється і повертається представлення наявного рядка.
+        """
+        existing = self.find_row(book.title, book.author)
+        if existing is not None:
+            return BookView(self, existing)
+        row = len(self.titles)
+        self.titles.append(book.title)
+        self.author_ids.append(self.authors.intern(book.author))
+        self.genre_ids.append(self.genres.intern(book.genre))
+        self._live.append(row)
+        self._link(book.title, row)
+        if self.search_index is not None:
+            for field, index in self.search_index.fields.items():
+                index.add(row, getattr(book, field))
+        self.revision += 1
+        view = BookView(self, row)
+        for index in self.indexes:
+            index.add(view)
+        return view
+
+    def attach(self, index):
+        """Підключає додатковий індекс і будує його за поточним вмістом."""
+        self.indexes.append(index)
+        index.rebuild(self)
+
+    def extend(self, books):
+        """Додає до сховища кілька книг."""
+        for book in books:
+            self.append(book)
+
+    def remove(self, book):
+        """Видаляє книгу (представлення або Book з тими самими назвою та автором)."""
+        row = self.find_row(book.title, book.author)
+        if row is None:
+            raise ValueError("Книги немає у сховищі")
+        view = BookView(self, row)
+        if self.search_index is not None:
+            for field, index in self.search_index.fields.items():
+                index.discard(row, getattr(view, field))
+        self._unlink(book.title, row)
+        self._dead.add(row)
+        if 2 * len(self._dead) > len(self._live):
+            self._compact()
+        self.revision += 1
+        for index in self.indexes:
+            index.discard(view)
+
+    def _compact(self):
+        """Прибирає видалені рядки з масиву порядку живих рядків."""
+        dead = self._dead
+        self._live = array("I", (row for row in self._live if row not in dead))
+        self._dead = set()
+
+    def _clear_rows(self):
+        self._slots = array("I", bytes(32))  # Номер рядка + 1; 0 — вільний слот
+        self._filled = 0  # Зайняті слоти разом зі звільненими
+
+    def _link(self, title, row):
+        if 2 * (self._filled + 1) > len(self._slots):
+            self._resize()
+        slots = self._slots
+        mask = len(slots) - 1
+        slot = hash(title) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = row + 1
+        self._filled += 1
+
+    def _unlink(self, title, row):
+        slots = self._slots
+        mask = len(slots) - 1
+        slot = hash(title) & mask
+        while slots[slot] != row + 1:
+            slot = (slot + 1) & mask
+        slots[slot] = _DELETED
+
+    def _resize(self):
+        """Перебудовує хеш-таблицю назв без звільнених слотів (заповнення до половини)."""
+        rows = [value - 1 for value in self._slots if value and value != _DELETED]
+        size = 8
+        while size < 4 * (len(rows) + 1):
+            size *= 2
+        self._slots = array("I", bytes(4 * size))
+        self._filled = 0
+        for row in rows:
+            self._link(self.titles[row], row)
@@ -0,0 +1,136 @@
+"""
+Модуль філій бібліотеки зі спільним каталогом.
+Філії (LibraryService.for_branch) у одному процесі мають власні фонди,
+користувачів і видачі, але книги та пошуковий індекс у них спільні:
+SharedCatalog зберігає кожну книгу один раз і знає, в яких філіях
+вона є, тож пошук по всіх філіях звертається до індексу лише раз.
+"""
+
+import threading
+
+from library_project.models.book import BookPool
+from library_project.services.indexes import BookList
+
+
+class SharedCatalog:
+    """Спільний для філій каталог: інтерновані книги, пошуковий індекс і фонди.
+
+    Атрибути:
+        books (BookList): Книги, що є хоча б в одній філії, з пошуковим індексом.
+        branches (dict): Сервіси філій {назва: LibraryService}.
+    """
+
+    def __init__(self):
+        self.pool = BookPool()
+        self.books = BookList()
+        self.branches = {}
+        self._holders = {}  # {Book: {назва філії: None}}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.books)
+
+    def intern(self, book):
+        """Повертає спільний екземпляр книги, рівної book."""
+        return self.pool.add(book)
+
+    def branch(self, name, factory):
+        """Повертає сервіс філії name, створюючи його функцією factory(name)."""
+        with self._lock:
+            service = self.branches.get(name)
+            if service is None:
+                service = self.branches[name] = factory(name)
+            return service
+
+    def hold(self, branch, book):
+        """Записує, що книга є у фонді філії."""
+        with self._lock:
+            holders = self._holders.get(book)
+            if holders is None:
+                holders = self._holders[book] = {}
+                self.books.append(book)
+            holders[branch] = None
+
+    def release(self, branch, book):
+        """Записує, що книги більше немає у фонді філії."""
+        with self._lock:
+            holders = self._holders.get(book)
+            if holders is None or branch not in holders:
+                return
+            del holders[branch]
+            if not holders:
+                del self._holders[book]
+                self.books.remove(book)
+
+    def holders(self, book):
+        """Повертає назви філій, у фондах яких є книга."""
+        return list(self._holders.get(book, ()))
+
+    def search(self, field, value):
+        """Шукає книгу в усіх філіях одним зверненням до спільного індексу.
+
+        Повертає:
+            list: Пари (книга, [назви філій]) у порядку каталогу
+        """
+        return [(book, self.holders(book)) for book in self.books.search_index.search(field, value)]
+
+
+class BranchHoldings:
+    """Фонд однієї філії: індекс для списку книг філії поверх SharedCatalog.
+
+    Підключається до списку книг філії як пошуковий індекс (add,
+    discard, rebuild), записує фонд у спільний каталог і відповідає на
+    пошук через спільний n-грамний індекс, відкидаючи книги інших
+    філій. Власних постінг-списків філія не має — лише порядок книг
+    свого фонду.
+
+    Аргументи:
+        catalog (SharedCatalog): Спільний каталог
+        branch (str): Назва філії
+    """
+
+    def __init__(self, catalog, branch):
+        self.catalog = catalog
+        self.branch = branch
+        self.fields = catalog.books.search_index.fields
+        self._order = {}  # {Book: порядковий номер у фонді філії}
+        self._next = 0
+
+    def __len__(self):
+        return len(self._order)
+
+    def add(self, book):
+        """Додає книгу до фонду філії."""
+        if book in self._order:
+            return
+        self._order[book] = self._next
+        self._next += 1
+        self.catalog.hold(self.branch, book)
+
+    def discard(self, book):
+        """Прибирає книгу з фонду філії."""
+        if self._order.pop(book, None) is not None:
+            self.catalog.release(self.branch, book)
+
+    def rebuild(self, books):
+        """Перезаписує фонд філії заданою послідовністю книг."""
+        previous, self._order, self._next = self._order, {}, 0
+        for book in books:
+            self.add(book)
+        # Книги, що залишилися у фонді, не вилучаються зі спільного каталогу.
+        for book in previous:
+            if book not in self._order:
+                self.catalog.release(self.branch, book)
+
+    def position(self, book):
+        """Повертає порядковий номер книги у фонді філії (-1, якщо її немає)."""
+        return self._order.get(book, -1)
+
+    def search(self, field, value):
+        """Пошук книг філії за частковим співпадінням у полі (ігнорує регістр)."""
+        if not value:
+            return list(self._order)
+        order = self._order
+        books = [book for book in self.fields[field].search(value) if book in order]
+        books.sort(key=self.position)
+        return books
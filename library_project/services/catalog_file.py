@@ -0,0 +1,472 @@
+"""
+Модуль бінарного формату каталогу, що відкривається через mmap.
+
+Файл містить для кожного поля (title, author, genre) таблицю різних
+значень (зміщення + UTF-8 дані), ту саму таблицю в нижньому регістрі
+для пошуку, масив ідентифікаторів значень за номерами рядків і
+постінг-списки рядків кожного значення, а також хеш-таблицю рядків
+за назвою для пошуку книги за ключем. Усі масиви мають фіксовану
+ширину, тож MappedBookStore відкриває файл без розбору: сторінки
+читаються з диска лише під час звернення, книги стають BookView
+під час читання, а пошук переглядає відображені колонки без копіювання.
+
+Файл створюється функцією write_catalog із записів у форматі
+Book.to_dict або з командного рядка:
+    python -m library_project.services.catalog_file books.jsonl catalog.bin
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_right
+from contextlib import nullcontext
+
+from library_project.services.book_store import (
+    BookStore, BookView, StoreKeyIndex, StoreSearchIndex
+)
+from library_project.services.indexes import NgramIndex, SEARCH_FIELDS
+
+MAGIC = b"LIBCAT\x00\x01"
+_HEADER = struct.Struct("<8scxxxQI")  # сигнатура, порядок байтів, рядки, секції
+_SECTION = struct.Struct("<24scxxxQQ")  # назва, тип елементів, зміщення, довжина
+_SEPARATOR = b"\x00"
+
+
+class CatalogFormatError(ValueError):
+    """Виключення для файлу, що не є каталогом цього формату."""
+
+
+def _table_size(rows):
+    size = 8
+    while size < 2 * rows:
+        size *= 2
+    return size
+
+
+def _strings(values, separator=b""):
+    """Кодує рядки в дані та масив зміщень (на одне більше за кількість значень)."""
+    offsets = array("Q", [0])
+    chunks = []
+    position = 0
+    for value in values:
+        data = value.encode() + separator
+        chunks.append(data)
+        position += len(data)
+        offsets.append(position)
+    return offsets, b"".join(chunks)
+
+
+def _field_sections(field, values, ids):
+    """Повертає секції одного поля: значення, значення в нижньому регістрі, рядки, постінги."""
+    offsets, data = _strings(values)
+    lower_offsets, lower_data = _strings((value.lower() for value in values), _SEPARATOR)
+    counts = array("Q", bytes(8 * (len(values) + 1)))
+    for value_id in ids:
+        counts[value_id + 1] += 1
+    for value_id in range(len(values)):
+        counts[value_id + 1] += counts[value_id]
+    postings = array("I", bytes(4 * len(ids)))
+    cursor = counts[:-1]
+    for row, value_id in enumerate(ids):
+        postings[cursor[value_id]] = row
+        cursor[value_id] += 1
+    return {
+        f"{field}.offsets": offsets,
+        f"{field}.data": data,
+        f"{field}.lower_offsets": lower_offsets,
+        f"{field}.lower_data": lower_data,
+        f"{field}.ids": ids,
+        f"{field}.posting_offsets": counts,
+        f"{field}.postings": postings,
+    }
+
+
+def write_catalog(path, records):
+    """Записує каталог у бінарному форматі.
+
+    Книга з уже записаними назвою та автором пропускається, як
+    це робить LibraryService.add_book.
+
+    Аргументи:
+        path (str): Шлях до файлу каталогу
+        records: Ітероване джерело словників у форматі Book.to_dict
+            (або об'єктів з методом to_dict)
+
+    Повертає:
+        int: Кількість записаних книг
+    """
+    tables = {field: {} for field in SEARCH_FIELDS}  # {поле: {значення: ідентифікатор}}
+    ids = {field: array("I") for field in SEARCH_FIELDS}
+    keys = set()
+    for record in records:
+        data = record if isinstance(record, dict) else record.to_dict()
+        book = {"title": data["title"], "author": data["author"], "genre": data.get("genre", "")}
+        if not all(isinstance(value, str) for value in book.values()):
+            raise TypeError("Поля книги мають бути рядками")
+        if (book["title"], book["author"]) in keys:
+            continue
+        keys.add((book["title"], book["author"]))
+        for field in SEARCH_FIELDS:
+            table = tables[field]
+            ids[field].append(table.setdefault(book[field], len(table)))
+    rows = len(keys)
+
+    sections = {}
+    for field in SEARCH_FIELDS:
+        sections.update(_field_sections(field, list(tables[field]), ids[field]))
+    titles = list(tables["title"])
+    slots = array("I", bytes(4 * _table_size(rows)))
+    mask = len(slots) - 1
+    for row, title_id in enumerate(ids["title"]):
+        slot = zlib.crc32(titles[title_id].encode()) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = row + 1
+    sections["keys"] = slots
+
+    position = _HEADER.size + _SECTION.size * len(sections)
+    entries, payloads = [], []
+    for name, payload in sections.items():
+        position += -position % 8
+        data = payload.tobytes() if isinstance(payload, array) else payload
+        typecode = payload.typecode if isinstance(payload, array) else "B"
+        entries.append(_SECTION.pack(name.encode(), typecode.encode(), position, len(data)))
+        payloads.append((position, data))
+        position += len(data)
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, sys.byteorder[0].encode(), rows, len(sections)))
+        file.write(b"".join(entries))
+        for offset, data in payloads:
+            file.write(bytes(offset - file.tell()))
+            file.write(data)
+    return rows
+
+
+def _read_sections(buffer):
+    """Розбирає заголовок і повертає кількість рядків та {назва: (тип, зміщення, довжина)}."""
+    if len(buffer) < _HEADER.size:
+        raise CatalogFormatError("Файл занадто короткий для каталогу")
+    magic, byteorder, rows, count = _HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise CatalogFormatError("Файл не є бінарним каталогом бібліотеки")
+    if byteorder != sys.byteorder[0].encode():
+        raise CatalogFormatError("Каталог записано з іншим порядком байтів")
+    sections = {}
+    for number in range(count):
+        name, typecode, offset, length = _SECTION.unpack_from(
+            buffer, _HEADER.size + number * _SECTION.size)
+        if offset + length > len(buffer):
+            raise CatalogFormatError("Каталог обрізано")
+        sections[name.rstrip(b"\x00").decode()] = (typecode.decode(), offset, length)
+    return rows, sections
+
+
+class _Column:
+    """Масив фіксованої ширини: відображена частина плюс дописані в пам'яті значення."""
+
+    __slots__ = ("_base", "_size", "_extra")
+
+    def __init__(self, base):
+        self._base = base
+        self._size = len(base)
+        self._extra = array(base.format)
+
+    def __len__(self):
+        return self._size + len(self._extra)
+
+    def __getitem__(self, position):
+        if position < self._size:
+            return self._base[position]
+        return self._extra[position - self._size]
+
+    def append(self, value):
+        """Дописує значення (файл не змінюється)."""
+        self._extra.append(value)
+
+
+class _Strings:
+    """Послідовність рядків таблиці: декодуються з файлу під час звернення."""
+
+    __slots__ = ("_offsets", "_data", "_start", "_size", "_extra")
+
+    def __init__(self, offsets, data, start):
+        self._offsets = offsets
+        self._data = data
+        self._start = start
+        self._size = len(offsets) - 1
+        self._extra = []
+
+    def __len__(self):
+        return self._size + len(self._extra)
+
+    def __getitem__(self, position):
+        if position < self._size:
+            start = self._start
+            offsets = self._offsets
+            return str(self._data[start + offsets[position]:start + offsets[position + 1]],
+                       "utf-8")
+        return self._extra[position - self._size]
+
+    def encoded(self, position):
+        """Повертає UTF-8 байти значення з файлу (без декодування)."""
+        start = self._start
+        return self._data[start + self._offsets[position]:start + self._offsets[position + 1]]
+
+    def append(self, value):
+        """Дописує значення (файл не змінюється)."""
+        self._extra.append(sys.intern(value))
+
+
+class MappedStringTable:
+    """Таблиця різних значень поля з інтерфейсом StringTable.
+
+    Словник значення -> ідентифікатор будується під час першого intern,
+    тобто лише коли до каталогу додають нову книгу.
+    """
+
+    def __init__(self, offsets, data, start):
+        self.values = _Strings(offsets, data, start)
+        self._ids = None
+
+    def __len__(self):
+        return len(self.values)
+
+    def intern(self, value):
+        """Повертає ідентифікатор значення, додаючи його за потреби."""
+        if self._ids is None:
+            self._ids = {self.values[i]: i for i in range(len(self.values))}
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+
+class _Titles:
+    """Назви за номерами рядків; кожна нова назва дописується окремим значенням."""
+
+    def __init__(self, table, ids):
+        self.table = table
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, row):
+        return self.table.values[self.ids[row]]
+
+    def append(self, title):
+        """Дописує назву нового рядка."""
+        self.ids.append(len(self.table.values))
+        self.table.values.append(title)
+
+
+class MappedFieldIndex:
+    """Пошук за полем у відображених колонках з n-грамним індексом для нових рядків.
+
+    Запит шукається в даних значень у нижньому регістрі (mmap.find),
+    знайдені значення перетворюються на рядки через постінг-списки.
+    Останній запит запам'ятовується, тож оцінка планувальника запитів
+    і подальший пошук переглядають дані один раз.
+    """
+
+    def __init__(self, store, field, size=3):
+        self._store = store
+        self._offsets = store.section(f"{field}.lower_offsets")
+        self._data = store.buffer
+        self._start = store.section_offset(f"{field}.lower_data")
+        self._posting_offsets = store.section(f"{field}.posting_offsets")
+        self._postings = store.section(f"{field}.postings")
+        self._base_rows = store.base_rows
+        self._extra = NgramIndex(size)  # Рядки, дописані після відкриття
+        self._last = (None, ())
+
+    def add(self, row, value):
+        """Індексує рядок, дописаний після відкриття файлу."""
+        if row >= self._base_rows:
+            self._extra.add(row, value)
+
+    def discard(self, row, value):
+        """Прибирає дописаний рядок (видалення рядків файлу враховує сховище)."""
+        if row >= self._base_rows:
+            self._extra.discard(row, value)
+
+    def matching_ids(self, query):
+        """Повертає ідентифікатори значень файлу, що містять запит (ігнорує регістр)."""
+        needle = query.lower()
+        if self._last[0] == needle:
+            return self._last[1]
+        encoded = needle.encode()
+        found = []
+        if _SEPARATOR not in encoded:
+            offsets, start = self._offsets, self._start
+            end = start + offsets[len(offsets) - 1]
+            find = self._data.find
+            position = find(encoded, start, end)
+            while position >= 0:
+                value_id = bisect_right(offsets, position - start) - 1
+                found.append(value_id)
+                position = find(encoded, start + offsets[value_id + 1], end)
+        self._last = (needle, found)
+        return found
+
+    def cardinality(self):
+        """Повертає кількість різних значень поля."""
+        return len(self._offsets) - 1 + self._extra.cardinality()
+
+    def estimate_values(self, query):
+        """Повертає кількість значень поля, що містять запит."""
+        return len(self.matching_ids(query)) + self._extra.estimate_values(query)
+
+    def search_rows(self, query):
+        """Повертає живі номери рядків, поле яких містить запит, за зростанням."""
+        offsets, postings = self._posting_offsets, self._postings
+        ids = self.matching_ids(query)
+        if len(ids) == 1:
+            rows = postings[offsets[ids[0]]:offsets[ids[0] + 1]].tolist()
+        else:
+            rows = array("I")
+            for value_id in ids:
+                rows.frombytes(postings[offsets[value_id]:offsets[value_id + 1]].cast("B"))
+            rows = sorted(rows)
+        removed = self._store.removed
+        if removed:
+            rows = [row for row in rows if row not in removed]
+        extra = self._extra.search(query)
+        if extra:
+            rows.extend(sorted(extra))
+        return rows
+
+
+class MappedSearchIndex(StoreSearchIndex):
+    """Пошуковий індекс MappedBookStore з тим самим інтерфейсом, що StoreSearchIndex."""
+
+    def __init__(self, store, fields=SEARCH_FIELDS):  # pylint: disable=super-init-not-called
+        self._store = store
+        self.fields = {field: MappedFieldIndex(store, field) for field in fields}
+
+    def search(self, field, value):
+        """Пошук книг за частковим співпадінням у полі (ігнорує регістр)."""
+        if not value:
+            return list(self._store)
+        return [BookView(self._store, row) for row in self.fields[field].search_rows(value)]
+
+
+class MappedBookStore(BookStore):
+    """Колонкове сховище книг, відображене з файлу каталогу через mmap.
+
+    Відкриття читає лише заголовок файлу і створює масив порядку
+    живих рядків (4 байти на рядок): колонки, пошук за полями і пошук
+    книги за назвою та автором працюють над відображеними масивами.
+    Нові книги дописуються в пам'ять (файл не змінюється), а видалені
+    рядки файлу запам'ятовуються в множині removed.
+    Підключається як звичайне сховище: service.open_catalog(path).
+
+    Аргументи:
+        path (str): Шлях до файлу, створеного write_catalog.
+    """
+
+    def __init__(self, path):  # pylint: disable=super-init-not-called
+        with open(path, "rb") as file:
+            try:
+                self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as error:  # Порожній файл
+                raise CatalogFormatError(str(error)) from error
+        self._views = []
+        try:
+            self.base_rows, self._sections = _read_sections(self.buffer)
+            tables = {field: MappedStringTable(self.section(f"{field}.offsets"), self.buffer,
+                                               self.section_offset(f"{field}.data"))
+                      for field in SEARCH_FIELDS}
+            self.titles = _Titles(tables["title"], _Column(self.section("title.ids")))
+            self.authors = tables["author"]
+            self.genres = tables["genre"]
+            self.author_ids = _Column(self.section("author.ids"))
+            self.genre_ids = _Column(self.section("genre.ids"))
+            self._keys = self.section("keys")
+        except KeyError as error:
+            self.close()
+            raise CatalogFormatError(f"У каталозі немає секції {error}") from error
+        except CatalogFormatError:
+            self.close()
+            raise
+        self.removed = set()
+        self._live = array("I", range(self.base_rows))
+        self._dead = set()
+        self._clear_rows()  # Хеш-таблиця рядків, дописаних після відкриття
+        self.key_index = StoreKeyIndex(self)
+        self.search_index = MappedSearchIndex(self)
+        self.indexes = []
+        self.revision = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def section(self, name):
+        """Повертає секцію файлу як memoryview з елементами її типу (без копіювання)."""
+        typecode, offset, length = self._sections[name]
+        view = memoryview(self.buffer)[offset:offset + length].cast(typecode)
+        self._views.append(view)
+        return view
+
+    def section_offset(self, name):
+        """Повертає зміщення секції від початку файлу."""
+        return self._sections[name][1]
+
+    def find_row(self, title, author):
+        """Повертає номер живого рядка з заданими назвою та автором або None."""
+        row = super().find_row(title, author)
+        if row is None and self.base_rows:
+            row = self._find_mapped(title, author)
+        return row
+
+    def _find_mapped(self, title, author):
+        """Шукає рядок файлу в хеш-таблиці за назвою (лінійне зондування)."""
+        keys, titles = self._keys, self.titles
+        mask = len(keys) - 1
+        encoded = title.encode()
+        slot = zlib.crc32(encoded) & mask
+        while keys[slot]:
+            row = keys[slot] - 1
+            if (titles.table.values.encoded(titles.ids[row]) == encoded
+                    and row not in self.removed
+                    and self.authors.values[self.author_ids[row]] == author):
+                return row
+            slot = (slot + 1) & mask
+        return None
+
+    def _unlink(self, title, row):
+        if row < self.base_rows:
+            self.removed.add(row)
+        else:
+            super()._unlink(title, row)
+
+    def close(self):
+        """Звільняє відображення файлу; представлення книг після цього недійсні."""
+        for view in self._views:
+            view.release()
+        self._views = []
+        self.buffer.close()
+
+
+def main(argv=None):
+    """Перетворює JSONL зі словниками Book.to_dict на бінарний каталог."""
+    parser = argparse.ArgumentParser(description="Експорт книг у бінарний каталог")
+    parser.add_argument("source", help="JSONL зі словниками Book.to_dict ('-' — stdin)")
+    parser.add_argument("target", help="файл бінарного каталогу")
+    args = parser.parse_args(argv)
+    stdin = args.source == "-"
+    with nullcontext(sys.stdin) if stdin else open(args.source, encoding="utf-8") as source:
+        rows = write_catalog(args.target, (json.loads(line) for line in source if line.strip()))
+    print(f"Записано книг: {rows}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Модуль обігу книг: черги резервувань і терміни повернення.
+Терміни видач і резервувань зберігаються в купі DeadlineQueue, тож
+перевірка прострочених видач і застарілих резервувань займає час,
+пропорційний кількості подій, що настали, а не кількості видач.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+DAY = 24 * 60 * 60
+
+
+class DeadlineQueue:
+    """Планувальник подій за термінами на основі купи.
+
+    Кожна подія має ключ; повторне планування ключа замінює попередній
+    термін, а скасування лише позначає запис у купі, який буде
+    відкинуто під час вилучення або ущільнення.
+    """
+
+    def __init__(self):
+        self._heap = []  # [термін, порядковий номер, ключ, дані, активний]
+        self._entries = {}  # {ключ: запис купи}
+        self._counter = itertools.count()
+        self._cancelled = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def schedule(self, key, deadline, payload=None):
+        """Планує подію з ключем key на момент deadline."""
+        self.cancel(key)
+        entry = [deadline, next(self._counter), key, payload, True]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def deadline(self, key):
+        """Повертає термін запланованої події або None."""
+        entry = self._entries.get(key)
+        return None if entry is None else entry[0]
+
+    def cancel(self, key):
+        """Скасовує подію, якщо вона запланована."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        entry[4] = False
+        self._cancelled += 1
+        if self._cancelled > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if entry[4]]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def pop_due(self, now):
+        """Вилучає події з терміном не пізніше now.
+
+        Повертає:
+            list: Трійки (ключ, термін, дані) у порядку термінів
+        """
+        heap, due = self._heap, []
+        while heap and heap[0][0] <= now:
+            deadline, _, key, payload, active = heapq.heappop(heap)
+            if not active:
+                self._cancelled -= 1
+                continue
+            del self._entries[key]
+            due.append((key, deadline, payload))
+        return due
+
+
+class Circulation:
+    """Черги резервувань книг і терміни повернення видач.
+
+    Черга книги — купа (пріоритет, порядковий номер), тож користувачі
+    з однаковим пріоритетом обслуговуються в порядку резервування.
+    LibraryService повідомляє про початок і кінець кожної видачі,
+    а process_due повертає видачі, що стали простроченими, та
+    резервування, термін яких минув.
+
+    Відлік терміну резервування починається не від моменту резервування,
+    а від терміну повернення поточної видачі: поки книга вчасно в
+    читача, черга не згорає. Кожна передача книги наступному з черги
+    переносить терміни решти резервувань на нову видачу.
+
+    Аргументи:
+        loan_period (float): Термін видачі в секундах.
+        reservation_period (float): Скільки секунд після терміну повернення
+            видачі резервування ще чекає на книгу.
+        clock: Функція поточного часу (типово time.time).
+    """
+
+    def __init__(self, loan_period=14 * DAY, reservation_period=7 * DAY, clock=time.time):
+        self.loan_period = loan_period
+        self.reservation_period = reservation_period
+        self.clock = clock
+        self.deadlines = DeadlineQueue()
+        self._queues = {}  # {Book: купа [пріоритет, номер, User, активний]}
+        self._reservations = {}  # {(Book, User): запис черги}
+        self._overdue = {}  # {Book: (User, термін)}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def start_loan(self, book, user, due=None):
+        """Записує видачу з терміном due (типово зараз + loan_period); повертає термін."""
+        if due is None:
+            due = self.clock() + self.loan_period
+        with self._lock:
+            self.deadlines.schedule(("loan", book), due, user)
+            for entry in self._queues.get(book, ()):
+                if entry[3]:
+                    self.deadlines.schedule(("reservation", book, entry[2]),
+                                            due + self.reservation_period)
+        return due
+
+    def end_loan(self, book):
+        """Прибирає термін і позначку прострочення поверненої книги."""
+        with self._lock:
+            self.deadlines.cancel(("loan", book))
+            self._overdue.pop(book, None)
+
+    def due(self, book):
+        """Повертає термін повернення виданої книги або None."""
+        with self._lock:
+            return self._due(book)
+
+    def _due(self, book):
+        deadline = self.deadlines.deadline(("loan", book))
+        if deadline is None and book in self._overdue:
+            deadline = self._overdue[book][1]
+        return deadline
+
+    def overdue(self):
+        """Повертає прострочені видачі: список (книга, користувач, термін)."""
+        with self._lock:
+            return [(book, user, due) for book, (user, due) in self._overdue.items()]
+
+    def reserve(self, book, user, priority=0):
+        """Ставить користувача в чергу книги (менший priority — раніше).
+
+        Повертає:
+            bool: False, якщо користувач уже в черзі
+        """
+        with self._lock:
+            if (book, user) in self._reservations:
+                return False
+            entry = [priority, next(self._counter), user, True]
+            self._reservations[(book, user)] = entry
+            heapq.heappush(self._queues.setdefault(book, []), entry)
+            # Видача без терміну (зроблена до ввімкнення) відлічується від зараз.
+            due = self._due(book)
+            available = self.clock() if due is None else due
+            self.deadlines.schedule(("reservation", book, user),
+                                    available + self.reservation_period)
+            return True
+
+    def cancel(self, book, user):
+        """Прибирає користувача з черги книги; повертає, чи він там був."""
+        with self._lock:
+            return self._drop(book, user)
+
+    def _drop(self, book, user):
+        entry = self._reservations.pop((book, user), None)
+        if entry is None:
+            return False
+        entry[3] = False
+        self.deadlines.cancel(("reservation", book, user))
+        queue = self._queues[book]
+        while queue and not queue[0][3]:
+            heapq.heappop(queue)
+        if not queue:
+            del self._queues[book]
+        return True
+
+    def cancel_user(self, user):
+        """Прибирає всі резервування користувача (наприклад, при його видаленні)."""
+        with self._lock:
+            for book, holder in [key for key in self._reservations if key[1] == user]:
+                self._drop(book, holder)
+
+    def waiting(self, book):
+        """Повертає користувачів у черзі книги в порядку обслуговування."""
+        with self._lock:
+            return [entry[2] for entry in sorted(self._queues.get(book, ())) if entry[3]]
+
+    def pop_next(self, book):
+        """Вилучає з черги книги наступного користувача або повертає None."""
+        with self._lock:
+            queue = self._queues.get(book)
+            if not queue:
+                return None
+            user = queue[0][2]
+            self._drop(book, user)
+            return user
+
+    def process_due(self, now=None):
+        """Обробляє терміни, що настали до моменту now (типово — зараз).
+
+        Повертає:
+            tuple: (прострочені видачі [(книга, користувач, термін)],
+                застарілі резервування [(книга, користувач)])
+        """
+        if now is None:
+            now = self.clock()
+        overdue, expired = [], []
+        with self._lock:
+            for key, deadline, user in self.deadlines.pop_due(now):
+                if key[0] == "loan":
+                    self._overdue[key[1]] = (user, deadline)
+                    overdue.append((key[1], user, deadline))
+                else:
+                    _, book, user = key
+                    self._drop(book, user)
+                    expired.append((book, user))
+        return overdue, expired
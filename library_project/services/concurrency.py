@@ -0,0 +1,36 @@
+"""
+Модуль примітивів синхронізації для LibraryService.
+Містить набір розподілених (striped) блокувань: об'єкти хешуються на
+фіксовану кількість замків, тож операції над різними книгами чи
+користувачами зазвичай не блокують одна одну.
+"""
+
+import threading
+from contextlib import ExitStack
+
+
+class LockStripes:
+    """Фіксований набір блокувань, вибір яких визначається хешем об'єкта.
+
+    Аргументи:
+        count (int): Кількість блокувань.
+    """
+
+    def __init__(self, count=64):
+        self.locks = tuple(threading.RLock() for _ in range(count))
+
+    def __call__(self, item):
+        """Повертає блокування для заданого об'єкта."""
+        return self.locks[hash(item) % len(self.locks)]
+
+
+def acquire_all(*locks):
+    """Захоплює кілька блокувань у заданому порядку.
+
+    Повертає:
+        ExitStack: Контекстний менеджер, що звільняє всі блокування.
+    """
+    stack = ExitStack()
+    for lock in locks:
+        stack.enter_context(lock)
+    return stack
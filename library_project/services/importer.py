@@ -0,0 +1,81 @@
+"""
+Модуль потокового читання книг і користувачів з файлів CSV та JSONL.
+Формат записів книг відповідає Book.to_dict, користувачів — полям name і role.
+Читачі є генераторами: файл обробляється порядково, а рядки з помилками
+повертаються як ImportRowError, щоб LibraryService.add_books або
+register_users занесли їх у звіт.
+"""
+
+import csv
+import json
+from contextlib import nullcontext
+
+from library_project.models import Book
+from library_project.models.user import UserFactory
+from library_project.services.library import ImportRowError
+
+PARSE_ERRORS = (KeyError, TypeError, ValueError, AttributeError)
+
+
+def _open(source):
+    """Відкриває шлях для читання; вже відкритий файл повертає без закриття.
+
+    Результат використовується в with усередині генератора, тож файл
+    закривається й тоді, коли виклик припиняє ітерацію (break, close).
+    """
+    if hasattr(source, "read"):
+        return nullcontext(source)
+    return open(source, encoding="utf-8", newline="")
+
+
+def _user_from_dict(data):
+    return UserFactory.create_user(data["role"].strip().lower(), data["name"])
+
+
+def _read_csv(source, parse):
+    with _open(source) as file:
+        reader = csv.DictReader(file)
+        for record in reader:
+            try:
+                yield parse(record)
+            except PARSE_ERRORS as error:
+                yield ImportRowError(reader.line_num, repr(error))
+
+
+def _read_jsonl(source, parse):
+    with _open(source) as file:
+        for row, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield parse(json.loads(line))
+            except PARSE_ERRORS as error:
+                yield ImportRowError(row, repr(error))
+
+
+def read_books_csv(source, pool=None):
+    """Читає книги з CSV зі стовпцями title, author, genre.
+
+    Аргументи:
+        source: Шлях до файлу або відкритий текстовий файл
+        pool (BookPool): Пул, з якого беруться однакові книги, або None
+
+    Повертає:
+        Генератор Book або ImportRowError для кожного рядка
+    """
+    return _read_csv(source, Book.from_dict if pool is None else pool.from_dict)
+
+
+def read_books_jsonl(source, pool=None):
+    """Читає книги з JSONL, де кожен рядок — словник у форматі Book.to_dict."""
+    return _read_jsonl(source, Book.from_dict if pool is None else pool.from_dict)
+
+
+def read_users_csv(source):
+    """Читає користувачів з CSV зі стовпцями name, role."""
+    return _read_csv(source, _user_from_dict)
+
+
+def read_users_jsonl(source):
+    """Читає користувачів з JSONL зі словниками {"name": ..., "role": ...}."""
+    return _read_jsonl(source, _user_from_dict)
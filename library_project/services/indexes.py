@@ -0,0 +1,697 @@
+"""
+Модуль індексів каталогу.
+Містить інвертований n-грамний індекс для пошуку книг за підрядком,
+індекс нечіткого пошуку з допуском на помилки
+та список, який автоматично підтримує підключені до нього індекси.
+"""
+
+import re
+import threading
+from contextlib import suppress
+
+SEARCH_FIELDS = ("title", "author", "genre")
+FUZZY_FIELDS = ("title", "author")
+
+_WORD = re.compile(r"\w+")
+
+_MISSING = object()
+
+
+def book_key(book):
+    """Повертає ключ унікальності книги: (назва, автор)."""
+    return book.title, book.author
+
+
+def user_key(user):
+    """Повертає ключ унікальності користувача: (ім'я, клас)."""
+    return user.name, user.__class__
+
+
+def _hold(holders, key, item):
+    """Додає item до власників ключа; повертає True, якщо ключ новий.
+
+    Ключ з єдиним власником зберігає його напряму, без окремого словника.
+    """
+    current = holders.get(key, _MISSING)
+    if current is _MISSING:
+        holders[key] = item
+        return True
+    if type(current) is dict:
+        current[item] = None
+    elif current != item:
+        holders[key] = {current: None, item: None}
+    return False
+
+
+def _release(holders, key, item):
+    """Прибирає item з власників ключа; повертає True, якщо ключ видалено."""
+    current = holders.get(key, _MISSING)
+    if type(current) is dict:
+        current.pop(item, None)
+        if len(current) == 1:
+            holders[key] = next(iter(current))
+        return False
+    if current is _MISSING or current != item:
+        return False
+    del holders[key]
+    return True
+
+
+def _members(holders):
+    """Повертає копію власників ключа (порожню, якщо ключа вже немає).
+
+    Читачі не захоплюють блокувань, тож ключ, знайдений мить тому,
+    може бути вже видалений, а словник власників — змінюватися.
+    """
+    if holders is None:
+        return ()
+    return tuple(holders) if type(holders) is dict else (holders,)
+
+
+def revision(items):
+    """Повертає ознаку вмісту послідовності для перевірки застарілих копій.
+
+    Для IndexedList і BookStore це лічильник змін revision, для інших
+    послідовностей — лише довжина (заміну елемента без зміни довжини
+    вона не помічає).
+    """
+    return getattr(items, "revision", None), len(items)
+
+
+def ngrams(text, size):
+    """Повертає множину n-грам рядка.
+
+    Аргументи:
+        text (str): Рядок у нижньому регістрі.
+        size (int): Довжина n-грами.
+
+    Повертає:
+        set: Множина n-грам (порожня, якщо рядок коротший за size).
+    """
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class NgramIndex:
+    """Інвертований n-грамний індекс значень одного поля.
+
+    Постінг-списки зберігаються не для книг, а для різних значень поля
+    (у нижньому регістрі), тому автори та жанри, що повторюються,
+    індексуються лише один раз.
+    """
+
+    def __init__(self, size=3):
+        self.size = size
+        self._postings = {}  # {n-грама: set(значення)}
+        self._values = {}  # {значення: Book або {Book: None}}
+
+    def add(self, book, value):
+        """Додає книгу з заданим значенням поля до індексу."""
+        key = value.lower()
+        if _hold(self._values, key, book):
+            for gram in ngrams(key, self.size):
+                self._postings.setdefault(gram, set()).add(key)
+
+    def discard(self, book, value):
+        """Видаляє книгу з індексу, якщо вона там є."""
+        key = value.lower()
+        if not _release(self._values, key, book):
+            return
+        for gram in ngrams(key, self.size):
+            posting = self._postings[gram]
+            posting.discard(key)
+            if not posting:
+                del self._postings[gram]
+
+    def clear(self):
+        """Очищає індекс."""
+        self._postings.clear()
+        self._values.clear()
+
+    def matching_values(self, query):
+        """Повертає значення поля, що містять запит як підрядок.
+
+        Для запитів, не коротших за n-граму, перетинає постінг-списки
+        (від найкоротшого) і перевіряє кандидатів; коротші запити
+        перевіряються по словнику різних значень поля.
+        """
+        needle = query.lower()
+        grams = ngrams(needle, self.size)
+        if not grams:
+            candidates = list(self._values)
+        else:
+            postings = []
+            for gram in grams:
+                posting = self._postings.get(gram)
+                if not posting:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = postings[0].intersection(*postings[1:])
+        return [value for value in candidates if needle in value]
+
+    def cardinality(self):
+        """Повертає кількість різних значень поля."""
+        return len(self._values)
+
+    def estimate_values(self, query):
+        """Оцінює зверху кількість значень поля, що містять запит.
+
+        Оцінка — розмір найкоротшого постінг-списку n-грам запиту;
+        для коротких запитів — кількість усіх значень.
+        """
+        grams = ngrams(query.lower(), self.size)
+        if not grams:
+            return len(self._values)
+        return min(len(self._postings.get(gram, ())) for gram in grams)
+
+    def search(self, query):
+        """Повертає книги, значення поля яких містить запит (без порядку)."""
+        books = []
+        for value in self.matching_values(query):
+            books.extend(_members(self._values.get(value)))
+        return books
+
+
+class SearchIndex:
+    """Набір n-грамних індексів для полів назви, автора та жанру.
+
+    Зберігає порядок додавання книг, тож результати пошуку збігаються
+    з результатами лінійного перегляду списку книг.
+    """
+
+    def __init__(self, fields=SEARCH_FIELDS, size=3):
+        self.fields = {field: NgramIndex(size) for field in fields}
+        self._order = {}  # {Book: порядковий номер}
+        self._next = 0
+
+    def __len__(self):
+        return len(self._order)
+
+    def add(self, book):
+        """Індексує книгу за всіма полями."""
+        if book in self._order:
+            return
+        self._order[book] = self._next
+        self._next += 1
+        for field, index in self.fields.items():
+            index.add(book, getattr(book, field))
+
+    def discard(self, book):
+        """Прибирає книгу з усіх індексів."""
+        if self._order.pop(book, None) is None:
+            return
+        for field, index in self.fields.items():
+            index.discard(book, getattr(book, field))
+
+    def position(self, book):
+        """Повертає порядковий номер книги в каталозі (для впорядкування результатів)."""
+        return self._order.get(book, -1)
+
+    def rebuild(self, books):
+        """Перебудовує індекс з нуля за заданою послідовністю книг."""
+        for index in self.fields.values():
+            index.clear()
+        self._order.clear()
+        self._next = 0
+        for book in books:
+            self.add(book)
+
+    def search(self, field, value):
+        """Пошук книг за частковим співпадінням у полі (ігнорує регістр).
+
+        Аргументи:
+            field (str): Назва поля (title, author або genre).
+            value (str): Значення для пошуку.
+
+        Повертає:
+            list: Книги у порядку їх додавання.
+        """
+        if not value:
+            return list(self._order)
+        books = self.fields[field].search(value)
+        # Книга, видалена паралельно з пошуком, отримує номер -1.
+        books.sort(key=self.position)
+        return books
+
+
+def words(text):
+    """Повертає слова рядка в нижньому регістрі."""
+    return _WORD.findall(text.lower())
+
+
+def deletions(word, distance):
+    """Повертає слово та всі його варіанти з видаленими не більше ніж distance символами."""
+    variants = frontier = {word}
+    for _ in range(distance):
+        frontier = {variant[:i] + variant[i + 1:]
+                    for variant in frontier for i in range(len(variant))}
+        variants = variants | frontier
+    return variants
+
+
+def edit_distance(first, second, limit):
+    """Повертає відстань редагування між словами з урахуванням перестановки сусідніх літер.
+
+    Обчислення припиняється, щойно відстань гарантовано перевищує limit;
+    у такому разі повертається limit + 1.
+    """
+    if first == second:
+        return 0
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    before = previous = list(range(len(second) + 1))  # before потрібен лише з i > 1
+    for i, left in enumerate(first, 1):
+        current = [i]
+        for j, right in enumerate(second, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (left != right))
+            if i > 1 and j > 1 and left == second[j - 2] and first[i - 2] == right:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def word_distance(query_word, word, limit):
+    """Відстань між словом запиту і словом значення; числа збігаються лише точно."""
+    if query_word.isdigit() or word.isdigit():
+        return 0 if query_word == word else limit + 1
+    return edit_distance(query_word, word, limit)
+
+
+def match_distance(query_words, text, limit):
+    """Повертає суму відстаней від кожного слова запиту до найближчого слова text.
+
+    Результат більший за limit означає, що text не відповідає запиту.
+    """
+    value_words = words(text)
+    total = 0
+    for query_word in query_words:
+        total += min((word_distance(query_word, word, limit) for word in value_words),
+                     default=limit + 1)
+        if total > limit:
+            return limit + 1
+    return total
+
+
+class FuzzyIndex:
+    """Індекс нечіткого пошуку за словами значень одного поля.
+
+    Використовує симетричні видалення (як SymSpell): для кожного слова
+    заздалегідь збережено всі його варіанти без не більше ніж max_distance
+    символів. Слова в межах відстані max_distance мають спільний варіант,
+    тому кандидатів дає кілька звернень до словника, а відстань
+    обчислюється лише для них. Числа індексуються лише для точного збігу.
+    """
+
+    def __init__(self, max_distance=2):
+        self.max_distance = max_distance
+        self._values = {}  # {значення: Book або {Book: None}}
+        self._words = {}  # {слово: значення або {значення: None}}
+        self._deletions = {}  # {варіант: слово або {слово: None}}
+
+    def add(self, book, value):
+        """Додає книгу з заданим значенням поля до індексу."""
+        key = value.lower()
+        if not _hold(self._values, key, book):
+            return
+        for word in set(words(key)):
+            if _hold(self._words, word, key) and not word.isdigit():
+                for variant in deletions(word, self.max_distance):
+                    _hold(self._deletions, variant, word)
+
+    def discard(self, book, value):
+        """Видаляє книгу з індексу, якщо вона там є."""
+        key = value.lower()
+        if not _release(self._values, key, book):
+            return
+        for word in set(words(key)):
+            if _release(self._words, word, key) and not word.isdigit():
+                for variant in deletions(word, self.max_distance):
+                    _release(self._deletions, variant, word)
+
+    def clear(self):
+        """Очищає індекс."""
+        self._values.clear()
+        self._words.clear()
+        self._deletions.clear()
+
+    def books(self, value):
+        """Повертає книги з заданим значенням поля (у нижньому регістрі)."""
+        return _members(self._values.get(value))
+
+    def _similar_words(self, query_word, limit):
+        if query_word.isdigit():
+            return {query_word: 0} if query_word in self._words else {}
+        candidates = set()
+        for variant in deletions(query_word, limit):
+            holders = self._deletions.get(variant, _MISSING)
+            if holders is not _MISSING:
+                candidates.update(_members(holders))
+        found = {}
+        for word in candidates:
+            distance = word_distance(query_word, word, limit)
+            if distance <= limit:
+                found[word] = distance
+        return found
+
+    def search(self, query_words, limit):
+        """Повертає {значення: відстань} для значень поля, близьких до запиту.
+
+        Кожне слово запиту має збігатися з якимось словом значення, а сума
+        відстаней не перевищувати limit. Кандидатів дає слово запиту з
+        найменшою кількістю значень, решта слів перевіряється за словами
+        самого значення.
+        """
+        if not query_words:
+            return {}
+        similar = [self._similar_words(query_word, limit) for query_word in query_words]
+        driver = min(range(len(similar)), key=lambda i: sum(
+            len(_members(self._words.get(word))) for word in similar[i]))
+        others = similar[:driver] + similar[driver + 1:]
+        found = {}
+        for word, distance in similar[driver].items():
+            for value in _members(self._words.get(word)):
+                total = distance
+                value_words = words(value)
+                for matches in others:
+                    total += min((matches.get(other, limit + 1) for other in value_words),
+                                 default=limit + 1)
+                if total <= limit and total < found.get(value, limit + 1):
+                    found[value] = total
+        return found
+
+
+class FuzzySearchIndex:
+    """Набір індексів нечіткого пошуку за назвою та автором.
+
+    Підключається до списку книг як звичайний індекс (add, discard, rebuild).
+
+    Аргументи:
+        fields (tuple): Поля для індексації.
+        max_distance (int): Найбільша відстань редагування, яку підтримує індекс.
+    """
+
+    def __init__(self, fields=FUZZY_FIELDS, max_distance=2):
+        self.max_distance = max_distance
+        self.fields = {field: FuzzyIndex(max_distance) for field in fields}
+
+    def add(self, book):
+        """Індексує книгу за всіма полями."""
+        for field, index in self.fields.items():
+            index.add(book, getattr(book, field))
+
+    def discard(self, book):
+        """Прибирає книгу з усіх індексів."""
+        for field, index in self.fields.items():
+            index.discard(book, getattr(book, field))
+
+    def rebuild(self, books):
+        """Перебудовує індекс з нуля за заданою послідовністю книг."""
+        for index in self.fields.values():
+            index.clear()
+        for book in books:
+            self.add(book)
+
+    def supports(self, fields, max_distance):
+        """Перевіряє, чи покриває індекс задані поля і відстань."""
+        return max_distance <= self.max_distance and all(field in self.fields for field in fields)
+
+    def search(self, value, max_distance, fields=FUZZY_FIELDS):
+        """Повертає {книга: відстань} для книг, близьких до запиту хоча б в одному полі.
+
+        Відстань книги — найменша серед полів.
+        """
+        query_words = words(value)
+        found = {}
+        for field in fields:
+            index = self.fields[field]
+            for key, distance in index.search(query_words, max_distance).items():
+                for book in index.books(key):
+                    if distance < found.get(book, max_distance + 1):
+                        found[book] = distance
+        return found
+
+
+class KeyIndex:
+    """Хеш-індекс елементів за ключем для перевірки дублікатів за O(1).
+
+    Аргументи:
+        key: Функція, що повертає ключ елемента.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self._items = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, default=None):
+        """Повертає елемент за ключем або default."""
+        return self._items.get(key, default)
+
+    def add(self, item):
+        """Додає елемент до індексу (перший елемент з ключем має пріоритет)."""
+        self._items.setdefault(self.key(item), item)
+
+    def discard(self, item):
+        """Видаляє елемент з індексу, якщо під ключем зберігається рівний йому (==)."""
+        key = self.key(item)
+        if key in self._items and self._items[key] == item:
+            del self._items[key]
+
+    def rebuild(self, items):
+        """Перебудовує індекс за заданою послідовністю елементів."""
+        self._items.clear()
+        for item in items:
+            self.add(item)
+
+
+class BookIdIndex:
+    """Хеш-індекс книг за ідентифікатором Book.id.
+
+    Словник будується під час першого пошуку, а далі підтримується
+    інкрементально, тож каталоги, у яких книги за id не шукають
+    (наприклад, великий MappedBookStore), не витрачають на нього пам'ять.
+    """
+
+    def __init__(self):
+        self._source = ()
+        self._books = None  # {id: книга} або None, поки індекс не потрібен
+        self._lock = threading.Lock()
+
+    def add(self, book):
+        """Додає книгу до побудованого індексу."""
+        with self._lock:
+            if self._books is not None:
+                self._books.setdefault(book.id, book)
+
+    def discard(self, book):
+        """Видаляє книгу з побудованого індексу."""
+        with self._lock:
+            if self._books is not None:
+                key = book.id
+                if key in self._books and self._books[key] == book:
+                    del self._books[key]
+
+    def rebuild(self, books):
+        """Запам'ятовує нове джерело; словник буде побудовано при наступному пошуку."""
+        with self._lock:
+            self._source = books
+            self._books = None
+
+    def get(self, book_id, default=None):
+        """Повертає книгу за ідентифікатором або default."""
+        with self._lock:
+            if self._books is None:
+                self._books = {}
+                for book in self._source:
+                    self._books.setdefault(book.id, book)
+            return self._books.get(book_id, default)
+
+
+class IndexedList(list):
+    """Список, що підтримує в актуальному стані підключені індекси.
+
+    Кожен індекс має методи add(item), discard(item) та rebuild(items).
+    Операції додавання та видалення оновлюють індекси інкрементально,
+    решта змін (вставка, сортування, присвоєння за зрізом) — повною
+    перебудовою. Якщо індекс не може прийняти новий елемент, додавання
+    скасовується: елемент прибирається зі списку та з усіх індексів.
+
+    Атрибут revision зростає з кожною зміною вмісту, тож копії каталогу
+    (VectorizedSearch, SearchExecutor) помічають заміну книги навіть
+    тоді, коли довжина списку не змінилася.
+    """
+
+    def __init__(self, items=(), indexes=()):
+        super().__init__(items)
+        self.revision = 0
+        self.indexes = list(indexes)
+        for index in self.indexes:
+            index.rebuild(self)
+
+    def attach(self, index):
+        """Підключає новий індекс і будує його за поточним вмістом."""
+        self.indexes.append(index)
+        index.rebuild(self)
+
+    def _rebuild(self):
+        self.revision += 1
+        for index in self.indexes:
+            index.rebuild(self)
+
+    def append(self, item):
+        super().append(item)
+        for position, index in enumerate(self.indexes):
+            try:
+                index.add(item)
+            except Exception:
+                # Індекси, включно з тим, що не впорався, могли частково
+                # врахувати елемент; помилки прибирання не маскують первинну.
+                for added in self.indexes[:position + 1]:
+                    with suppress(Exception):
+                        added.discard(item)
+                super().pop()
+                raise
+        self.revision += 1
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def remove(self, item):
+        super().remove(item)
+        self.revision += 1
+        for index in self.indexes:
+            index.discard(item)
+
+    def pop(self, position=-1):
+        item = super().pop(position)
+        self.revision += 1
+        for index in self.indexes:
+            index.discard(item)
+        return item
+
+    def clear(self):
+        super().clear()
+        self._rebuild()
+
+    def insert(self, position, item):
+        super().insert(position, item)
+        self._rebuild()
+
+    def __setitem__(self, position, item):
+        super().__setitem__(position, item)
+        self._rebuild()
+
+    def __delitem__(self, position):
+        super().__delitem__(position)
+        self._rebuild()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._rebuild()
+
+    def reverse(self):
+        super().reverse()
+        self._rebuild()
+
+
+class BookList(IndexedList):
+    """Список книг із вбудованим пошуковим індексом.
+
+    Стратегії пошуку розпізнають атрибут search_index і використовують
+    індекс замість лінійного перегляду. Замість власного SearchIndex
+    можна передати інший індекс з тим самим інтерфейсом (наприклад,
+    фонд філії над спільним каталогом, див. branches.BranchHoldings).
+    """
+
+    def __init__(self, books=(), indexes=(), search_index=None):
+        self.search_index = search_index if search_index is not None else SearchIndex()
+        self.key_index = KeyIndex(book_key)
+        super().__init__(books, [self.search_index, self.key_index, *indexes])
+
+
+class UserList(IndexedList):
+    """Список користувачів з хеш-індексом за ім'ям та класом користувача."""
+
+    def __init__(self, users=(), indexes=()):
+        self.key_index = KeyIndex(user_key)
+        super().__init__(users, [self.key_index, *indexes])
+
+
+class LoanMap(dict):
+    """Словник видач {Book: User} зі зворотним індексом користувач -> книги.
+
+    Дозволяє отримати книги користувача та їх кількість за O(1),
+    не переглядаючи всі видачі.
+    """
+
+    def __init__(self, loans=()):
+        super().__init__()
+        self._by_user = {}  # {User: {Book: None}}
+        self.update(loans)
+
+    def __setitem__(self, book, user):
+        if book in self:
+            self._unlink(book, self[book])
+        super().__setitem__(book, user)
+        self._by_user.setdefault(user, {})[book] = None
+
+    def __delitem__(self, book):
+        user = self[book]
+        super().__delitem__(book)
+        self._unlink(book, user)
+
+    def _unlink(self, book, user):
+        books = self._by_user[user]
+        del books[book]
+        if not books:
+            del self._by_user[user]
+
+    def pop(self, book, *default):
+        if book not in self:
+            return super().pop(book, *default)
+        user = self[book]
+        del self[book]
+        return user
+
+    def popitem(self):
+        book, user = super().popitem()
+        self._unlink(book, user)
+        return book, user
+
+    def setdefault(self, book, user=None):
+        if book not in self:
+            self[book] = user
+        return self[book]
+
+    def update(self, *args, **kwargs):
+        for book, user in dict(*args, **kwargs).items():
+            self[book] = user
+
+    def clear(self):
+        super().clear()
+        self._by_user.clear()
+
+    def books_of(self, user):
+        """Повертає список книг користувача у порядку видачі."""
+        return list(self._by_user.get(user, ()))
+
+    def count(self, user):
+        """Повертає кількість книг, виданих користувачу."""
+        return len(self._by_user.get(user, ()))
+
+    def borrowers(self):
+        """Повертає список користувачів, які мають видані книги."""
+        return list(self._by_user)
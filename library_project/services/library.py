@@ -4,8 +4,31 @@
 Визначені власні виключення для обробки помилок.
 """
 
+import threading
+
 from library_project.patterns import SingletonMeta, Notifier
+from library_project.patterns.cache import SearchCache
+from library_project.patterns.events import (
+    BookAdded, BookRemoved, UserRegistered, UserRemoved, BookLent, BookReturned,
+    BooksImported, UsersImported, BookReserved, ReservationFulfilled, ReservationExpired,
+    LoanOverdue,
+)
+from library_project.patterns.query import execute
 from library_project.models import Book
+from library_project.models.user import UserFactory
+from library_project.services.indexes import (
+    BookList, UserList, LoanMap, FuzzySearchIndex, BookIdIndex
+)
+from library_project.services.book_store import BookStore
+from library_project.services.catalog_file import MappedBookStore
+from library_project.services.autocomplete import Autocomplete
+from library_project.services.aggregates import CatalogAggregates
+from library_project.services.circulation import Circulation, DAY
+from library_project.services.snapshots import VersionedState
+from library_project.services.branches import SharedCatalog, BranchHoldings
+from library_project.services.concurrency import LockStripes, acquire_all
+from library_project.services.pagination import iterate, paginate
+from library_project.services.metrics import instrumented
 
 
 class LibraryError(Exception):
@@ -20,6 +43,14 @@ class UserExistsError(LibraryError):
     """Виключення при додаванні користувача, який вже існує."""
 
 
+class UserNotFoundError(LibraryError):
+    """Виключення, коли користувач не зареєстрований у бібліотеці."""
+
+
+class UserHasBooksError(LibraryError):
+    """Виключення при видаленні користувача, який має невернуті книги."""
+
+
 class BookNotFoundError(LibraryError):
     """Виключення, коли книга не знайдена у бібліотеці."""
 
@@ -32,28 +63,571 @@ class ReturnBookError(LibraryError):
     """Виключення при спробі повернути книгу, яку не можна повернути."""
 
 
+class ReservationError(LibraryError):
+    """Виключення, коли книгу не можна зарезервувати або резервування вимкнено."""
+
+
+class ImportRowError(LibraryError):
+    """Виключення для рядка вхідного файлу, який не вдалося розібрати.
+
+    Атрибути:
+        row (int): Номер рядка у файлі (може відрізнятися від номера запису).
+    """
+
+    def __init__(self, row, message):
+        super().__init__(f"Рядок {row}: {message}")
+        self.row = row
+
+
+class ImportReport:
+    """Підсумок масового імпорту: кількість доданих записів і помилки по рядках."""
+
+    def __init__(self):
+        self.added = 0
+        self.errors = []  # [(порядковий номер запису в джерелі, LibraryError)]
+
+    def __repr__(self):
+        return f"ImportReport(added={self.added}, errors={len(self.errors)})"
+
+
 class LibraryService(metaclass=SingletonMeta):
-    """Сервіс для роботи з бібліотекою (додавання книг, користувачів, видача книг)."""
+    """Сервіс для роботи з бібліотекою (додавання книг, користувачів, видача книг).
+
+    Безпечний для використання з кількох потоків. Зміни каталогу та списку
+    користувачів серіалізуються окремими блокуваннями, видача й повернення
+    блокують лише смуги (stripes) конкретної книги та користувача, а пошук
+    і перегляд списків виконуються без блокувань.
+
+    LibraryService() повертає єдиний сервіс процесу, а for_branch — сервіси
+    філій зі спільним каталогом.
+    """
+
+    _shared_catalog = None  # Типовий спільний каталог філій (SharedCatalog)
+    _branches_lock = threading.Lock()
 
     def __init__(self):
-        self.books = []
-        self.users = []
-        self.lent_books = {}  # {Book: User}
+        self._book_ids = BookIdIndex()
+        self._books = BookList(indexes=[self._book_ids])
+        self._users = UserList()
         self.notifier = Notifier()
+        self.journal = None  # Журнал змін (наприклад, LibraryStorage) або None
+        self.search_cache = None
+        self.fuzzy_index = None
+        self.autocomplete = None
+        self.aggregates = None
+        self.circulation = None  # Черги резервувань і терміни видач (Circulation)
+        self.versions = None  # Журнали версій для знімків (VersionedState)
+        self.branch = None  # Назва філії (for_branch) або None
+        self.catalog = None  # Спільний каталог філії (SharedCatalog) або None
+        self._holdings = None  # Фонд філії у спільному каталозі (BranchHoldings)
+        self.lent_books = LoanMap()  # {Book: User}
+        self._catalog_lock = threading.RLock()
+        self._users_lock = threading.RLock()
+        self._book_locks = LockStripes()
+        self._user_locks = LockStripes()
+
+    @classmethod
+    def shared_catalog(cls):
+        """Повертає типовий спільний каталог філій, створюючи його за потреби."""
+        with cls._branches_lock:
+            if cls._shared_catalog is None:
+                cls._shared_catalog = SharedCatalog()
+            return cls._shared_catalog
+
+    @classmethod
+    def for_branch(cls, name, catalog=None):
+        """Повертає сервіс філії name, створюючи його при першому виклику.
+
+        Філії мають власні фонди, користувачів і видачі, а книги та
+        пошуковий індекс зберігаються один раз у спільному каталозі:
+        однакові книги різних філій — той самий екземпляр, а пошук у
+        філії відбирає свої книги з результатів спільного індексу.
+        Пошук по всіх філіях — catalog.search.
+
+        Аргументи:
+            name (str): Назва філії, наприклад "kyiv-central"
+            catalog (SharedCatalog): Спільний каталог (типово shared_catalog())
+
+        Повертає:
+            LibraryService: Сервіс філії
+        """
+        if catalog is None:
+            catalog = cls.shared_catalog()
+
+        def create(branch):
+            # type.__call__ обходить SingletonMeta: філій може бути багато.
+            service = type.__call__(cls)
+            service.branch = branch
+            service.catalog = catalog
+            service._holdings = BranchHoldings(catalog, branch)
+            service.books = ()
+            return service
+
+        return catalog.branch(name, create)
+
+    def exclusive(self):
+        """Зупиняє всі зміни стану на час блоку with (наприклад, для знімка).
+
+        Блокування захоплюються в тому ж порядку, що й у методах зміни:
+        каталог, користувачі, смуги книг, смуги користувачів.
+        """
+        return acquire_all(self._catalog_lock, self._users_lock,
+                           *self._book_locks.locks, *self._user_locks.locks)
+
+    def _loan_locks(self, book, user):
+        """Захоплює блокування книги, потім користувача (сталий порядок без взаємоблокувань)."""
+        return acquire_all(self._book_locks(book), self._user_locks(user))
+
+    def _record(self, operation, *items):
+        """Передає зміну стану (операцію та її книги/користувачів) в журнал."""
+        if self.journal is not None:
+            self.journal.record(operation, *items)
+
+    @property
+    def books(self):
+        """Список книг бібліотеки з підтримуваним пошуковим індексом.
+
+        Замість списку можна присвоїти колонкове сховище BookStore
+        (у тому числі відображений з файлу MappedBookStore, див. open_catalog).
+        """
+        return self._books
+
+    @books.setter
+    def books(self, books):
+        if isinstance(books, BookStore):
+            if self._holdings is not None:
+                self._holdings.rebuild(())  # Колонкове сховище не входить до спільного каталогу
+            self._books = books
+        else:
+            if self.catalog is not None:
+                books = [self._shared(book) for book in books]
+            self._books = BookList(books, search_index=self._holdings)
+        self._books.attach(self._book_ids)
+        if self.search_cache is not None:
+            self._attach_search_cache()
+        if self.fuzzy_index is not None:
+            self._books.attach(self.fuzzy_index)
+        if self.autocomplete is not None:
+            self._books.attach(self.autocomplete)
+        if self.aggregates is not None:
+            self._books.attach(self.aggregates)
+        self._reset_versions()
+
+    @property
+    def lent_books(self):
+        """Видачі {Book: User} зі зворотним індексом користувач -> книги (LoanMap)."""
+        return self._lent_books
+
+    @lent_books.setter
+    def lent_books(self, loans):
+        self._lent_books = loans
+        if self.aggregates is not None:
+            self.aggregates.loans = loans
+            self.aggregates.rebuild(self._books)
+        self._reset_versions()
+
+    def open_catalog(self, path):
+        """Замінює каталог бінарним файлом, створеним catalog_file.write_catalog.
+
+        Файл відображається в пам'ять (mmap) без розбору; книги читаються
+        з диска під час звернення. Увімкнені похідні індекси (нечіткий
+        пошук, автодоповнення, агрегати) та журнал версій знімків
+        перебудовуються за всіма рядками каталогу, тож із ними відкриття
+        займає O(N): для 200 тис. книг — близько 0,004 с без них і кілька
+        секунд з набором main.py (див. benchmarks.open_catalog).
+        Нові книги додаються в пам'ять, файл не змінюється.
+
+        Аргументи:
+            path (str): Шлях до файлу каталогу
+
+        Повертає:
+            MappedBookStore: Новий каталог бібліотеки
+        """
+        with self._catalog_lock:
+            self.books = MappedBookStore(path)
+        return self._books
+
+    def enable_search_cache(self, maxsize=1024, ttl=None):
+        """Вмикає кеш результатів пошуку для каталогу бібліотеки.
+
+        Кеш оновлюється при кожній зміні каталогу: додавання чи видалення
+        книги видаляє лише записи, на які ця книга впливає.
+
+        Аргументи:
+            maxsize (int): Максимальна кількість записів кешу
+            ttl (float): Час життя запису в секундах або None
+
+        Повертає:
+            SearchCache: Кеш для використання з CachedSearch
+        """
+        self.search_cache = SearchCache(maxsize, ttl)
+        self._attach_search_cache()
+        return self.search_cache
+
+    def _attach_search_cache(self):
+        self.search_cache.source = self._books
+        self._books.attach(self.search_cache)
+
+    def enable_fuzzy_search(self, max_distance=2):
+        """Будує індекс нечіткого пошуку за назвою та автором для SearchFuzzy.
+
+        Індекс оновлюється при кожній зміні каталогу.
+
+        Аргументи:
+            max_distance (int): Найбільша допустима кількість помилок у запиті
+
+        Повертає:
+            FuzzySearchIndex: Підключений індекс
+        """
+        with self._catalog_lock:
+            self.fuzzy_index = FuzzySearchIndex(max_distance=max_distance)
+            self._books.attach(self.fuzzy_index)
+        return self.fuzzy_index
+
+    def enable_autocomplete(self, k=10):
+        """Будує індекс автодоповнення назв і авторів за префіксом.
+
+        Індекс оновлюється при зміні каталогу, а кожна видача книги
+        підвищує популярність її назви та автора.
+
+        Аргументи:
+            k (int): Найбільша кількість підказок на запит
+
+        Повертає:
+            Autocomplete: Індекс з методом complete(prefix)
+        """
+        with self._catalog_lock:
+            self.autocomplete = Autocomplete(k)
+            self._books.attach(self.autocomplete)
+        return self.autocomplete
+
+    def enable_aggregates(self, top=10):
+        """Вмикає показники каталогу (CatalogAggregates) для звітів без перегляду каталогу.
+
+        Кількість книг і видач за жанрами та авторами і список
+        найпопулярніших книг оновлюються при кожній зміні каталогу,
+        видачі та поверненні книги.
+
+        Аргументи:
+            top (int): Кількість книг у списку найпопулярніших
+
+        Повертає:
+            CatalogAggregates: Підключені показники
+        """
+        with self._catalog_lock:
+            self.aggregates = CatalogAggregates(top)
+            self.aggregates.loans = self.lent_books
+            self._books.attach(self.aggregates)
+        return self.aggregates
+
+    def enable_circulation(self, loan_period=14 * DAY, reservation_period=7 * DAY, clock=None):
+        """Вмикає терміни повернення видач і черги резервувань (Circulation).
+
+        Після цього кожна видача отримує термін повернення, на видану
+        книгу можна стати в чергу (reserve_book), а повернена книга
+        автоматично видається наступному користувачу з черги.
+        Прострочені видачі й застарілі резервування знаходить process_due.
+        Видачі, зроблені до ввімкнення, терміну не мають.
+
+        Аргументи:
+            loan_period (float): Термін видачі в секундах
+            reservation_period (float): Скільки секунд після терміну повернення
+                поточної видачі резервування ще чекає на книгу
+            clock: Функція поточного часу (типово time.time)
+
+        Повертає:
+            Circulation: Черги та терміни
+        """
+        options = {} if clock is None else {"clock": clock}
+        self.circulation = Circulation(loan_period, reservation_period, **options)
+        return self.circulation
+
+    def enable_snapshots(self):
+        """Вмикає знімки стану (snapshot) з багатоверсійним читанням.
+
+        Після цього кожна зміна книг, користувачів і видач отримує номер
+        версії, а snapshot повертає незмінний узгоджений стан за O(1).
+
+        Повертає:
+            VersionedState: Журнали версій
+        """
+        with self.exclusive():
+            self.versions = VersionedState(self._books, self._users, self._lent_books)
+        return self.versions
+
+    def _reset_versions(self):
+        """Починає журнали версій заново після заміни книг, користувачів чи видач."""
+        if self.versions is not None:
+            self.enable_snapshots()
 
+    def snapshot(self):
+        """Повертає незмінний знімок книг, користувачів і видач (LibrarySnapshot).
+
+        Знімок створюється за O(1) без зупинки видачі та повернення книг,
+        а пізніші зміни його не змінюють, тож довгий перегляд списку чи
+        пошук у знімку бачить один узгоджений стан.
+        """
+        if self.versions is None:
+            raise LibraryError("Знімки не ввімкнено (enable_snapshots)")
+        return self.versions.snapshot(getattr(self._books, "search_index", None))
+
+    @property
+    def users(self):
+        """Список користувачів з підтримуваним індексом за ім'ям і роллю."""
+        return self._users
+
+    @users.setter
+    def users(self, users):
+        self._users = UserList(users)
+        self._reset_versions()
+
+    def find_book(self, title, author):
+        """Повертає книгу за назвою та автором або None."""
+        return self._books.key_index.get((title, author))
+
+    def get_book(self, book_id):
+        """Повертає книгу каталогу за ідентифікатором Book.id або None."""
+        return self._book_ids.get(book_id)
+
+    def _canonical(self, book):
+        """Повертає екземпляр книги з каталогу з тими самими назвою та автором.
+
+        Назва та автор — єдиний ключ ідентичності книги: за ним рівні
+        Book і BookView і від нього обчислюється Book.id.
+
+        Так рівна копія книги (наприклад, після десеріалізації) вважається
+        тією самою книгою, а у видачах зберігається лише екземпляр каталогу.
+        """
+        found = self._books.key_index.get((book.title, book.author))
+        if found is None:
+            raise BookNotFoundError("Такої книги немає в бібліотеці")
+        return found
+
+    def _shared(self, book):
+        """Повертає екземпляр книги зі спільного каталогу філій (або саму book).
+
+        Породжує:
+            BookExistsError: Якщо в каталозі вже є ця книга з іншим жанром
+        """
+        if self.catalog is None:
+            return book
+        shared = self.catalog.intern(book)
+        if shared.genre != book.genre:
+            raise BookExistsError(f"Книга '{book.title}' автора {book.author} "
+                                  f"вже є в каталозі з жанром {shared.genre}")
+        return shared
+
+    def find_user(self, name, role):
+        """Повертає користувача за ім'ям і роллю або None.
+
+        Аргументи:
+            name (str): Ім'я користувача
+            role: Роль (reader або librarian) або клас користувача
+        """
+        if isinstance(role, str):
+            role = UserFactory.user_class(role)
+        return self._users.key_index.get((name, role))
+
+    @instrumented("add_book")
     def add_book(self, book: Book):
         """Додає книгу до бібліотеки, якщо вона ще не існує."""
-        if any(b.title == book.title and b.author == book.author for b in self.books):
-            raise BookExistsError("Книга з таким самим автором і назвою вже існує")
-        self.books.append(book)
-        self.notifier.notify_all(f"Додано книгу '{book.title}' автора {book.author}")
+        book = self._shared(book)
+        with self._catalog_lock:
+            if (book.title, book.author) in self._books.key_index:
+                raise BookExistsError("Книга з таким самим автором і назвою вже існує")
+            self._insert_book(book)
+        self.notifier.emit(BookAdded, book=book)
+
+    def remove_book(self, book):
+        """Видаляє книгу з бібліотеки, якщо вона зараз не видана."""
+        book = self._canonical(book)
+        with self._catalog_lock, self._book_locks(book):
+            if self.find_book(book.title, book.author) != book:
+                raise BookNotFoundError("Такої книги немає в бібліотеці")
+            if book in self.lent_books:
+                raise BookUnavailableError("Не можна видалити видану книгу")
+            self._delete_book(book)
+        self.notifier.emit(BookRemoved, book=book)
 
+    @instrumented("register_user")
     def register_user(self, user):
         """Реєструє нового користувача, якщо такого ще немає."""
-        if any(u.name == user.name and u.__class__ == user.__class__ for u in self.users):
-            raise UserExistsError("Користувач з таким ім'ям і типом вже існує")
+        with self._users_lock:
+            if (user.name, user.__class__) in self._users.key_index:
+                raise UserExistsError("Користувач з таким ім'ям і типом вже існує")
+            self._insert_user(user)
+        self.notifier.emit(UserRegistered, user=user)
+
+    def remove_user(self, user):
+        """Видаляє користувача, якщо він не має невернутих книг."""
+        with self._users_lock, self._user_locks(user):
+            if self.find_user(user.name, user.__class__) != user:
+                raise UserNotFoundError("Такого користувача немає в бібліотеці")
+            if self.count_books_by_user(user):
+                raise UserHasBooksError("Користувач має невернуті книги")
+            self._delete_user(user)
+            if self.circulation is not None:
+                self.circulation.cancel_user(user)
+        self.notifier.emit(UserRemoved, user=user)
+
+    # Внутрішні зміни стану: оновлюють індекси, журнал і версії, але не
+    # перевіряють умов і не надсилають сповіщень. Викликаються з
+    # захопленими блокуваннями (або з apply_record під exclusive).
+
+    def _insert_book(self, book):
+        book = self._shared(book)
+        self.books.append(book)
+        self._record("add_book", book)
+        if self.versions is not None:
+            self.versions.add_book(book)
+
+    def _delete_book(self, book):
+        # Журнал версій позначає видалення раніше за каталог, щоб знімок,
+        # який шукає через живий індекс, не пропустив книгу.
+        if self.versions is not None:
+            self.versions.remove_book(book)
+        self.books.remove(book)
+        self._record("remove_book", book)
+
+    def _insert_user(self, user):
         self.users.append(user)
-        self.notifier.notify_all(f"Зареєстровано користувача '{user.name}'")
+        self._record("register_user", user)
+        if self.versions is not None:
+            self.versions.add_user(user)
+
+    def _delete_user(self, user):
+        self.users.remove(user)
+        self._record("remove_user", user)
+        if self.versions is not None:
+            self.versions.remove_user(user)
+
+    def apply_record(self, operation, *items, locked=False):
+        """Застосовує операцію журналу змін (див. LibraryStorage) без сповіщень.
+
+        Використовується для відновлення стану: спостерігачі не отримують
+        повторних сповіщень, а черги резервувань не задіяні — передача
+        повернутої книги наступному з черги записана в журнал окремою
+        видачею, а відновлені видачі, як і видачі зі знімка, не мають
+        терміну повернення.
+
+        Аргументи:
+            operation (str): Назва операції, як у журналі (add_book, lend_book, ...)
+            items: Книги та користувачі операції
+            locked (bool): Виклик уже всередині exclusive() — при відтворенні
+                журналу блокування береться один раз на всі записи
+        """
+        mutators = {
+            "add_book": self._insert_book,
+            "remove_book": self._delete_book,
+            "register_user": self._insert_user,
+            "remove_user": self._delete_user,
+            "lend_book": lambda book, user: self._lend(book, user, schedule=False),
+            "return_book": self._return,
+        }
+        mutator = mutators.get(operation)
+        if mutator is None:
+            raise ValueError(f"Невідома операція журналу: {operation}")
+        if locked:
+            mutator(*items)
+            return
+        with self.exclusive():
+            mutator(*items)
+
+    def add_books(self, books, batch_size=1000):
+        """Масово додає книги з ітерованого джерела (наприклад, генератора).
+
+        Дублікати перевіряються за O(1), помилки окремих записів
+        (LibraryError, зокрема ImportRowError від читачів файлів)
+        потрапляють у звіт без переривання імпорту. Замість сповіщення
+        на кожну книгу надсилається одне підсумкове на кожен пакет.
+
+        Аргументи:
+            books: Ітероване джерело книг або ImportRowError
+            batch_size (int): Розмір пакета для підсумкових сповіщень
+
+        Повертає:
+            ImportReport: Кількість доданих книг і помилки
+        """
+        def add(book):
+            if isinstance(book, LibraryError):
+                raise book
+            book = self._shared(book)
+            with self._catalog_lock:
+                if (book.title, book.author) in self._books.key_index:
+                    raise BookExistsError(f"Книга '{book.title}' автора {book.author} вже існує")
+                self._insert_book(book)
+
+        return self._import(books, add, batch_size, BooksImported)
+
+    def register_users(self, users, batch_size=1000):
+        """Масово реєструє користувачів; працює аналогічно add_books."""
+        def register(user):
+            if isinstance(user, LibraryError):
+                raise user
+            with self._users_lock:
+                if (user.name, user.__class__) in self._users.key_index:
+                    raise UserExistsError(f"Користувач '{user.name}' вже існує")
+                self._insert_user(user)
+
+        return self._import(users, register, batch_size, UsersImported)
+
+    def _import(self, items, add, batch_size, event):
+        report = ImportReport()
+        in_batch = 0
+        for number, item in enumerate(items, 1):
+            try:
+                add(item)
+            except LibraryError as error:
+                report.errors.append((number, error))
+                continue
+            report.added += 1
+            in_batch += 1
+            if in_batch == batch_size:
+                self.notifier.emit(event, count=in_batch)
+                in_batch = 0
+        if in_batch:
+            self.notifier.emit(event, count=in_batch)
+        return report
+
+    def query(self, predicate):
+        """Виконує багатокритеріальний запит до каталогу.
+
+        Аргументи:
+            predicate: Запит з library_project.patterns.query,
+                наприклад Genre("Роман") & Author("Франко") & Available()
+
+        Повертає:
+            list: Знайдені книги у порядку каталогу
+        """
+        return execute(predicate, self.books, self.lent_books)
+
+    def _position(self):
+        index = getattr(self._books, "search_index", None)
+        return None if index is None else index.position
+
+    def iter_books(self, limit=None, offset=0):
+        """Ліниво повертає книги каталогу з пропуском offset і не більше limit."""
+        return iterate(self._books, limit, offset)
+
+    def iter_users(self, limit=None, offset=0):
+        """Ліниво повертає зареєстрованих користувачів."""
+        return iterate(self._users, limit, offset)
+
+    def iter_search(self, strategy, value, limit=None, offset=0):
+        """Ліниво повертає результати пошуку стратегією strategy."""
+        return strategy.iter_search(self._books, value, limit, offset)
+
+    def books_page(self, limit, cursor=None):
+        """Повертає сторінку каталогу зі стабільним курсором наступної сторінки."""
+        return paginate(self._books, limit, cursor, self._position())
+
+    def users_page(self, limit, cursor=None):
+        """Повертає сторінку списку користувачів."""
+        return paginate(self._users, limit, cursor)
+
+    def search_page(self, strategy, value, limit, cursor=None):
+        """Повертає сторінку результатів пошуку зі стабільним курсором."""
+        return paginate(strategy.search(self._books, value), limit, cursor, self._position())
 
     def get_users(self):
         """Повертає список усіх зареєстрованих користувачів."""
@@ -61,23 +635,143 @@ class LibraryService(metaclass=SingletonMeta):
 
     def get_books_by_user(self, user):
         """Повертає список книг, які користувач наразі взяв."""
-        return [book for book, u in self.lent_books.items() if u == user]
+        return self.lent_books.books_of(user)
 
-    def lend_book(self, book, user):
-        """Видає книгу користувачу, якщо книга доступна в бібліотеці."""
-        if book not in self.books:
-            raise BookNotFoundError("Такої книги немає в бібліотеці")
-        if book in self.lent_books:
-            raise BookUnavailableError("Книга вже зайнята")
+    def count_books_by_user(self, user):
+        """Повертає кількість книг, які користувач наразі взяв."""
+        return self.lent_books.count(user)
+
+    def get_borrowers(self):
+        """Повертає список користувачів, які мають невернуті книги."""
+        return self.lent_books.borrowers()
+
+    @instrumented("lend_book")
+    def lend_book(self, book, user, due=None):
+        """Видає книгу користувачу, якщо книга доступна в бібліотеці.
+
+        Аргументи:
+            book: Книга каталогу
+            user: Користувач
+            due (float): Термін повернення (лише з enable_circulation;
+                типово — зараз плюс термін видачі)
+        """
+        book = self._canonical(book)
+        with self._loan_locks(book, user):
+            if self.find_book(book.title, book.author) != book:
+                raise BookNotFoundError("Такої книги немає в бібліотеці")
+            if book in self.lent_books:
+                raise BookUnavailableError("Книга вже зайнята")
+            self._lend(book, user, due)
+        self.notifier.emit(BookLent, book=book, user=user)
+
+    def _lend(self, book, user, due=None, schedule=True):
+        """Записує видачу; викликається з захопленими блокуваннями книги й користувача.
+
+        schedule=False не призначає терміну повернення (відновлення з журналу).
+        """
         self.lent_books[book] = user
-        self.notifier.notify_all(f"Книга '{book.title}' видана користувачу {user.name}")
+        self._record("lend_book", book, user)
+        if self.versions is not None:
+            self.versions.lend(book, user)
+        if self.autocomplete is not None:
+            self.autocomplete.record_lend(book)
+        if self.aggregates is not None:
+            self.aggregates.record_lend(book)
+        if schedule and self.circulation is not None:
+            self.circulation.start_loan(book, user, due)
 
+    @instrumented("return_book")
     def return_book(self, book, user):
-        """Приймає книгу назад від користувача."""
-        if self.lent_books.get(book) != user:
-            raise ReturnBookError("Цю книгу не може повернути цей користувач")
+        """Приймає книгу назад від користувача.
+
+        Якщо на книгу є черга резервувань, книга одразу видається
+        наступному користувачу з черги.
+        """
+        book = self.find_book(book.title, book.author) or book
+        with self._book_locks(book):
+            if self.lent_books.get(book) != user:
+                raise ReturnBookError("Цю книгу не може повернути цей користувач")
+            successor = None if self.circulation is None else self.circulation.pop_next(book)
+            # Блокування користувачів захоплюються в сталому порядку (за id),
+            # щоб два повернення з передачею книги не чекали одне на одного.
+            users = (user,) if successor is None else (user, successor)
+            with acquire_all(*sorted({self._user_locks(item) for item in users}, key=id)):
+                self._return(book, user)
+                if self.circulation is not None:
+                    self.circulation.end_loan(book)
+                if successor is not None:
+                    self._lend(book, successor)
+        self.notifier.emit(BookReturned, book=book, user=user)
+        if successor is not None:
+            self.notifier.emit(BookLent, book=book, user=successor)
+            self.notifier.emit(ReservationFulfilled, book=book, user=successor)
+
+    def _return(self, book, user):
+        """Записує повернення; викликається з захопленим блокуванням книги."""
         del self.lent_books[book]
-        self.notifier.notify_all(f"Книга '{book.title}' повернена користувачем {user.name}")
+        self._record("return_book", book, user)
+        if self.versions is not None:
+            self.versions.return_book(book)
+        if self.aggregates is not None:
+            self.aggregates.record_return(book)
+
+    def _require_circulation(self):
+        if self.circulation is None:
+            raise ReservationError("Резервування не ввімкнено (enable_circulation)")
+        return self.circulation
+
+    def reserve_book(self, book, user, priority=0):
+        """Ставить користувача в чергу на видану книгу.
+
+        Аргументи:
+            book: Видана книга каталогу
+            user: Користувач, що чекатиме на книгу
+            priority (int): Менше значення обслуговується раніше (типово — за чергою)
+        """
+        circulation = self._require_circulation()
+        book = self._canonical(book)
+        with self._book_locks(book):
+            if self.find_book(book.title, book.author) != book:
+                raise BookNotFoundError("Такої книги немає в бібліотеці")
+            holder = self.lent_books.get(book)
+            if holder is None:
+                raise ReservationError("Книга вільна, її можна взяти одразу")
+            if holder == user:
+                raise ReservationError("Ця книга вже у вас")
+            if not circulation.reserve(book, user, priority):
+                raise ReservationError("Ви вже в черзі на цю книгу")
+        self.notifier.emit(BookReserved, book=book, user=user)
+
+    def cancel_reservation(self, book, user):
+        """Прибирає користувача з черги на книгу."""
+        book = self.find_book(book.title, book.author) or book
+        if not self._require_circulation().cancel(book, user):
+            raise ReservationError("Цей користувач не в черзі на цю книгу")
+
+    def overdue_loans(self):
+        """Повертає прострочені видачі: список (книга, користувач, термін)."""
+        return self._require_circulation().overdue()
+
+    def process_due(self, now=None):
+        """Знаходить прострочені видачі та застарілі резервування і надсилає сповіщення.
+
+        Працює за час, пропорційний кількості термінів, що настали.
+
+        Аргументи:
+            now (float): Момент перевірки (типово — поточний час)
+
+        Повертає:
+            tuple: (нові прострочені видачі [(книга, користувач, термін)],
+                застарілі резервування [(книга, користувач)])
+        """
+        if self.circulation is None:
+            return [], []
+        overdue, expired = self.circulation.process_due(now)
+        for book, user, _ in overdue:
+            self.notifier.emit(LoanOverdue, book=book, user=user)
+        for book, user in expired:
+            self.notifier.emit(ReservationExpired, book=book, user=user)
+        return overdue, expired
 
     def add_observer(self, observer):
         """Додає спостерігача (наблюдателя) для повідомлень."""
@@ -86,3 +780,15 @@ class LibraryService(metaclass=SingletonMeta):
     def remove_observer(self, observer):
         """Видаляє спостерігача (наблюдателя) з повідомлень."""
         self.notifier.remove_observer(observer)
+
+    def subscribe(self, observer, events=None, **filters):
+        """Підписує спостерігача лише на потрібні події (див. Notifier.subscribe).
+
+        Приклад:
+            service.subscribe(reader, BookAdded, genre="Роман")
+        """
+        return self.notifier.subscribe(observer, events, **filters)
+
+    def unsubscribe(self, subscription):
+        """Скасовує підписку на події."""
+        self.notifier.unsubscribe(subscription)
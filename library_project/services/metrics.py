@@ -0,0 +1,196 @@
+"""
+Модуль інструментування гарячих шляхів сервісу.
+
+Операції LibraryService і стратегії пошуку позначаються декоратором
+instrumented, а Notifier вимірює час доставки кожному спостерігачу.
+Поки метрики не ввімкнено (enable), декоратор лише перевіряє одну
+глобальну змінну і викликає функцію напряму.
+
+Приклад:
+    metrics = enable()
+    ...
+    print(metrics.to_prometheus())
+"""
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+# Межі кошиків гістограми затримок у секундах.
+DEFAULT_BUCKETS = (
+    0.000001, 0.000005, 0.00001, 0.00005, 0.0001, 0.0005,
+    0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0,
+)
+
+_active = None
+
+
+class Histogram:
+    """Гістограма затримок з фіксованими межами кошиків."""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # останній кошик — понад усі межі
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        """Додає одне вимірювання."""
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self):
+        """Повертає пари (межа, кількість вимірювань не більших за межу), як у Prometheus."""
+        total, pairs = 0, []
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {_format_bound(bound): count for bound, count in self.cumulative()},
+        }
+
+
+class Metrics:
+    """Сховище метрик: гістограми затримок операцій, лічильники помилок
+    за типом виключення та гістограми доставки сповіщень за спостерігачами.
+
+    Аргументи:
+        buckets (tuple): Межі кошиків гістограм у секундах.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._operations = {}  # {операція: Histogram}
+        self._errors = {}  # {(операція, тип виключення): кількість}
+        self._deliveries = {}  # {клас спостерігача: Histogram}
+        self._lock = threading.Lock()
+
+    def observe(self, operation, seconds, error=None):
+        """Записує виклик операції тривалістю seconds і, якщо був, тип виключення."""
+        with self._lock:
+            histogram = self._operations.get(operation)
+            if histogram is None:
+                histogram = self._operations[operation] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            if error is not None:
+                key = (operation, type(error).__name__)
+                self._errors[key] = self._errors.get(key, 0) + 1
+
+    def observe_delivery(self, observer, seconds):
+        """Записує час доставки сповіщення спостерігачу (групується за його класом)."""
+        name = type(observer).__name__
+        with self._lock:
+            histogram = self._deliveries.get(name)
+            if histogram is None:
+                histogram = self._deliveries[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def reset(self):
+        """Очищає всі накопичені метрики."""
+        with self._lock:
+            self._operations.clear()
+            self._errors.clear()
+            self._deliveries.clear()
+
+    def snapshot(self):
+        """Повертає знімок метрик як словник, придатний для JSON.
+
+        Приклад результату:
+            {"operations": {"lend_book": {"calls": 3, "errors": {"BookUnavailableError": 1},
+                                          "latency": {"count": 3, "sum": ..., "buckets": {...}}}},
+             "observers": {"EmailObserver": {"count": ..., "sum": ..., "buckets": {...}}}}
+        """
+        with self._lock:
+            operations = {}
+            for operation, histogram in self._operations.items():
+                operations[operation] = {
+                    "calls": histogram.count,
+                    "errors": {error: count for (name, error), count in self._errors.items()
+                               if name == operation},
+                    "latency": histogram.to_dict(),
+                }
+            observers = {name: histogram.to_dict()
+                         for name, histogram in self._deliveries.items()}
+        return {"operations": operations, "observers": observers}
+
+    def to_prometheus(self):
+        """Повертає метрики у текстовому форматі експозиції Prometheus."""
+        lines = []
+        with self._lock:
+            _histogram_lines(lines, "library_operation_seconds",
+                             "Час виконання операцій бібліотеки", "operation", self._operations)
+            lines.append("# HELP library_operation_errors_total Кількість помилок операцій")
+            lines.append("# TYPE library_operation_errors_total counter")
+            for (operation, error), count in sorted(self._errors.items()):
+                lines.append(f'library_operation_errors_total{{operation="{operation}",'
+                             f'error="{error}"}} {count}')
+            _histogram_lines(lines, "library_observer_delivery_seconds",
+                             "Час доставки сповіщень спостерігачам", "observer", self._deliveries)
+        return "\n".join(lines) + "\n"
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def _histogram_lines(lines, metric, description, label, histograms):
+    lines.append(f"# HELP {metric} {description}")
+    lines.append(f"# TYPE {metric} histogram")
+    for name, histogram in sorted(histograms.items()):
+        for bound, count in histogram.cumulative():
+            lines.append(f'{metric}_bucket{{{label}="{name}",le="{_format_bound(bound)}"}} {count}')
+        lines.append(f'{metric}_sum{{{label}="{name}"}} {histogram.sum!r}')
+        lines.append(f'{metric}_count{{{label}="{name}"}} {histogram.count}')
+
+
+def enable(metrics=None):
+    """Вмикає збір метрик і повертає активне сховище (нове, якщо не задано)."""
+    global _active  # pylint: disable=global-statement
+    _active = metrics if metrics is not None else Metrics()
+    return _active
+
+
+def disable():
+    """Вимикає збір метрик."""
+    global _active  # pylint: disable=global-statement
+    _active = None
+
+
+def active():
+    """Повертає активне сховище метрик або None, якщо збір вимкнено."""
+    return _active
+
+
+def instrumented(operation):
+    """Декоратор, що вимірює час і помилки виклику, коли метрики ввімкнено.
+
+    Аргументи:
+        operation: Назва операції або функція, що обчислює її з аргументів
+            виклику (наприклад, з поля стратегії пошуку).
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            metrics = _active
+            if metrics is None:
+                return function(*args, **kwargs)
+            name = operation(*args) if callable(operation) else operation
+            started = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            except Exception as error:
+                metrics.observe(name, time.perf_counter() - started, error)
+                raise
+            metrics.observe(name, time.perf_counter() - started)
+            return result
+        return wrapper
+    return decorate
@@ -0,0 +1,92 @@
+"""
+Модуль посторінкової видачі результатів.
+Містить Page і функції для розбиття послідовностей на сторінки за limit/offset
+або за стабільним курсором. Курсор зберігає положення останнього елемента
+сторінки в каталозі, тож додавання чи видалення книг не зсуває наступні
+сторінки.
+"""
+
+import base64
+from bisect import bisect_right
+from itertools import islice
+
+
+class InvalidCursorError(ValueError):
+    """Виключення для пошкодженого або чужого курсора сторінки."""
+
+
+class Page:
+    """Сторінка результатів.
+
+    Атрибути:
+        items (list): Елементи сторінки.
+        next_cursor (str): Курсор наступної сторінки або None, якщо це остання.
+    """
+
+    def __init__(self, items, next_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __repr__(self):
+        return f"Page(items={len(self.items)}, next_cursor={self.next_cursor!r})"
+
+
+def encode_cursor(kind, value):
+    """Кодує положення у непрозорий рядок курсора."""
+    return base64.urlsafe_b64encode(f"{kind}:{value}".encode()).decode()
+
+
+def decode_cursor(cursor, kind):
+    """Декодує курсор заданого типу.
+
+    Породжує:
+        InvalidCursorError: Якщо курсор пошкоджений або іншого типу
+    """
+    try:
+        prefix, value = base64.urlsafe_b64decode(cursor.encode()).decode().split(":", 1)
+        if prefix != kind:
+            raise ValueError(prefix)
+        return int(value)
+    except ValueError as error:
+        raise InvalidCursorError("Невірний курсор сторінки") from error
+
+
+def iterate(items, limit=None, offset=0):
+    """Ліниво повертає елементи з пропуском offset і не більше limit."""
+    stop = None if limit is None else offset + limit
+    return islice(items, offset, stop)
+
+
+def paginate(items, limit, cursor=None, position=None):
+    """Повертає сторінку послідовності.
+
+    Якщо задано position (функція положення елемента в каталозі, що зростає
+    разом з індексом послідовності), курсор вказує на положення останнього
+    виданого елемента і наступна сторінка знаходиться бінарним пошуком.
+    Інакше курсор містить зміщення.
+
+    Аргументи:
+        items: Послідовність з підтримкою індексації та зрізів
+        limit (int): Розмір сторінки
+        cursor (str): Курсор з попередньої сторінки або None для першої
+        position: Функція положення елемента або None
+
+    Повертає:
+        Page: Сторінка з курсором наступної
+    """
+    if position is None:
+        start = decode_cursor(cursor, "o") if cursor else 0
+        page = list(items[start:start + limit])
+        has_more = start + limit < len(items)
+        return Page(page, encode_cursor("o", start + limit) if has_more else None)
+    start = bisect_right(items, decode_cursor(cursor, "p"), key=position) if cursor else 0
+    page = list(items[start:start + limit])
+    if not page or start + limit >= len(items):
+        return Page(page)
+    return Page(page, encode_cursor("p", position(page[-1])))
@@ -0,0 +1,348 @@
+"""
+Модуль багатоверсійних знімків стану LibraryService (MVCC).
+Кожна зміна книг, користувачів і видач отримує номер версії, а записи
+журналів версій пам'ятають, у якій версії елемент з'явився і зник.
+Знімок — лише номер версії та довжини журналів, тож створюється за O(1),
+не блокує видачу й повернення книг і не псується наступними змінами.
+"""
+
+import sys
+import threading
+import weakref
+from bisect import bisect_right
+from itertools import islice
+
+from library_project.services.pagination import iterate
+
+_LIVE = sys.maxsize  # Версія зникнення елемента, що ще існує
+
+# Поля запису журналу: елемент, ключ, версія появи, версія зникнення, порядковий номер.
+ITEM, KEY, CREATED, DELETED, SEQUENCE = range(5)
+
+
+class VersionedLog:
+    """Журнал версій елементів однієї колекції.
+
+    Записи лише дописуються в кінець, а при видаленні в записі
+    встановлюється версія зникнення, тож читач, який переглядає
+    журнал до запам'ятованої довжини, ніколи не бачить зсуву.
+    Записи, що зникли раніше за найстаріший живий знімок, прибирає
+    compact — у новому списку, тож старі знімки дочитують свій.
+
+    Аргументи:
+        key: Функція ключа елемента (типово — сам елемент).
+    """
+
+    def __init__(self, key=None):
+        self.key = key or (lambda item: item)
+        self.entries = []
+        self.current = {}  # {ключ: запис живого елемента}
+        # (версії зникнення, записи) — замінюються разом, щоб читач бачив узгоджену пару.
+        self._removed = ([], [])
+        self._sequence = 0
+        self._limit = 1024  # Довжина журналу, після якої варто його ущільнити
+
+    def __len__(self):
+        return len(self.current)
+
+    def add(self, item, version):
+        """Записує появу елемента у версії version."""
+        entry = [item, self.key(item), version, _LIVE, self._sequence]
+        self._sequence += 1
+        self.current[entry[KEY]] = entry
+        self.entries.append(entry)
+
+    def remove(self, key, version):
+        """Записує зникнення елемента з ключем key у версії version."""
+        entry = self.current.pop(key, None)
+        if entry is None:
+            return
+        entry[DELETED] = version
+        versions, entries = self._removed
+        entries.append(entry)
+        versions.append(version)
+
+    def removed_after(self, version):
+        """Повертає записи, що зникли пізніше за version."""
+        versions, entries = self._removed
+        return entries[bisect_right(versions, version):]
+
+    def needs_compaction(self):
+        """Перевіряє, чи журнал виріс настільки, що його варто ущільнити."""
+        return len(self.entries) >= self._limit
+
+    def compact(self, oldest):
+        """Прибирає записи, що зникли не пізніше версії oldest (найстаріший живий знімок)."""
+        self.entries = [entry for entry in self.entries if entry[DELETED] > oldest]
+        versions, entries = self._removed
+        start = bisect_right(versions, oldest)
+        self._removed = (versions[start:], entries[start:])
+        # Якщо знімки ще тримають старі записи, наступна спроба — після подвоєння.
+        self._limit = 2 * len(self.entries) + 1024
+
+
+class SnapshotVersion:
+    """Версія, яку тримає знімок; поки є хоч одне посилання, compact її зберігає.
+
+    Посилання мають знімок і кожна його колекція, тож колекція, взята
+    зі знімка (snapshot().books), залишається правильною і після того,
+    як сам знімок звільнено.
+    """
+
+    __slots__ = ("version", "__weakref__")
+
+    def __init__(self, version):
+        self.version = version
+
+
+class SnapshotCollection:
+    """Незмінне представлення колекції у версії знімка.
+
+    Підтримує ітерацію в порядку додавання, len та in, не захоплюючи
+    блокувань.
+
+    Аргументи:
+        log (VersionedLog): Журнал колекції.
+        pin (SnapshotVersion): Версія знімка.
+    """
+
+    def __init__(self, log, pin):
+        self._log = log
+        self._pin = pin
+        self.version = pin.version
+        self._entries = log.entries
+        self._length = len(self._entries)
+        self._size = len(log)
+
+    def __len__(self):
+        return self._size
+
+    def _visible(self, entry):
+        return entry[CREATED] <= self.version < entry[DELETED]
+
+    def __iter__(self):
+        version = self.version
+        for entry in islice(self._entries, self._length):
+            if entry[CREATED] <= version < entry[DELETED]:
+                yield entry[ITEM]
+
+    def entry(self, key):
+        """Повертає запис, видимий у знімку, за ключем або None."""
+        entry = self._log.current.get(key)
+        if entry is not None and entry[CREATED] <= self.version:
+            return entry
+        for entry in self._log.removed_after(self.version):
+            if entry[KEY] == key and self._visible(entry):
+                return entry
+        return None
+
+    def __contains__(self, item):
+        entry = self.entry(self._log.key(item))
+        return entry is not None and entry[ITEM] == item
+
+    def position(self, item):
+        """Повертає порядковий номер елемента в журналі (-1, якщо його немає у знімку)."""
+        entry = self.entry(self._log.key(item))
+        return -1 if entry is None else entry[SEQUENCE]
+
+
+class SnapshotBooks(SnapshotCollection):
+    """Каталог у версії знімка з пошуковим індексом поверх живого індексу каталогу.
+
+    Атрибути:
+        search_index: SnapshotSearchIndex або None, якщо каталог без індексу.
+    """
+
+    def __init__(self, log, pin, index=None):
+        super().__init__(log, pin)
+        self.search_index = None if index is None else SnapshotSearchIndex(self, index)
+
+
+class SnapshotSearchIndex:
+    """Пошук у знімку через живий n-грамний індекс каталогу.
+
+    Результати живого індексу обмежуються книгами, видимими у знімку,
+    і доповнюються книгами, видаленими після знімка (їх мало, вони
+    перевіряються напряму). Оцінки для планувальника запитів беруться
+    з живого індексу.
+    """
+
+    def __init__(self, books, index):
+        self._books = books
+        self._index = index
+        self.fields = index.fields
+
+    def __len__(self):
+        return len(self._books)
+
+    def position(self, book):
+        """Повертає положення книги в каталозі знімка."""
+        return self._books.position(book)
+
+    def search(self, field, value):
+        """Пошук книг за частковим співпадінням у полі (ігнорує регістр)."""
+        if not value:
+            return list(self._books)
+        books, log = self._books, self._books._log
+        found = {}
+        for book in self._index.search(field, value):
+            entry = log.current.get(log.key(book))
+            if entry is not None and books._visible(entry):
+                found[entry[SEQUENCE]] = entry[ITEM]
+        needle = value.lower()
+        for entry in log.removed_after(books.version):
+            if books._visible(entry) and needle in getattr(entry[ITEM], field).lower():
+                found[entry[SEQUENCE]] = entry[ITEM]
+        return [found[sequence] for sequence in sorted(found)]
+
+
+class SnapshotLoans(SnapshotCollection):
+    """Видачі {Book: User} у версії знімка з інтерфейсом читання LoanMap."""
+
+    def __iter__(self):
+        for book, _ in super().__iter__():
+            yield book
+
+    def __contains__(self, book):
+        return self.entry(book) is not None
+
+    def __getitem__(self, book):
+        entry = self.entry(book)
+        if entry is None:
+            raise KeyError(book)
+        return entry[ITEM][1]
+
+    def get(self, book, default=None):
+        """Повертає користувача, що тримає книгу, або default."""
+        entry = self.entry(book)
+        return default if entry is None else entry[ITEM][1]
+
+    def items(self):
+        """Повертає пари (книга, користувач)."""
+        return list(super().__iter__())
+
+    def books_of(self, user):
+        """Повертає книги користувача у знімку."""
+        return [book for book, holder in super().__iter__() if holder == user]
+
+    def count(self, user):
+        """Повертає кількість книг користувача у знімку."""
+        return len(self.books_of(user))
+
+
+class LibrarySnapshot:
+    """Узгоджений незмінний стан бібліотеки на момент створення.
+
+    Атрибути:
+        version (int): Номер версії стану.
+        books (SnapshotBooks): Каталог.
+        users (SnapshotCollection): Користувачі.
+        lent_books (SnapshotLoans): Видачі.
+    """
+
+    def __init__(self, pin, books, users, lent_books):
+        self._pin = pin
+        self.version = pin.version
+        self.books = books
+        self.users = users
+        self.lent_books = lent_books
+
+    def iter_books(self, limit=None, offset=0):
+        """Ліниво повертає книги знімка з пропуском offset і не більше limit."""
+        return iterate(self.books, limit, offset)
+
+    def iter_users(self, limit=None, offset=0):
+        """Ліниво повертає користувачів знімка."""
+        return iterate(self.users, limit, offset)
+
+    def iter_search(self, strategy, value, limit=None, offset=0):
+        """Ліниво повертає результати пошуку стратегією strategy у знімку."""
+        return strategy.iter_search(self.books, value, limit, offset)
+
+    def query(self, predicate):
+        """Виконує багатокритеріальний запит до каталогу знімка (див. LibraryService.query)."""
+        # pylint: disable-next=import-outside-toplevel
+        from library_project.patterns.query import execute
+        return execute(predicate, self.books, self.lent_books)
+
+    def get_books_by_user(self, user):
+        """Повертає книги, які користувач тримав у момент знімка."""
+        return self.lent_books.books_of(user)
+
+
+class VersionedState:
+    """Журнали версій книг, користувачів і видач LibraryService.
+
+    Зміни записуються під коротким блокуванням фіксації, під яким
+    знімок читає номер версії та довжини журналів, тож знімок бачить
+    або всю зміну, або нічого з неї.
+
+    Аргументи:
+        books, users: Поточні книги та користувачі.
+        loans (dict): Поточні видачі {Book: User}.
+    """
+
+    def __init__(self, books=(), users=(), loans=None):
+        self.version = 0
+        self.books = VersionedLog()
+        self.users = VersionedLog()
+        self.loans = VersionedLog(key=lambda loan: loan[0])
+        self._lock = threading.Lock()
+        self._pins = weakref.WeakSet()  # Версії живих знімків і їхніх колекцій
+        for book in books:
+            self.books.add(book, 0)
+        for user in users:
+            self.users.add(user, 0)
+        for loan in (loans or {}).items():
+            self.loans.add(loan, 0)
+
+    def _commit(self, log, add=None, remove=None):
+        with self._lock:
+            self.version += 1
+            if remove is not None:
+                log.remove(remove, self.version)
+            if add is not None:
+                log.add(add, self.version)
+        if log.needs_compaction():
+            self._compact(log)
+
+    def _compact(self, log):
+        with self._lock:
+            if log.needs_compaction():
+                log.compact(min((pin.version for pin in self._pins), default=self.version))
+
+    def add_book(self, book):
+        """Записує додавання книги."""
+        self._commit(self.books, add=book)
+
+    def remove_book(self, book):
+        """Записує видалення книги."""
+        self._commit(self.books, remove=book)
+
+    def add_user(self, user):
+        """Записує реєстрацію користувача."""
+        self._commit(self.users, add=user)
+
+    def remove_user(self, user):
+        """Записує видалення користувача."""
+        self._commit(self.users, remove=user)
+
+    def lend(self, book, user):
+        """Записує видачу книги."""
+        self._commit(self.loans, add=(book, user), remove=book)
+
+    def return_book(self, book):
+        """Записує повернення книги."""
+        self._commit(self.loans, remove=book)
+
+    def snapshot(self, index=None):
+        """Повертає знімок поточної версії (index — живий пошуковий індекс каталогу)."""
+        with self._lock:
+            pin = SnapshotVersion(self.version)
+            self._pins.add(pin)
+            return LibrarySnapshot(
+                pin,
+                SnapshotBooks(self.books, pin, index),
+                SnapshotCollection(self.users, pin),
+                SnapshotLoans(self.loans, pin),
+            )
@@ -0,0 +1,312 @@
+"""
+Модуль довготривалого зберігання стану LibraryService.
+Кожна зміна стану дописується в журнал попереднього запису (WAL)
+з груповим fsync, а періодичні знімки дозволяють під час запуску
+завантажити знімок і відтворити лише хвіст журналу.
+"""
+
+import json
+import os
+import threading
+import time
+
+from library_project.models import Book
+from library_project.models.user import UserFactory
+from library_project.services.book_store import BookStore
+from library_project.services.indexes import LoanMap
+
+SNAPSHOT_FILE = "snapshot.json"
+WAL_FILE = "wal.jsonl"
+EMPTY_STATE = {"lsn": 0, "books": [], "users": [], "loans": []}
+
+
+class WriteAheadLog:
+    """Журнал попереднього запису у форматі JSON-рядків.
+
+    Записи буферизуються і скидаються на диск групою: fsync виконується,
+    коли накопичено fsync_batch записів або минуло fsync_interval секунд
+    від попереднього. Щоб остання група не лишалася в буфері, коли
+    записи припиняються, фоновий потік раз на fsync_interval скидає
+    незбережені записи. Записи останньої незавершеної групи можуть бути
+    втрачені при збої — це плата за пропускну здатність.
+
+    Аргументи:
+        path (str): Шлях до файлу журналу.
+        fsync_batch (int): Кількість записів в одній групі (1 — fsync на кожен запис).
+        fsync_interval (float): Максимальний інтервал між fsync у секундах.
+        fsync (bool): Чи викликати os.fsync (False — лише скидати буфер у ОС).
+    """
+
+    def __init__(self, path, fsync_batch=64, fsync_interval=0.05, fsync=True):
+        self.path = path
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.fsync = fsync
+        self._file = open(path, "a", encoding="utf-8")  # pylint: disable=consider-using-with
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = None
+        if fsync_interval:
+            self._flusher = threading.Thread(
+                target=self._run_flusher, name="wal-flush", daemon=True)
+            self._flusher.start()
+
+    def append(self, record):
+        """Дописує запис (список JSON-сумісних значень) у журнал."""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._pending += 1
+            if (self._pending >= self.fsync_batch
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+
+    def _run_flusher(self):
+        while not self._closed.wait(self.fsync_interval):
+            with self._lock:
+                if self._pending and not self._file.closed:
+                    self._sync()
+
+    def sync(self):
+        """Скидає накопичені записи на диск."""
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def truncate(self):
+        """Очищає журнал (після того як його вміст увійшов у знімок)."""
+        with self._lock:
+            self._file.close()
+            self._file = open(  # pylint: disable=consider-using-with
+                self.path, "w", encoding="utf-8")
+            self._sync()
+
+    def close(self):
+        """Скидає залишок записів, зупиняє фоновий потік і закриває файл."""
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            self._sync()
+            self._file.close()
+
+    @staticmethod
+    def read(path, repair=False):
+        """Повертає генератор записів журналу.
+
+        Читання зупиняється на першому пошкодженому або недописаному рядку —
+        зазвичай це останній запис після збою. При repair=True такий хвіст
+        обрізається, щоб нові записи не опинилися після нього.
+        """
+        if not os.path.exists(path):
+            return
+        valid = 0
+        with open(path, "rb") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                valid += len(line)
+                yield record
+        if repair and valid < os.path.getsize(path):
+            with open(path, "r+b") as file:
+                file.truncate(valid)
+
+
+def _encode(items):
+    """Перетворює книги й користувачів операції на плоский список полів."""
+    fields = []
+    for item in items:
+        if hasattr(item, "genre"):  # Book або BookView
+            fields.extend((item.title, item.author, item.genre))
+        else:
+            fields.extend((item.name, UserFactory.role_of(item)))
+    return fields
+
+
+class LibraryStorage:
+    """Сховище стану LibraryService: знімок плюс журнал змін.
+
+    Приклад:
+        storage = LibraryStorage("data", snapshot_every=100_000)
+        storage.open(LibraryService())
+        ...
+        storage.close()
+
+    Аргументи:
+        directory (str): Каталог для файлів знімка та журналу.
+        snapshot_every (int): Робити знімок після цієї кількості змін (None — лише вручну).
+        fsync_batch, fsync_interval, fsync: Параметри групового fsync для WriteAheadLog.
+    """
+
+    def __init__(self, directory, snapshot_every=None, fsync_batch=64,
+                 fsync_interval=0.05, fsync=True):
+        os.makedirs(directory, exist_ok=True)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.wal_path = os.path.join(directory, WAL_FILE)
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._wal_options = {"fsync_batch": fsync_batch, "fsync_interval": fsync_interval,
+                             "fsync": fsync}
+        self.service = None
+        self.wal = None
+        self.lsn = 0
+        self._since_snapshot = 0
+        self._guests = {}
+        self._lock = threading.RLock()
+        self._snapshot_due = threading.Event()
+        self._snapshotter = None
+        self._closing = False
+
+    def open(self, service):
+        """Відновлює стан service зі знімка та журналу і починає журналювання."""
+        self.service = service
+        service.journal = None
+        self.load(service)
+        self.wal = WriteAheadLog(self.wal_path, **self._wal_options)
+        service.journal = self
+        if self.snapshot_every:
+            self._closing = False
+            self._snapshotter = threading.Thread(
+                target=self._run_snapshots, name="library-snapshot", daemon=True)
+            self._snapshotter.start()
+
+    def load(self, service):
+        """Замінює стан service знімком і відтворює записи журналу, новіші за нього."""
+        self._guests = {}
+        state = EMPTY_STATE
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding="utf-8") as file:
+                state = json.load(file)
+        self._restore_snapshot(service, state)
+        replayed = 0
+        with service.exclusive():  # Одне блокування на весь хвіст журналу
+            for record in WriteAheadLog.read(self.wal_path, repair=True):
+                lsn, operation, fields = record[0], record[1], record[2:]
+                if lsn <= self.lsn:
+                    continue
+                self._replay(service, operation, fields)
+                self.lsn = lsn
+                replayed += 1
+        self._since_snapshot = replayed
+
+    def _restore_snapshot(self, service, state):
+        self.lsn = state["lsn"]
+        books = [Book(*fields) for fields in state["books"]]
+        service.books = BookStore(books) if isinstance(service.books, BookStore) else books
+        service.users = [UserFactory.create_user(role, name) for name, role in state["users"]]
+        service.lent_books = LoanMap(
+            (service.find_book(title, author), self._user(service, name, role))
+            for title, author, _, name, role in state["loans"]
+        )
+        if service.aggregates is not None:
+            # Видачі після знімка додаються під час відтворення журналу.
+            service.aggregates.restore_loan_history(state.get("loan_history", ()))
+
+    def _user(self, service, name, role):
+        """Знаходить користувача; незареєстрованих позичальників створює один раз."""
+        user = service.find_user(name, role)
+        if user is None:
+            user = self._guests.get((name, role))
+            if user is None:
+                user = self._guests[(name, role)] = UserFactory.create_user(role, name)
+        return user
+
+    def _replay(self, service, operation, fields):
+        """Відтворює запис через LibraryService.apply_record: без сповіщень і черг резервувань."""
+        if operation == "add_book":
+            items = (Book(*fields),)
+        elif operation == "remove_book":
+            items = (service.find_book(fields[0], fields[1]),)
+        elif operation == "register_user":
+            items = (UserFactory.create_user(fields[1], fields[0]),)
+        elif operation == "remove_user":
+            items = (service.find_user(fields[0], fields[1]),)
+        elif operation == "lend_book":
+            items = (service.find_book(fields[0], fields[1]),
+                     self._user(service, fields[3], fields[4]))
+        elif operation == "return_book":
+            book = service.find_book(fields[0], fields[1])
+            items = (book, service.lent_books.get(book))
+        else:
+            raise ValueError(f"Невідома операція журналу: {operation}")
+        service.apply_record(operation, *items, locked=True)
+
+    def record(self, operation, *items):
+        """Записує зміну стану в журнал (викликається LibraryService з будь-якого потоку)."""
+        fields = _encode(items)
+        with self._lock:
+            self.lsn += 1
+            self.wal.append([self.lsn, operation, *fields])
+            self._since_snapshot += 1
+            if self.snapshot_every and self._since_snapshot >= self.snapshot_every:
+                # Знімок потребує всіх блокувань сервісу, тож його робить
+                # окремий потік, а не потік, що зараз тримає блокування зміни.
+                self._snapshot_due.set()
+
+    def _run_snapshots(self):
+        while True:
+            self._snapshot_due.wait()
+            self._snapshot_due.clear()
+            if self._closing:
+                return
+            self.snapshot()
+
+    def snapshot(self):
+        """Атомарно записує знімок поточного стану і очищає журнал.
+
+        На час знімка сервіс зупиняє всі зміни (LibraryService.exclusive),
+        тож знімок узгоджений з номером останнього запису журналу.
+        """
+        service = self.service
+        with service.exclusive(), self._lock:
+            self._write_snapshot(service)
+
+    def _write_snapshot(self, service):
+        self.wal.sync()
+        state = {
+            "lsn": self.lsn,
+            "books": [[book.title, book.author, book.genre] for book in service.books],
+            "users": [[user.name, UserFactory.role_of(user)] for user in service.users],
+            "loans": [_encode((book, user)) for book, user in service.lent_books.items()],
+        }
+        if service.aggregates is not None:
+            state["loan_history"] = service.aggregates.loan_history()
+        temporary = self.snapshot_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(state, file, ensure_ascii=False, separators=(",", ":"))
+            file.flush()
+            if self.fsync:
+                os.fsync(file.fileno())
+        os.replace(temporary, self.snapshot_path)
+        self.wal.truncate()
+        self._since_snapshot = 0
+
+    def sync(self):
+        """Примусово скидає журнал на диск."""
+        self.wal.sync()
+
+    def close(self):
+        """Скидає журнал, закриває файли та від'єднується від сервісу."""
+        if self._snapshotter is not None:
+            self._closing = True
+            self._snapshot_due.set()
+            self._snapshotter.join()
+            self._snapshotter = None
+        if self.wal is not None:
+            self.wal.close()
+            self.wal = None
+        if self.service is not None:
+            self.service.journal = None
+            self.service = None
@@ -1,8 +1,61 @@
-from library_project.services.library import LibraryService
-from library_project.models.user import UserFactory  # ← виправлено
-from library_project.models.book import Book         # ← виправлено
-from library_project.patterns import SearchByTitle, SearchByAuthor, SearchByGenre
-from unittest.mock import MagicMock
+from library_project.services.library import (
+    LibraryService,
+    BookExistsError,
+    BookUnavailableError,
+    UserExistsError,
+    UserHasBooksError,
+    ImportRowError,
+    ReturnBookError,
+    ReservationError,
+    LibraryError,
+)
+from library_project.services.importer import read_books_csv, read_books_jsonl, read_users_jsonl
+from library_project.services.storage import LibraryStorage, WriteAheadLog
+from library_project.services.pagination import InvalidCursorError
+from library_project.services import metrics
+from library_project.main import choose_from_list
+from library_project.commands import run_batch
+from library_project.server import start_server
+from library_project.models.user import UserFactory, Reader  # ← виправлено
+from library_project.models.book import Book, BookPool  # ← виправлено
+from library_project.patterns import SearchByTitle, SearchByAuthor, SearchByGenre, VectorizedSearch
+from library_project.patterns.singleton import SingletonMeta
+from library_project.services.indexes import BookList, BookIdIndex
+from library_project.services.book_store import BookStore
+from library_project.services.branches import SharedCatalog
+from library_project.services.circulation import DAY
+from library_project.services.catalog_file import (
+    CatalogFormatError, MappedBookStore, write_catalog
+)
+from library_project.patterns.observer import Notifier, AsyncDispatcher
+from library_project.patterns.events import (
+    BookAdded, BookLent, BookReturned, LoanOverdue, ReservationExpired, ReservationFulfilled
+)
+from library_project.patterns.cache import SearchCache, CachedSearch
+from library_project.patterns.fuzzy import SearchFuzzy
+from library_project.patterns.parallel import ParallelSearch, SearchExecutor
+from library_project.patterns.query import (
+    Title, Author, Genre, Available, QueryContext, execute
+)
+from unittest.mock import MagicMock, patch
+import asyncio
+import io
+import json
+import queue
+import random
+import sys
+import threading
+import time
+import pytest
+
+
+@pytest.fixture
+def fresh_library():
+    """Створює новий екземпляр сервісу, не зачіпаючи інші тести."""
+    previous = SingletonMeta._instances.pop(LibraryService, None)
+    yield LibraryService()
+    if previous is not None:
+        SingletonMeta._instances[LibraryService] = previous
 
 def test_singleton():
     a = LibraryService()
@@ -53,21 +106,20 @@ def test_observer_notify(capsys):
     assert "отримав сповіщення" in captured.out
 
 
-def test_remove_observer():
-    library = LibraryService()
+def test_remove_observer(fresh_library):
+    library = fresh_library
     reader = UserFactory.create_user("reader", "Marta")
 
-    # Замінюємо метод notify мок-об'єктом
-    reader.notify = MagicMock()
+    # Замінюємо метод notify мок-об'єктом (екземпляри зі __slots__ не мають __dict__)
+    with patch.object(Reader, "notify") as notify:
+        library.add_observer(reader)
+        library.remove_observer(reader)
 
-    library.add_observer(reader)
-    library.remove_observer(reader)
-
-    book = Book("Python Advanced", "Expert", "Tech")
-    library.add_book(book)
+        book = Book("Python Advanced", "Expert", "Tech")
+        library.add_book(book)
 
     # Після видалення notify викликатись не повинен
-    reader.notify.assert_not_called()
+    notify.assert_not_called()
 
 
 def test_search_multiple_books():
@@ -80,3 +132,1015 @@ def test_search_multiple_books():
     strategy = SearchByAuthor()
     result = strategy.search(library.books, "Robert Martin")
     assert len(result) == 2
+
+
+def test_indexed_search_matches_linear_scan(fresh_library):
+    books = [
+        Book("Kobzar", "Taras Shevchenko", "Poetry"),
+        Book("Zakhar Berkut", "Ivan Franko", "Novel"),
+        Book("Lys Mykyta", "Ivan Franko", "Poetry"),
+        Book("Tini zabutykh predkiv", "Mykhailo Kotsiubynsky", "Novel"),
+    ]
+    for book in books:
+        fresh_library.add_book(book)
+    for strategy in (SearchByTitle(), SearchByAuthor(), SearchByGenre()):
+        for query in ("", "o", "IV", "franko", "poetry", "xyz", "Lys M"):
+            assert strategy.search(fresh_library.books, query) == \
+                strategy.search(list(books), query)
+
+
+def test_search_index_follows_list_changes():
+    books = BookList([Book("Dune", "Frank Herbert", "Sci-Fi")])
+    extra = Book("Dune Messiah", "Frank Herbert", "Sci-Fi")
+    books.append(extra)
+    assert SearchByTitle().search(books, "dune") == [books[0], extra]
+    books.remove(extra)
+    assert SearchByTitle().search(books, "messiah") == []
+
+
+def test_duplicate_detection_and_lookup(fresh_library):
+    book = Book("Kobzar", "Taras Shevchenko", "Poetry")
+    fresh_library.add_book(book)
+    with pytest.raises(BookExistsError):
+        fresh_library.add_book(Book("Kobzar", "Taras Shevchenko", "Other"))
+    assert fresh_library.find_book("Kobzar", "Taras Shevchenko") is book
+
+    reader = UserFactory.create_user("reader", "Anna")
+    fresh_library.register_user(reader)
+    fresh_library.register_user(UserFactory.create_user("librarian", "Anna"))
+    with pytest.raises(UserExistsError):
+        fresh_library.register_user(UserFactory.create_user("reader", "Anna"))
+    assert fresh_library.find_user("Anna", "reader") is reader
+
+
+def test_remove_keeps_indexes_consistent(fresh_library):
+    book = Book("Kobzar", "Taras Shevchenko", "Poetry")
+    reader = UserFactory.create_user("reader", "Anna")
+    fresh_library.add_book(book)
+    fresh_library.register_user(reader)
+    fresh_library.lend_book(book, reader)
+    with pytest.raises(BookUnavailableError):
+        fresh_library.remove_book(book)
+    with pytest.raises(UserHasBooksError):
+        fresh_library.remove_user(reader)
+    fresh_library.return_book(book, reader)
+    fresh_library.remove_book(book)
+    fresh_library.remove_user(reader)
+    assert fresh_library.find_book("Kobzar", "Taras Shevchenko") is None
+    assert fresh_library.find_user("Anna", "reader") is None
+    fresh_library.add_book(Book("Kobzar", "Taras Shevchenko", "Poetry"))
+
+
+def test_loan_index_per_user(fresh_library):
+    books = [Book(f"Book{i}", "Author", "Drama") for i in range(3)]
+    anna = UserFactory.create_user("reader", "Anna")
+    oleh = UserFactory.create_user("reader", "Oleh")
+    for book in books:
+        fresh_library.add_book(book)
+    fresh_library.lend_book(books[0], anna)
+    fresh_library.lend_book(books[2], anna)
+    fresh_library.lend_book(books[1], oleh)
+    assert fresh_library.get_books_by_user(anna) == [books[0], books[2]]
+    assert fresh_library.count_books_by_user(anna) == 2
+    assert fresh_library.get_borrowers() == [anna, oleh]
+    fresh_library.return_book(books[1], oleh)
+    assert fresh_library.get_books_by_user(oleh) == []
+    assert fresh_library.get_borrowers() == [anna]
+
+
+def test_book_store_backs_service(fresh_library):
+    fresh_library.books = BookStore()
+    fresh_library.add_book(Book("Kobzar", "Taras Shevchenko", "Poetry"))
+    fresh_library.add_book(Book("Lys Mykyta", "Ivan Franko", "Poetry"))
+    view = fresh_library.find_book("Lys Mykyta", "Ivan Franko")
+    assert view.to_dict() == {"title": "Lys Mykyta", "author": "Ivan Franko", "genre": "Poetry"}
+    assert str(view) == str(Book("Lys Mykyta", "Ivan Franko", "Poetry"))
+    assert SearchByGenre().search(fresh_library.books, "poet") == list(fresh_library.books)
+    assert fresh_library.books.authors.values == ["Taras Shevchenko", "Ivan Franko"]
+
+    reader = UserFactory.create_user("reader", "Anna")
+    fresh_library.lend_book(view, reader)
+    assert fresh_library.get_books_by_user(reader) == [fresh_library.books[1]]
+    fresh_library.return_book(fresh_library.books[1], reader)
+    fresh_library.remove_book(view)
+    assert len(fresh_library.books) == 1 and Book("Lys Mykyta", "Ivan Franko") not in fresh_library.books
+
+
+def test_book_identity_is_title_and_author():
+    store = BookStore([Book("Kobzar", "Taras Shevchenko", "Poetry")])
+    view, copy = store[0], Book("Kobzar", "Taras Shevchenko", "Other")
+    assert view == copy and copy == view and hash(view) == hash(copy) and view.id == copy.id
+    assert copy in store and {view: 1}[copy] == 1
+    assert BookStore([copy])[0] == view
+
+    books = BookList([Book("Dune", "Frank Herbert", "Sci-Fi")])
+    ids = BookIdIndex()
+    ids.rebuild(books)
+    assert ids.get(books[0].id) is books[0]
+    books.key_index.discard(Book("Dune", "Frank Herbert"))
+    ids.discard(Book("Dune", "Frank Herbert"))
+    assert ("Dune", "Frank Herbert") not in books.key_index and ids.get(books[0].id) is None
+
+
+def test_book_store_key_table_survives_removals():
+    store = BookStore((Book("Poems", f"Author {i}") for i in range(100)), indexed=False)
+    for i in range(0, 100, 2):
+        store.remove(Book("Poems", f"Author {i}"))
+    store.extend(Book(f"Title {i}", "Author") for i in range(100))  # Таблиця перебудовується
+    assert Book("Poems", "Author 2") not in store and Book("Poems", "Author 3") in store
+    assert store.find_row("Poems", "Author 99") == 99
+    assert store.find_row("Title 42", "Author") == 142
+    assert len(store) == 150 and len(store._slots) >= 2 * store._filled
+
+    assert store.append(Book("Poems", "Author 3", "Other")) == store[1] and len(store) == 150
+    store.remove(Book("Title 0", "Author"))  # Лише позначка, без зсуву масиву
+    assert store._dead and len(store) == 149 and Book("Title 0", "Author") not in list(store)
+    assert store[50].title == "Title 1" and not store._dead
+    assert [view.title for view in store][:2] == ["Poems", "Poems"]
+
+
+def test_vectorized_search_matches_strategies():
+    pytest.importorskip("numpy")
+    books = [
+        Book("Kobzar", "Taras Shevchenko", "Poetry"),
+        Book("Zakhar Berkut", "Ivan Franko", "Novel"),
+        Book("Lys Mykyta", "Ivan Franko", "Poetry"),
+    ]
+    queries = ["", "o", "FRANKO", "poetry", "missing", "o"]
+    for strategy in (SearchByTitle(), SearchByAuthor(), SearchByGenre()):
+        vectorized = VectorizedSearch(strategy.field)
+        batch = vectorized.search_many(books, queries)
+        for query, indices in zip(queries, batch):
+            expected = strategy.search(books, query)
+            assert [books[i] for i in indices] == expected
+            assert vectorized.search(books, query) == expected
+
+    catalog = BookList(books)
+    by_title = VectorizedSearch("title")
+    assert by_title.search(catalog, "kobzar") == [books[0]]
+    catalog.remove(books[0])
+    catalog.append(Book("Kameniari", "Ivan Franko", "Poetry"))  # Довжина та сама
+    assert by_title.search(catalog, "kobzar") == []
+    assert by_title.search(catalog, "kameniari") == [catalog[-1]]
+
+
+class SlowObserver:
+    """Спостерігач, що накопичує повідомлення та може падати на певному."""
+
+    def __init__(self, fail_on=None):
+        self.messages = []
+        self.fail_on = fail_on
+
+    def notify(self, message):
+        if message == self.fail_on:
+            raise RuntimeError("збій спостерігача")
+        self.messages.append(message)
+
+
+def test_async_notifier_delivers_in_order_and_isolates_errors():
+    errors = []
+    notifier = Notifier(AsyncDispatcher(
+        coalesce=True, on_error=lambda observer, message, error: errors.append(message)))
+    good, failing = SlowObserver(), SlowObserver(fail_on="b")
+    notifier.add_observer(failing)
+    notifier.add_observer(good)
+    for message in ("a", "b", "c"):
+        notifier.notify_all(message)
+    notifier.close(timeout=5)
+    assert good.messages == ["a", "b", "c"]
+    assert failing.messages == ["a", "c"]
+    assert errors == ["b"]
+
+
+def test_async_notifier_backpressure():
+    gate, started = threading.Event(), threading.Event()
+
+    class Blocked:
+        def notify(self, message):
+            started.set()
+            gate.wait(5)
+
+    dispatcher = AsyncDispatcher(maxsize=1, batch_size=1, overflow="raise")
+    notifier = Notifier(dispatcher)
+    notifier.add_observer(Blocked())
+    notifier.notify_all("first")
+    assert started.wait(5)
+    notifier.notify_all("second")
+    with pytest.raises(queue.Full):
+        notifier.notify_all("third")
+    dispatcher.overflow = "drop_oldest"
+    notifier.notify_all("fourth")
+    assert dispatcher.dropped == 1
+    gate.set()
+    assert notifier.flush(timeout=5)
+    notifier.close()
+
+
+def test_async_notifier_survives_errors_and_reentrant_block():
+    notifier = Notifier(AsyncDispatcher(maxsize=1, batch_size=1, on_error=None))
+    failing, good = SlowObserver(fail_on="boom"), SlowObserver()
+    notifier.add_observer(failing)
+    notifier.add_observer(good)
+    notifier.notify_all("boom")
+    notifier.notify_all("after")
+    assert notifier.flush(timeout=5) and good.messages == ["boom", "after"]
+
+    class Echo:
+        """Спостерігач, що сам надсилає сповіщення з потоку доставки."""
+
+        def notify(self, message):
+            if message.startswith("ping"):
+                for number in range(3):  # Більше, ніж уміщує черга (maxsize=1)
+                    notifier.notify_all(f"pong {number}")
+
+    notifier.add_observer(Echo())
+    notifier.notify_all("ping")
+    assert notifier.flush(timeout=5)
+    assert good.messages[-4:] == ["ping", "pong 0", "pong 1", "pong 2"]
+    notifier.close(timeout=5)
+
+
+def test_bulk_import_from_streams(fresh_library, tmp_path):
+    observer = SlowObserver()
+    fresh_library.add_observer(observer)
+    books_csv = io.StringIO(
+        "title,author,genre\n"
+        "Kobzar,Taras Shevchenko,Poetry\n"
+        "Kobzar,Taras Shevchenko,Poetry\n"
+        "Lys Mykyta,Ivan Franko,Poetry\n"
+        "Broken\n"
+    )
+    report = fresh_library.add_books(read_books_csv(books_csv), batch_size=1)
+    assert report.added == 2
+    assert [number for number, _ in report.errors] == [2, 4]
+    assert isinstance(report.errors[1][1], ImportRowError)
+    assert report.errors[1][1].row == 5
+    assert observer.messages == ["Додано книг: 1", "Додано книг: 1"]
+
+    users_jsonl = io.StringIO(
+        '{"name": "Anna", "role": "reader"}\n'
+        '\n'
+        '{"name": "Oleh", "role": "admin"}\n'
+        'not json\n'
+        '{"name": "Oleh", "role": "librarian"}\n'
+    )
+    report = fresh_library.register_users(read_users_jsonl(users_jsonl))
+    assert report.added == 2
+    assert [number for number, _ in report.errors] == [2, 3]
+    assert observer.messages[-1] == "Зареєстровано користувачів: 2"
+    assert fresh_library.find_user("Oleh", "librarian") is not None
+
+    path = tmp_path / "books.jsonl"
+    path.write_text("".join(json.dumps(Book(f"Book{i}", "A").to_dict()) + "\n" for i in range(3)),
+                    encoding="utf-8")
+    rows = read_books_jsonl(str(path))
+    assert next(rows).title == "Book0"
+    file = rows.gi_frame.f_locals["file"]
+    rows.close()  # Виклик припинив ітерацію достроково
+    assert file.closed
+
+
+def test_storage_recovers_from_snapshot_and_log(fresh_library, tmp_path):
+    storage = LibraryStorage(tmp_path, fsync=False)
+    storage.open(fresh_library)
+    kobzar = Book("Kobzar", "Taras Shevchenko", "Poetry")
+    anna = UserFactory.create_user("reader", "Anna")
+    fresh_library.add_book(kobzar)
+    fresh_library.register_user(anna)
+    storage.snapshot()
+    fresh_library.add_books([Book("Lys Mykyta", "Ivan Franko", "Poetry")])
+    fresh_library.lend_book(kobzar, anna)
+    fresh_library.lend_book(fresh_library.find_book("Lys Mykyta", "Ivan Franko"), anna)
+    fresh_library.return_book(kobzar, anna)
+    storage.close()
+    with open(storage.wal_path, "a", encoding="utf-8") as wal:
+        wal.write('[99, "add_bo')  # недописаний запис після збою
+
+    restored = LibraryStorage(tmp_path, fsync=False)
+    restored.open(fresh_library)
+    assert [book.to_dict() for book in fresh_library.books] == [
+        kobzar.to_dict(), {"title": "Lys Mykyta", "author": "Ivan Franko", "genre": "Poetry"}]
+    anna = fresh_library.find_user("Anna", "reader")
+    assert [book.title for book in fresh_library.get_books_by_user(anna)] == ["Lys Mykyta"]
+    assert restored.lsn == 6
+    fresh_library.remove_book(fresh_library.find_book("Kobzar", "Taras Shevchenko"))
+    restored.close()
+    assert [record[:2] for record in WriteAheadLog.read(restored.wal_path)][-1] == [7, "remove_book"]
+
+
+def test_storage_replay_is_silent_and_skips_handoff(fresh_library, tmp_path):
+    fresh_library.enable_circulation()
+    storage = LibraryStorage(tmp_path, fsync=False)
+    storage.open(fresh_library)
+    kobzar = Book("Kobzar", "Taras Shevchenko", "Poetry")
+    fresh_library.add_book(kobzar)
+    anna, petro, ivan = (UserFactory.create_user("reader", name) for name in ("Anna", "Petro", "Ivan"))
+    fresh_library.register_users([anna, petro, ivan])
+    fresh_library.lend_book(kobzar, anna)
+    fresh_library.reserve_book(kobzar, petro)
+    fresh_library.reserve_book(kobzar, ivan)
+    fresh_library.return_book(kobzar, anna)  # Передача Петру записана окремою видачею
+    storage.close()
+
+    events = []
+    fresh_library.subscribe(events.append)
+    restored = LibraryStorage(tmp_path, fsync=False)
+    restored.open(fresh_library)  # Іван досі в черзі, але відтворення книгу йому не передає
+    assert fresh_library.lent_books[fresh_library.find_book("Kobzar", "Taras Shevchenko")].name == "Petro"
+    assert events == []
+    restored.close()
+
+
+def test_wal_flushes_idle_tail_on_timer(tmp_path):
+    wal = WriteAheadLog(tmp_path / "wal.jsonl", fsync_batch=1000, fsync_interval=0.01, fsync=False)
+    wal.append([1, "add_book", "Kobzar", "Taras Shevchenko", "Poetry"])
+    deadline = time.monotonic() + 5
+    while not list(WriteAheadLog.read(wal.path)) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert list(WriteAheadLog.read(wal.path)) == [[1, "add_book", "Kobzar", "Taras Shevchenko", "Poetry"]]
+    wal.close()
+
+
+def test_singleton_under_concurrent_first_call():
+    class Probe(metaclass=SingletonMeta):
+        def __init__(self):
+            time.sleep(0.01)
+
+    barrier = threading.Barrier(8)
+    instances = []
+
+    def create():
+        barrier.wait()
+        instances.append(Probe())
+
+    threads = [threading.Thread(target=create) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(instance) for instance in instances}) == 1
+
+
+def test_concurrent_lend_and_return_keep_invariants(fresh_library):
+    books = [Book(f"Book{i}", "Author", "Drama") for i in range(20)]
+    readers = [UserFactory.create_user("reader", f"Reader{i}") for i in range(8)]
+    fresh_library.add_books(books)
+    lends = {book: 0 for book in books}
+    returns = {book: 0 for book in books}
+    failures = []
+
+    def worker(reader, seed):
+        rng = random.Random(seed)
+        for _ in range(300):
+            book = rng.choice(books)
+            try:
+                if rng.random() < 0.6:
+                    fresh_library.lend_book(book, reader)
+                    lends[book] += 1
+                else:
+                    fresh_library.return_book(book, reader)
+                    returns[book] += 1
+            except (BookUnavailableError, ReturnBookError):
+                pass
+            except Exception as error:  # pylint: disable=broad-except
+                failures.append(error)
+            try:
+                SearchByTitle().search(fresh_library.books, "book1")
+                SearchByTitle().search(fresh_library.books, "extra")
+            except Exception as error:  # pylint: disable=broad-except
+                failures.append(error)
+
+    def writer():
+        # Книги додаються й видаляються, поки триває пошук, що їх знаходить.
+        extras = []
+        while any(thread.is_alive() for thread in threads[:-1]):
+            extras.append(Book(f"Extra{len(extras)}", "Author", "Drama"))
+            fresh_library.add_book(extras[-1])
+            if len(extras) > 50:
+                fresh_library.remove_book(extras[-51])
+
+    threads = [threading.Thread(target=worker, args=(reader, i)) for i, reader in enumerate(readers)]
+    threads.append(threading.Thread(target=writer))
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Часті перемикання потоків відкривають вікна гонок
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert not failures
+    for book in books:
+        assert lends[book] - returns[book] == (1 if book in fresh_library.lent_books else 0)
+    by_user = {reader: fresh_library.get_books_by_user(reader) for reader in readers}
+    assert sum(len(user_books) for user_books in by_user.values()) == len(fresh_library.lent_books)
+    for reader, user_books in by_user.items():
+        assert all(fresh_library.lent_books[book] is reader for book in user_books)
+
+
+def test_search_cache_invalidates_only_affected_entries(fresh_library):
+    fresh_library.add_book(Book("Kobzar", "Taras Shevchenko", "Poetry"))
+    cache = fresh_library.enable_search_cache(maxsize=2)
+    by_author = CachedSearch(SearchByAuthor(), cache)
+    by_genre = CachedSearch(SearchByGenre(), cache)
+
+    assert len(by_author.search(fresh_library.books, "Shevchenko")) == 1
+    assert len(by_genre.search(fresh_library.books, "NOVEL")) == 0
+    by_author.search(fresh_library.books, "shevchenko")
+    assert cache.stats()["hits"] == 1
+
+    fresh_library.add_book(Book("Zakhar Berkut", "Ivan Franko", "Novel"))
+    assert ("author", "shevchenko") in cache
+    assert ("genre", "novel") not in cache
+    assert len(by_genre.search(fresh_library.books, "novel")) == 1
+
+    by_author.search(fresh_library.books, "franko")
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["invalidations"] == 1 and stats["size"] == 2
+
+    # Зміна каталогу під час пошуку відкидає лише результати, на які вона вплинула.
+    generation = cache.generation()
+    fresh_library.add_book(Book("Lys Mykyta", "Ivan Franko", "Poetry"))
+    cache.put(("title", "kobz"), ["old"], generation)
+    cache.put(("title", "lys"), ["old"], generation)
+    assert ("title", "kobz") in cache and ("title", "lys") not in cache
+    cache.put(("author", "franko"), ["stale"], cache.generation())
+    fresh_library.add_book(Book("Kameniari", "Ivan Franko", "Poetry"))
+    assert ("author", "franko") not in cache and ("title", "kobz") in cache
+
+
+def test_search_cache_ttl():
+    now = [0.0]
+    books = BookList([Book("Kobzar", "Taras Shevchenko", "Poetry")])
+    cache = SearchCache(ttl=10, clock=lambda: now[0])
+    cache.source = books
+    books.attach(cache)
+    strategy = CachedSearch(SearchByTitle(), cache)
+    strategy.search(books, "kob")
+    now[0] = 11
+    strategy.search(books, "kob")
+    assert cache.stats()["expirations"] == 1 and cache.stats()["hits"] == 0
+
+
+def test_query_planner_matches_manual_filtering(fresh_library):
+    books = [
+        Book("Kobzar", "Taras Shevchenko", "Poetry"),
+        Book("Zakhar Berkut", "Ivan Franko", "Novel"),
+        Book("Lys Mykyta", "Ivan Franko", "Poetry"),
+        Book("Boa constrictor", "Ivan Franko", "Novel"),
+    ]
+    fresh_library.add_books(books)
+    fresh_library.lend_book(books[2], UserFactory.create_user("reader", "Anna"))
+    queries = [
+        Genre("poetry") & Author("franko"),
+        Genre("novel") | Title("kob"),
+        Author("franko") & Available(),
+        Available(False) | (Genre("novel") & Title("boa")),
+        Title("o") & Available(False),
+    ]
+    for predicate in queries:
+        context = QueryContext(books, fresh_library.lent_books)
+        expected = [book for book in books if predicate.matches(book, context)]
+        assert fresh_library.query(predicate) == expected
+        assert execute(predicate, list(books), fresh_library.lent_books) == expected
+    assert fresh_library.query(Genre("poetry") & Author("franko")) == [books[2]]
+
+
+def test_cursor_pages_are_stable_under_changes(fresh_library):
+    fresh_library.add_books(Book(f"Book{i:02}", "Author", "Drama") for i in range(25))
+    first = fresh_library.books_page(10)
+    assert [book.title for book in first] == [f"Book{i:02}" for i in range(10)]
+    fresh_library.remove_book(first.items[3])
+    fresh_library.add_book(Book("Book99", "Author", "Drama"))
+    second = fresh_library.books_page(10, first.next_cursor)
+    assert [book.title for book in second] == [f"Book{i:02}" for i in range(10, 20)]
+    third = fresh_library.books_page(10, second.next_cursor)
+    assert third.next_cursor is None and third.items[-1].title == "Book99"
+
+    results = fresh_library.search_page(SearchByTitle(), "book1", 4)
+    assert [book.title for book in results] == ["Book10", "Book11", "Book12", "Book13"]
+    with pytest.raises(InvalidCursorError):
+        fresh_library.books_page(10, "garbage")
+
+
+def test_lazy_search_and_listing():
+    books = [Book(f"Book{i}", "Author", "Drama") for i in range(10)]
+    assert [b.title for b in SearchByTitle().iter_search(books, "book", limit=3, offset=2)] == \
+        ["Book2", "Book3", "Book4"]
+    assert [b.title for b in SearchByTitle().iter_search(BookList(books), "book", limit=2)] == \
+        ["Book0", "Book1"]
+
+
+def test_choose_from_list_pages(monkeypatch, capsys):
+    answers = iter(["n", "25"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    items = [f"item{i}" for i in range(30)]
+    assert choose_from_list(items, "елемент") == "item24"
+    assert "item0" in capsys.readouterr().out
+
+
+def test_benchmark_compare_flags_regressions():
+    from benchmarks.suite import compare
+    baseline = {"results": [{"name": "add_book", "size": 10, "ns_per_op": 100.0},
+                            {"name": "notify_all", "size": 10, "ns_per_op": 100.0}]}
+    current = {"results": [{"name": "add_book", "size": 10, "ns_per_op": 150.0},
+                           {"name": "notify_all", "size": 10, "ns_per_op": 110.0},
+                           {"name": "lend_return", "size": 10, "ns_per_op": 1.0}]}
+    rows = compare(baseline, current, threshold=0.2)
+    assert [(name, regressed) for name, *_, regressed in rows] == [
+        ("add_book", True), ("notify_all", False)]
+
+
+def test_metrics_record_operations_errors_and_observers(fresh_library):
+    collector = metrics.enable()
+    try:
+        fresh_library.add_observer(MagicMock())
+        book = Book("Кобзар", "Шевченко", "Поезія")
+        user = UserFactory.create_user("reader", "Іван")
+        fresh_library.add_book(book)
+        fresh_library.lend_book(book, user)
+        with pytest.raises(BookUnavailableError):
+            fresh_library.lend_book(book, user)
+        SearchByTitle().search(fresh_library.books, "коб")
+    finally:
+        metrics.disable()
+    fresh_library.return_book(book, user)
+
+    snapshot = collector.snapshot()
+    assert snapshot["operations"]["lend_book"]["calls"] == 2
+    assert snapshot["operations"]["lend_book"]["errors"] == {"BookUnavailableError": 1}
+    assert snapshot["operations"]["search_by_title"]["latency"]["buckets"]["+Inf"] == 1
+    assert "return_book" not in snapshot["operations"]
+    assert snapshot["observers"]["MagicMock"]["count"] == 2
+    text = collector.to_prometheus()
+    assert 'library_operation_seconds_count{operation="add_book"} 1' in text
+    assert 'library_operation_errors_total{operation="lend_book",error="BookUnavailableError"} 1' in text
+
+
+def test_fuzzy_search_tolerates_typos(fresh_library):
+    books = [Book("Кобзар", "Тарас Шевченко", "Поезія"),
+             Book("Лісова пісня", "Леся Українка", "Драма"),
+             Book("Гайдамаки", "Тарас Шевченко", "Поезія"),
+             Book("Захар Беркут", "Іван Франко", "Роман")]
+    fresh_library.add_books(books)
+    strategy = SearchFuzzy(max_distance=2)
+    linear = strategy.ranked(list(books), "Шевчнко")
+    fresh_library.enable_fuzzy_search()
+    assert strategy.ranked(fresh_library.books, "Шевчнко") == linear == [
+        (books[0], 1), (books[2], 1)]
+    assert strategy.search(fresh_library.books, "Фарнко") == [books[3]]
+    assert strategy.search(fresh_library.books, "ліова пісян") == [books[1]]
+    assert SearchFuzzy(max_distance=1).search(fresh_library.books, "Франек") == []
+
+    fresh_library.remove_book(books[0])
+    fresh_library.add_book(Book("Кобзар", "Тарас Шевченко", "Поезія"))
+    result = strategy.search(fresh_library.books, "кобзра")
+    assert [book.title for book in result] == ["Кобзар"] and result[0] is not books[0]
+
+
+def test_autocomplete_ranks_by_lends(fresh_library):
+    fresh_library.add_book(Book("Кобзар", "Тарас Шевченко", "Поезія"))
+    completions = fresh_library.enable_autocomplete(k=3)
+    fresh_library.add_books([Book("Кайдашева сім'я", "Іван Нечуй-Левицький", "Повість"),
+                             Book("Камінний хрест", "Василь Стефаник", "Новела"),
+                             Book("Каменярі", "Іван Франко", "Поезія")])
+    reader = UserFactory.create_user("reader", "Іван")
+    for _ in range(2):
+        fresh_library.lend_book(fresh_library.find_book("Каменярі", "Іван Франко"), reader)
+        fresh_library.return_book(fresh_library.find_book("Каменярі", "Іван Франко"), reader)
+    fresh_library.lend_book(fresh_library.find_book("Кобзар", "Тарас Шевченко"), reader)
+
+    assert completions.complete("ка") == ["Каменярі", "Кайдашева сім'я", "Камінний хрест"]
+    assert completions.complete("к", limit=2) == ["Каменярі", "Кобзар"]
+    assert completions.complete("іван ф") == ["Іван Франко"]
+    assert completions.complete("шевч") == ["Тарас Шевченко"]
+    assert completions.complete("юя") == []
+
+    fresh_library.remove_book(fresh_library.find_book("Каменярі", "Іван Франко"))
+    assert completions.complete("ка") == ["Кайдашева сім'я", "Камінний хрест"]
+    assert completions.complete("фр") == []
+
+
+def test_parallel_search_matches_in_process_search():
+    books = [Book(f"Книга {i}", f"Автор {i % 7}", "Роман" if i % 3 else "Поезія") for i in range(50)]
+    with SearchExecutor(workers=3) as executor:
+        for strategy, query in ((SearchByTitle(), "нига 1"), (SearchByAuthor(), "автор 3"),
+                                (SearchByGenre(), "ПОЕЗ")):
+            parallel = ParallelSearch(strategy, executor, threshold=0)
+            assert parallel.search(books, query) == strategy.search(books, query)
+        books.append(Book("Книга 100", "Автор 3", "Роман"))
+        assert ParallelSearch(SearchByTitle(), executor, threshold=0).search(books, "100") == [books[-1]]
+        assert len(executor.books) == 51
+        catalog = BookList(books)
+        by_title = ParallelSearch(SearchByTitle(), executor, threshold=0, prefer_index=False)
+        assert by_title.search(catalog, "Книга 100") == [books[-1]]
+        assert executor.books == catalog  # Індексований каталог обробили процеси
+        catalog.remove(books[-1])
+        catalog.append(Book("Нова", "Автор 3", "Роман"))
+        assert by_title.search(catalog, "Книга 100") == [] and by_title.search(catalog, "Нова") == [catalog[-1]]
+    assert executor.books == []
+
+
+def test_subscriptions_route_typed_events(fresh_library):
+    poetry, franko, everything = [], [], []
+    fresh_library.subscribe(poetry.append, BookAdded, genre="Поезія")
+    subscription = fresh_library.subscribe(franko.append, ("book_lent", BookReturned),
+                                           author="Іван Франко")
+    fresh_library.subscribe(everything.append)
+    reader = UserFactory.create_user("reader", "Олена")
+    fresh_library.subscribe(reader, BookLent, name="Олена")
+
+    kobzar = Book("Кобзар", "Тарас Шевченко", "Поезія")
+    zakhar = Book("Захар Беркут", "Іван Франко", "Роман")
+    fresh_library.add_books([kobzar, zakhar], batch_size=10)
+    fresh_library.add_book(Book("Мойсей", "Іван Франко", "Поезія"))
+    fresh_library.lend_book(zakhar, reader)
+    fresh_library.return_book(zakhar, reader)
+    fresh_library.unsubscribe(subscription)
+    fresh_library.lend_book(zakhar, reader)
+
+    assert [event.get("title") for event in poetry] == ["Мойсей"]
+    assert [event.type for event in franko] == ["book_lent", "book_returned"]
+    assert [event.type for event in everything] == [
+        "books_imported", "book_added", "book_lent", "book_returned", "book_lent"]
+    assert everything[0].message == "Додано книг: 2"
+    assert franko[0].message == "Книга 'Захар Беркут' видана користувачу Олена"
+
+
+def test_events_render_lazily_and_skip_unwanted(fresh_library):
+    class Exploding:
+        title = author = property(lambda self: pytest.fail("повідомлення сформовано"))
+
+    event = BookAdded(book=Exploding())
+    assert event.type == "book_added"
+    assert not fresh_library.notifier.wants(BookAdded)
+    fresh_library.notifier.emit(BookAdded, book=Exploding())
+    received = []
+    fresh_library.subscribe(received.append, BookLent)
+    fresh_library.notifier.emit(BookAdded, book=Exploding())
+    assert received == []
+
+
+def test_batch_runner_executes_commands_and_reports(fresh_library):
+    script = [
+        {"command": "register", "name": "Оксана", "role": "librarian"},
+        {"command": "add_book", "title": "Кобзар", "author": "Тарас Шевченко", "genre": "Поезія"},
+        {"command": "register", "name": "Олена", "role": "reader"},
+        {"command": "add_book", "title": "Мойсей", "author": "Іван Франко"},
+        {"command": "lend", "title": "Кобзар", "author": "Тарас Шевченко"},
+        {"command": "lend", "title": "Кобзар", "author": "Тарас Шевченко"},
+        {"command": "search", "query": "кобз"},
+        {"command": "return", "title": "Кобзар", "author": "Тарас Шевченко"},
+        {"command": "fly"},
+    ]
+    output = io.StringIO()
+    lines = [json.dumps(command) for command in script] + ["", "не json"]
+    stats = run_batch(fresh_library, lines, output)
+
+    responses = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [response["ok"] for response in responses] == [
+        True, True, True, False, True, False, True, True, False, False]
+    assert responses[3]["error"] == "CommandError"
+    assert responses[5]["error"] == "BookUnavailableError"
+    assert responses[6]["result"][0]["title"] == "Кобзар"
+    assert fresh_library.lent_books == {}
+    report = stats.report()
+    assert report["commands"] == 10
+    assert report["by_command"]["lend"]["count"] == 2
+    assert report["by_command"]["lend"]["errors"] == 1
+    assert report["by_command"]["invalid"]["errors"] == 2
+
+    output = io.StringIO()
+    run_batch(fresh_library, [json.dumps(command) for command in (
+        {"command": "login", "name": "Оксана", "role": "librarian"},
+        {"command": "add_book", "title": 7, "author": "Автор"},
+        {"command": "search", "query": "а", "field": "author"},
+    )], output)
+    responses = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [response.get("error") for response in responses] == [None, "TypeError", None]
+    with pytest.raises(AttributeError):  # Книгу, яку не вдалося проіндексувати, не додано
+        fresh_library.books.append(Book(7, "Автор"))
+    assert len(fresh_library.books) == 1 and fresh_library.find_book(7, "Автор") is None
+    assert len(SearchByTitle().search(fresh_library.books, "")) == 1
+
+    output = io.StringIO()
+    with patch.object(fresh_library, "lend_book", side_effect=queue.Full):
+        stats = run_batch(fresh_library, [json.dumps(command) for command in (
+            {"command": "login", "name": "Олена", "role": "reader"},
+            {"command": "lend", "title": "Кобзар", "author": "Тарас Шевченко"},
+            {"command": "search", "query": "кобз"},
+        )], output)
+    responses = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [response["ok"] for response in responses] == [True, False, True]
+    assert responses[1]["error"] == "Full" and stats.report()["by_command"]["lend"]["errors"] == 1
+
+
+def test_server_serves_concurrent_clients(fresh_library):
+    fresh_library.add_book(Book("Кобзар", "Тарас Шевченко", "Поезія"))
+
+    async def client(port, name, commands):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        responses = []
+        for command in [{"command": "register", "name": name, "role": "reader"}] + commands:
+            writer.write((json.dumps(command) + "\n").encode())
+            await writer.drain()
+            responses.append(json.loads(await reader.readline()))
+        writer.close()
+        await writer.wait_closed()
+        return responses
+
+    async def scenario():
+        server = await start_server(fresh_library, port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            lend = [{"command": "lend", "title": "Кобзар", "author": "Тарас Шевченко"}]
+            results = await asyncio.gather(*(client(port, f"Читач {i}", lend) for i in range(5)))
+            stats = await client(port, "Статистика", [{"command": "stats"}])
+        return results, stats[-1]["result"]
+
+    results, report = asyncio.run(scenario())
+    assert sum(responses[-1]["ok"] for responses in results) == 1
+    assert len(fresh_library.lent_books) == 1
+    assert report["by_command"]["register"]["count"] == 6
+    assert report["by_command"]["lend"]["errors"] == 4
+
+
+def test_mapped_catalog_matches_book_store(fresh_library, tmp_path):
+    books = [Book(f"Книга {i}", f"Автор {i % 7}", "Роман" if i % 3 else "Поезія") for i in range(60)]
+    books.append(Book("Кобзар", "Тарас Шевченко", "Поезія"))
+    path = str(tmp_path / "catalog.bin")
+    assert write_catalog(path, [book.to_dict() for book in books] + [books[0]]) == 61
+
+    catalog = fresh_library.open_catalog(path)
+    assert isinstance(catalog, MappedBookStore)
+    assert [book.to_dict() for book in fresh_library.books] == [book.to_dict() for book in books]
+    reference = BookStore(books)
+    for strategy, query in ((SearchByTitle(), "НИГА 1"), (SearchByAuthor(), "автор 3"),
+                            (SearchByGenre(), "поез"), (SearchByTitle(), "")):
+        assert ([book.to_dict() for book in fresh_library.iter_search(strategy, query)]
+                == [book.to_dict() for book in strategy.search(reference, query)])
+
+    kobzar = fresh_library.find_book("Кобзар", "Тарас Шевченко")
+    reader = UserFactory.create_user("reader", "Олена")
+    fresh_library.register_user(reader)
+    fresh_library.lend_book(kobzar, reader)
+    fresh_library.remove_book(fresh_library.find_book("Книга 3", "Автор 3"))
+    fresh_library.add_book(Book("Книга 300", "Автор 3", "Роман"))
+    with pytest.raises(BookExistsError):
+        fresh_library.add_book(Book("Книга 10", "Автор 3", "Роман"))
+    assert [book.title for book in fresh_library.iter_search(SearchByAuthor(), "Автор 3")] == [
+        "Книга 10", "Книга 17", "Книга 24", "Книга 31", "Книга 38", "Книга 45", "Книга 52",
+        "Книга 59", "Книга 300"]
+    assert fresh_library.lent_books[kobzar] is reader
+    assert len(fresh_library.books) == 61
+
+    (tmp_path / "broken.bin").write_bytes(b"not a catalog")
+    with pytest.raises(CatalogFormatError):
+        MappedBookStore(str(tmp_path / "broken.bin"))
+
+
+def test_aggregates_follow_catalog_and_loans(fresh_library):
+    books = [Book("Кобзар", "Тарас Шевченко", "Поезія"), Book("Захар Беркут", "Іван Франко", "Роман"),
+             Book("Мойсей", "Іван Франко", "Поезія")]
+    fresh_library.add_book(books[0])
+    aggregates = fresh_library.enable_aggregates(top=2)
+    fresh_library.add_books(books[1:])
+    reader = UserFactory.create_user("reader", "Олена")
+    for book in (books[1], books[2], books[1]):
+        fresh_library.lend_book(book, reader)
+        fresh_library.return_book(book, reader)
+    fresh_library.lend_book(books[0], reader)
+
+    assert aggregates.totals() == {"books": 3, "lent": 1, "available": 2}
+    assert aggregates.genre("Поезія") == {"books": 2, "lent": 1, "available": 1}
+    assert aggregates.author("Іван Франко") == {"books": 2, "lent": 0, "available": 2, "loans": 3}
+    assert aggregates.most_borrowed() == [("Захар Беркут", "Іван Франко", 2), ("Мойсей", "Іван Франко", 1)]
+
+    fresh_library.remove_book(books[1])  # Історія видач залишається
+    assert aggregates.most_borrowed() == [("Захар Беркут", "Іван Франко", 2), ("Мойсей", "Іван Франко", 1)]
+    assert aggregates.by_genre() == {"Поезія": {"books": 2, "lent": 1, "available": 1}}
+    assert aggregates.author("Іван Франко") == {"books": 1, "lent": 0, "available": 1, "loans": 3}
+
+    fresh_library.books = list(fresh_library.books)
+    assert aggregates.by_author()["Тарас Шевченко"] == {"books": 1, "lent": 1, "available": 0, "loans": 1}
+    fresh_library.lent_books = type(fresh_library.lent_books)()
+    assert aggregates.totals() == {"books": 2, "lent": 0, "available": 2}
+    assert aggregates.most_borrowed(1) == [("Захар Беркут", "Іван Франко", 2)]
+
+
+def test_aggregates_loan_history_survives_restart(fresh_library, tmp_path):
+    fresh_library.enable_aggregates()
+    storage = LibraryStorage(tmp_path, fsync=False)
+    storage.open(fresh_library)
+    kobzar, moisei = Book("Кобзар", "Тарас Шевченко", "Поезія"), Book("Мойсей", "Іван Франко", "Поезія")
+    reader = UserFactory.create_user("reader", "Олена")
+    fresh_library.add_books([kobzar, moisei])
+    fresh_library.register_user(reader)
+    for _ in range(2):
+        fresh_library.lend_book(kobzar, reader)
+        fresh_library.return_book(kobzar, reader)
+    storage.snapshot()
+    fresh_library.lend_book(kobzar, reader)  # Лише в журналі
+    fresh_library.lend_book(moisei, reader)
+    fresh_library.return_book(moisei, reader)
+    fresh_library.remove_book(moisei)
+    storage.close()
+
+    SingletonMeta._instances.pop(LibraryService, None)
+    restored = LibraryService()
+    aggregates = restored.enable_aggregates()
+    storage = LibraryStorage(tmp_path, fsync=False)
+    storage.open(restored)
+    assert aggregates.most_borrowed() == [("Кобзар", "Тарас Шевченко", 3), ("Мойсей", "Іван Франко", 1)]
+    assert aggregates.totals() == {"books": 1, "lent": 1, "available": 0}
+    storage.close()
+
+
+def test_reservations_hand_off_and_deadlines(fresh_library):
+    now = [0.0]
+    fresh_library.enable_circulation(loan_period=10, reservation_period=5, clock=lambda: now[0])
+    events = []
+    fresh_library.subscribe(events.append, (ReservationFulfilled, LoanOverdue, ReservationExpired))
+    kobzar = Book("Кобзар", "Тарас Шевченко", "Поезія")
+    fresh_library.add_book(kobzar)
+    olena, petro, ivan = (UserFactory.create_user("reader", name) for name in ("Олена", "Петро", "Іван"))
+
+    with pytest.raises(ReservationError):
+        fresh_library.reserve_book(kobzar, petro)
+    fresh_library.lend_book(kobzar, olena)
+    assert fresh_library.circulation.due(kobzar) == 10
+    fresh_library.reserve_book(kobzar, petro)
+    fresh_library.reserve_book(kobzar, ivan, priority=-1)
+    with pytest.raises(ReservationError):
+        fresh_library.reserve_book(kobzar, ivan)
+    assert fresh_library.circulation.waiting(kobzar) == [ivan, petro]
+
+    now[0] = 4
+    fresh_library.return_book(kobzar, olena)
+    assert fresh_library.lent_books[kobzar] is ivan
+    assert fresh_library.circulation.due(kobzar) == 14
+
+    # Резервування Петра відлічується від терміну нової видачі (14 + 5), а не від резервування.
+    now[0] = 18
+    assert fresh_library.process_due() == ([(kobzar, ivan, 14)], [])
+    now[0] = 20
+    assert fresh_library.process_due() == ([], [(kobzar, petro)])
+    assert fresh_library.process_due() == ([], [])
+    assert fresh_library.overdue_loans() == [(kobzar, ivan, 14)]
+    fresh_library.return_book(kobzar, ivan)
+    assert fresh_library.overdue_loans() == [] and kobzar not in fresh_library.lent_books
+    assert [(event.type, event.get("name")) for event in events] == [
+        ("reservation_fulfilled", "Іван"), ("loan_overdue", "Іван"), ("reservation_expired", "Петро")]
+
+
+def test_reservation_outlives_full_loan(fresh_library):
+    now = [0.0]
+    fresh_library.enable_circulation(clock=lambda: now[0])  # 14 днів видачі, 7 днів резервування
+    kobzar = Book("Кобзар", "Тарас Шевченко", "Поезія")
+    fresh_library.add_book(kobzar)
+    olena, petro, ivan = (UserFactory.create_user("reader", name) for name in ("Олена", "Петро", "Іван"))
+    fresh_library.lend_book(kobzar, olena)
+    fresh_library.reserve_book(kobzar, petro)
+    fresh_library.reserve_book(kobzar, ivan)
+
+    now[0] = 13 * DAY
+    assert fresh_library.process_due() == ([], [])
+    fresh_library.return_book(kobzar, olena)
+    assert fresh_library.lent_books[kobzar] is petro
+
+    now[0] = 26 * DAY  # Іван чекає весь термін видачі Петра
+    assert fresh_library.process_due() == ([], [])
+    fresh_library.return_book(kobzar, petro)
+    assert fresh_library.lent_books[kobzar] is ivan
+
+
+def test_book_identity_pool_and_id_index(fresh_library):
+    kobzar = Book("Кобзар", "Тарас Шевченко", "Поезія")
+    copy = Book.from_dict(kobzar.to_dict())
+    assert copy == kobzar and hash(copy) == hash(kobzar) and copy is not kobzar
+    assert copy.id == kobzar.id and len(kobzar.id) == 16
+    assert Book("Кобзар", "Інший") != kobzar
+
+    pool = BookPool()
+    lines = io.StringIO('{"title": "Кобзар", "author": "Тарас Шевченко"}\n' * 2)
+    first, second = read_books_jsonl(lines, pool)
+    assert first is second and len(pool) == 1
+    del first, second
+    assert len(pool) == 0
+
+    fresh_library.add_book(kobzar)
+    reader = UserFactory.create_user("reader", "Олена")
+    fresh_library.lend_book(copy, reader)
+    assert next(iter(fresh_library.lent_books)) is kobzar
+    assert fresh_library.get_book(kobzar.id) is kobzar
+    fresh_library.return_book(copy, reader)
+    assert fresh_library.lent_books == {}
+    fresh_library.remove_book(copy)
+    assert fresh_library.get_book(kobzar.id) is None
+
+    fresh_library.books = BookStore([kobzar])
+    view = fresh_library.get_book(kobzar.id)
+    assert view.id == kobzar.id and view.title == "Кобзар"
+    fresh_library.lend_book(kobzar, reader)
+    assert next(iter(fresh_library.lent_books)) == view
+
+
+def test_snapshots_stay_consistent_under_writes(fresh_library):
+    with pytest.raises(LibraryError):
+        fresh_library.snapshot()
+    books = [Book(f"Книга {number}", "Автор", "Роман") for number in range(5)]
+    fresh_library.add_books(books)
+    reader = UserFactory.create_user("reader", "Олена")
+    fresh_library.register_user(reader)
+    fresh_library.lend_book(books[0], reader)
+    fresh_library.enable_snapshots()
+    before = fresh_library.snapshot()
+
+    fresh_library.remove_book(books[1])
+    fresh_library.add_book(Book("Кобзар", "Тарас Шевченко", "Поезія"))
+    fresh_library.return_book(books[0], reader)
+    fresh_library.lend_book(books[2], reader)
+    after = fresh_library.snapshot()
+
+    assert list(before.books) == books and len(before.books) == 5
+    assert list(before.iter_books(limit=2, offset=1)) == books[1:3]
+    assert before.lent_books.get(books[0]) is reader and books[2] not in before.lent_books
+    assert before.get_books_by_user(reader) == [books[0]]
+    assert [book.title for book in before.iter_search(SearchByTitle(), "Книга 1")] == ["Книга 1"]
+    assert list(before.iter_search(SearchByAuthor(), "Шевченко")) == []
+    assert before.query(Genre("Роман") & Available(False)) == [books[0]]
+
+    assert [book.title for book in after.books][-1] == "Кобзар" and books[1] not in after.books
+    assert list(after.iter_search(SearchByTitle(), "Книга 1")) == []
+    assert after.query(Available(False)) == [books[2]]
+    assert list(after.users) == [reader] and list(fresh_library.snapshot().users) == [reader]
+
+    del before, after
+    for number in range(3000):  # Ущільнення журналу прибирає лише записи, старші за живі знімки.
+        fresh_library.lend_book(books[3], reader)
+        if number == 1500:
+            middle = fresh_library.snapshot()
+        fresh_library.return_book(books[3], reader)
+    assert len(fresh_library.versions.loans.entries) < 3000
+    assert middle.get_books_by_user(reader) == [books[2], books[3]]
+
+    del middle
+    target = Book("Target", "Автор", "Роман")
+    fresh_library.add_book(target)
+    orphan = fresh_library.snapshot().books  # Колекція переживає свій знімок
+    fresh_library.remove_book(target)
+    fresh_library.add_books(Book(f"Нова {number}", "Автор", "Роман") for number in range(3000))
+    assert target in orphan and SearchByTitle().search(orphan, "Target") == [target]
+
+
+def test_branches_share_catalog_but_not_loans(fresh_library):
+    catalog = SharedCatalog()
+    kyiv = LibraryService.for_branch("kyiv-central", catalog)
+    lviv = LibraryService.for_branch("lviv", catalog)
+    assert LibraryService.for_branch("kyiv-central", catalog) is kyiv
+    assert kyiv is not fresh_library and kyiv is not lviv and LibraryService() is fresh_library
+
+    kyiv.add_books([Book("Кобзар", "Тарас Шевченко", "Поезія"), Book("Мойсей", "Іван Франко", "Поезія")])
+    lviv.add_book(Book("Кобзар", "Тарас Шевченко", "Поезія"))
+    lviv.add_book(Book("Захар Беркут", "Іван Франко", "Роман"))
+    kobzar = kyiv.find_book("Кобзар", "Тарас Шевченко")
+    assert lviv.find_book("Кобзар", "Тарас Шевченко") is kobzar and len(catalog) == 3
+
+    reader = UserFactory.create_user("reader", "Олена")
+    kyiv.register_user(reader)
+    kyiv.lend_book(kobzar, reader)
+    assert kobzar in kyiv.lent_books and kobzar not in lviv.lent_books and len(lviv.users) == 0
+
+    assert [book.title for book in SearchByAuthor().search(kyiv.books, "Франко")] == ["Мойсей"]
+    assert [book.title for book in lviv.query(Author("Франко"))] == ["Захар Беркут"]
+    assert [(book.title, branches) for book, branches in catalog.search("genre", "Поезія")] == [
+        ("Кобзар", ["kyiv-central", "lviv"]), ("Мойсей", ["kyiv-central"])]
+
+    lviv.remove_book(kobzar)
+    assert catalog.holders(kobzar) == ["kyiv-central"] and len(catalog) == 3
+    kyiv.books = [book for book in kyiv.books if book.title == "Кобзар"]
+    assert [book.title for book, _ in catalog.search("title", "")] == ["Кобзар", "Захар Беркут"]
+
+
+def test_branch_restore_paths_share_catalog_books(fresh_library):
+    catalog = SharedCatalog()
+    kyiv = LibraryService.for_branch("kyiv-central", catalog)
+    lviv = LibraryService.for_branch("lviv", catalog)
+    odesa = LibraryService.for_branch("odesa", catalog)
+    kyiv.add_book(Book("Кобзар", "Тарас Шевченко", "Поезія"))
+    kobzar = kyiv.books[0]
+
+    lviv.apply_record("add_book", Book("Кобзар", "Тарас Шевченко", "Поезія"))
+    odesa.books = [Book("Кобзар", "Тарас Шевченко", "Поезія")]
+    for branch in (lviv, odesa):
+        assert branch.books[0] is kobzar
+        assert branch.books.search_index.search("title", "Кобзар")[0] is branch.books[0]
+    assert len(catalog) == 1
+
+    with pytest.raises(BookExistsError):
+        lviv.add_book(Book("Кобзар", "Тарас Шевченко", "Роман"))
+    with pytest.raises(BookExistsError):
+        LibraryService.for_branch("dnipro", catalog).add_book(Book("Кобзар", "Тарас Шевченко", "Роман"))
+    assert kobzar.genre == "Поезія"